@@ -2,7 +2,12 @@ import streamlit as st
 import pandas as pd
 import time
 import json
-from src.supabase_manager import SupabaseManager 
+from datetime import datetime
+from typing import Any, Dict
+from src.core.repositorio import RepositorioEstoque
+from src.core.configuracao import criar_manager
+from src.core.identidade import MapaIdentidade
+from src.core.metricas import metricas
 from src.paginas.dashboard import renderizar_dashboard
 from src.paginas.estoque import renderizar_estoque
 from src.paginas.cadastro import renderizar_cadastro
@@ -71,6 +76,25 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Widgets das páginas cujo valor sobrevive à troca de página
+ESTADO_PERSISTENTE = (
+    "hist_periodo", "hist_tipo", "hist_item", "hist_usuario", "hist_tamanho", "hist_exata",
+    "modo_mov", "rastrear_requisicoes",
+)
+MAX_RASTROS = 10  # execuções rastreadas guardadas por sessão
+
+
+@st.cache_resource(show_spinner=False)
+def obter_estoque_manager(backend: str, config: Dict[str, Any]) -> RepositorioEstoque:
+    """Cria o gerenciador de dados (e seu pool de conexões) uma vez por processo e o compartilha entre as sessões."""
+    # Erros aparecem na tela e o usuário é lido da sessão que faz a chamada
+    return criar_manager(backend, config, ao_erro=st.error, obter_usuario=_usuario_sessao)
+
+
+def _usuario_sessao() -> str:
+    return st.session_state.username if "username" in st.session_state else "Sistema"
+
+
 def main():
     
     # INICIALIZAÇÃO E CONEXÃO COM SUPABASE
@@ -85,28 +109,34 @@ def main():
         
     if "db_conectado" not in st.session_state:
         st.session_state.db_conectado = False
-        
-    # Inicialização do SupabaseManager e conexão
-    if "estoque_manager" not in st.session_state or not st.session_state.db_conectado:
-        try:
-            # Tenta obter as credenciais do secrets.toml (ou Streamlit Cloud Secrets)
-            SUPABASE_URL = st.secrets["supabase"]["url"]
-            SUPABASE_KEY = st.secrets["supabase"]["key"]
-            
-            # Inicializa o SupabaseManager
-            st.session_state.estoque_manager = SupabaseManager(SUPABASE_URL, SUPABASE_KEY)
-            
-        except KeyError:
-            st.error("❌ Erro de Conexão: As credenciais do Supabase não foram encontradas. Crie o arquivo `.streamlit/secrets.toml`.")
-            st.session_state.db_conectado = False
-            return 
-        except Exception as e:
-            st.error(f"❌ Erro ao inicializar o banco de dados: {e}")
-            st.session_state.db_conectado = False
-            return 
-
-    # Alias para o gerenciador
-    estoque_manager = st.session_state.estoque_manager 
+
+    # O Streamlit descarta o estado de widgets que não foram renderizados; reatribuir
+    # mantém os filtros das páginas inativas ao navegar entre elas
+    for chave in ESTADO_PERSISTENTE:
+        if chave in st.session_state:
+            st.session_state[chave] = st.session_state[chave]
+
+    # Mapa de identidade dos itens lidos pela sessão (edição/exclusão); expirados saem a cada execução
+    st.session_state.setdefault("mapa_itens", MapaIdentidade()).nova_execucao()
+
+    # Obtém o gerenciador compartilhado pelo processo (criado uma única vez)
+    try:
+        # Backend e credenciais do secrets.toml (ou Streamlit Cloud Secrets): [banco] backend =
+        # "supabase" (padrão), "sqlite" ou "memoria"; [supabase] url/key/max_conexoes
+        config = {**st.secrets.get("supabase", {}), **st.secrets.get("banco", {})}
+        backend = config.get("backend", "supabase")
+
+        estoque_manager = obter_estoque_manager(backend, config)
+        st.session_state.db_conectado = True
+
+    except KeyError:
+        st.error("❌ Erro de Conexão: As credenciais do Supabase não foram encontradas. Crie o arquivo `.streamlit/secrets.toml`.")
+        st.session_state.db_conectado = False
+        return
+    except Exception as e:
+        st.error(f"❌ Erro ao inicializar o banco de dados: {e}")
+        st.session_state.db_conectado = False
+        return
     
  
     # TELA DE INTRODUÇÃO (DEMONSTRAÇÃO)
@@ -155,19 +185,16 @@ def main():
         
         st.subheader("🔍 Filtros")
         
-        # Obtém todos os dados para extrair fornecedores/localizações (Dados do Supabase)
+        # Obtém todos os dados para extrair fornecedores/localizações
         df_completo = estoque_manager.gerar_relatorio() 
         
         # Lógica de Filtros
         busca = st.text_input("Buscar (código ou nome)")
         
-        # Filtros baseados nos dados atuais do Supabase
-        if not df_completo.empty:
-            fornecedores = ["Todos"] + list(df_completo["Fornecedor"].unique())
-            localizacoes = ["Todas"] + list(df_completo["Localização"].unique())
-        else:
-            fornecedores = ["Todos"]
-            localizacoes = ["Todas"]
+        # Opções dos filtros lidas do índice de bitmaps (construído uma vez por versão do catálogo)
+        indice_filtros = estoque_manager.obter_indice_filtros(df_completo)
+        fornecedores = ["Todos"] + indice_filtros.opcoes("Fornecedor")
+        localizacoes = ["Todas"] + indice_filtros.opcoes("Localização")
 
 
         fornecedor_filtro = st.selectbox("Fornecedor", fornecedores)
@@ -188,35 +215,44 @@ def main():
     
     st.title("📊 Sistema de Gestão de Estoque")
     
-    # Tabs principais
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "📈 Dashboard", "📦 Estoque", "➕ Cadastro", 
-        "🔄 Movimentações", "📊 Relatórios", "📜 Histórico", "⚙️ Configurações"
-    ])
-    
-    # Roteamento 
-    
-    with tab1:
-        renderizar_dashboard(estoque_manager)
-    
-    with tab2:
-        renderizar_estoque(estoque_manager, filtros)
-    
-    with tab3:
-        renderizar_cadastro(estoque_manager, st.session_state.tipo_usuario)
-        
-    with tab4:
-        renderizar_movimentacoes(estoque_manager, st.session_state.tipo_usuario)
-        
-    with tab5:
-        renderizar_relatorios(estoque_manager)
-        
-    with tab6:
-        renderizar_historico(estoque_manager)
-        
-    with tab7:
-        renderizar_configuracoes(estoque_manager, st.session_state.tipo_usuario)
+    # Navegação principal: apenas a página selecionada é executada a cada rerun
+    # (st.tabs executaria as sete páginas, mesmo as que não estão visíveis)
+    paginas = {
+        "📈 Dashboard": lambda: renderizar_dashboard(estoque_manager, df_completo),
+        "📦 Estoque": lambda: renderizar_estoque(estoque_manager, filtros, df_completo, indice_filtros),
+        "➕ Cadastro": lambda: renderizar_cadastro(estoque_manager, st.session_state.tipo_usuario),
+        "🔄 Movimentações": lambda: renderizar_movimentacoes(estoque_manager, st.session_state.tipo_usuario,
+                                                             df_completo, indice_filtros),
+        "📊 Relatórios": lambda: renderizar_relatorios(estoque_manager, df_completo),
+        "📜 Histórico": lambda: renderizar_historico(estoque_manager),
+        "⚙️ Configurações": lambda: renderizar_configuracoes(estoque_manager, st.session_state.tipo_usuario),
+    }
+    pagina_ativa = st.radio(
+        "Página", list(paginas), horizontal=True, key="pagina_ativa", label_visibility="collapsed"
+    )
+
+    # Roteamento
+    paginas[pagina_ativa]()
+
+def _guardar_rastro(rastro):
+    """Guarda o rastro da execução na sessão (as últimas MAX_RASTROS), para a aba Configurações."""
+    rastros = st.session_state.setdefault("rastros", [])
+    resumo = {"numero": rastros[-1]["numero"] + 1 if rastros else 1,
+              "pagina": st.session_state.get("pagina_ativa", "-"),
+              "horario": datetime.now().strftime("%H:%M:%S"), **rastro.resumo()}
+    rastros.append(resumo)
+    del rastros[:-MAX_RASTROS]
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Cada execução do script (rerun) é medida: duração e idas ao banco da sessão; com o
+    # rastreamento ligado (aba Configurações), cada chamada ao backend também é registrada
+    rastro = None
+    try:
+        with metricas.medir("execucao_script") as execucao, \
+                metricas.rastrear(st.session_state.get("rastrear_requisicoes", False)) as rastro:
+            main()
+    finally:
+        st.session_state.ultima_execucao = execucao
+        if rastro is not None:
+            _guardar_rastro(rastro)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Compara a classificação de status linha a linha (df.apply) com a vetorizada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_classificacao
+    python -m benchmarks.bench_classificacao --tamanhos 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.classificacao import status_categorico
+
+
+def calcular_status_linha(row):
+    """Regra antiga de gerar_relatorio, aplicada com df.apply(axis=1)."""
+    if row['quantidade'] == 0:
+        return 'Sem Estoque'
+    if row['quantidade'] < row['minimo']:
+        return 'Abaixo do Mínimo'
+    if row['quantidade'] > row['maximo']:
+        return 'Acima do Máximo'
+    return 'Normal'
+
+
+def gerar_itens(n: int, semente: int = 42) -> pd.DataFrame:
+    """Gera n itens com quantidades espalhadas ao redor das faixas mínimo/máximo."""
+    rng = np.random.default_rng(semente)
+    minimo = rng.integers(5, 100, n)
+    maximo = minimo + rng.integers(10, 300, n)
+    quantidade = np.where(rng.random(n) < 0.05, 0, rng.integers(0, 450, n))
+    return pd.DataFrame({"quantidade": quantidade, "minimo": minimo, "maximo": maximo})
+
+
+def medir(func, repeticoes: int = 3) -> float:
+    """Melhor tempo (s) entre algumas repetições."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Linhas':>10} | {'apply (s)':>10} | {'vetorizado (s)':>14} | {'ganho':>8}")
+    for n in args.tamanhos:
+        df = gerar_itens(n)
+        t_apply = medir(lambda: df.apply(calcular_status_linha, axis=1), repeticoes=1)
+        t_vetor = medir(lambda: status_categorico(df["quantidade"], df["minimo"], df["maximo"]))
+        print(f"{n:>10,} | {t_apply:>10.3f} | {t_vetor:>14.4f} | {t_apply / t_vetor:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Mede as operações de leitura do app com catálogos sintéticos de 1k a 1M linhas.
+
+Para cada tamanho, carrega o catálogo e o histórico de `benchmarks.gerador` num
+backend novo e cronometra, sempre com o cache frio: gerar_relatorio,
+obter_estatisticas, calcular_curva_abc, os filtros da barra lateral, a Previsão de
+Reposição e a renderização de uma página do Histórico. O resultado vai para um
+JSON (um por versão do código) que pode ser comparado com outro via --comparar.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_escala
+    python -m benchmarks.bench_escala --backend memoria --tamanhos 1000 100000 --historico 2
+    python -m benchmarks.bench_escala --tamanhos 1000 --comparar benchmarks/resultados/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador import gerar_historico, gerar_produtos
+from src.core.analise import calcular_curva_abc, itens_para_reposicao
+from src.core.classificacao import ABAIXO_MINIMO, ROTULOS_STATUS
+from src.core.configuracao import criar_manager
+from src.core.filtros import IndiceFiltros
+from src.core.gestor_estoque import EstoqueManager
+from src.core.repositorio import RepositorioEstoque, TABELA_HISTORICO, TABELA_PRODUTOS
+from src.core.sqlite_manager import SqliteManager
+
+# O Supabase real fica de fora: o benchmark grava milhões de linhas no banco
+BACKENDS_BENCHMARK = ("sqlite", "memoria", "simulado")
+PASTA_RESULTADOS = os.path.join("benchmarks", "resultados")
+LIMITE_REGRESSAO = 1.2  # mais de 20% acima da base é regressão
+TOLERANCIA_S = 0.005  # diferenças menores que isso são ruído de medição
+
+
+def medir(func: Callable[[], Any], repeticoes: int = 3, preparar: Optional[Callable[[], None]] = None) -> List[float]:
+    """Tempos (s) de cada repetição; `preparar` roda antes de cada uma, fora do cronômetro."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def esfriar(manager: RepositorioEstoque):
+    """Descarta os caches do backend, como após uma escrita de outra sessão."""
+    manager.cache.limpar()
+    manager._indice_filtros = None
+    if isinstance(manager, EstoqueManager):  # relatório versionado pelo próprio backend
+        manager._alterado()
+
+
+def carregar(manager: RepositorioEstoque, produtos: pd.DataFrame, historico: pd.DataFrame):
+    """Carga inicial direta no armazenamento de cada backend (sem passar pelas regras de escrita)."""
+    catalogo = produtos.drop(columns="consumo_diario")
+    if isinstance(manager, SqliteManager):
+        with manager.pool.transacao() as conexao:
+            conexao.executemany(
+                f"INSERT INTO produtos ({', '.join(catalogo.columns)}) VALUES ({', '.join('?' * len(catalogo.columns))})",
+                catalogo.itertuples(index=False, name=None))
+            conexao.executemany(
+                f"INSERT INTO historico ({', '.join(historico.columns)}) VALUES ({', '.join('?' * len(historico.columns))})",
+                historico.itertuples(index=False, name=None))
+        manager._reconstruir_indice()
+    elif isinstance(manager, EstoqueManager):
+        registros = catalogo.rename(columns={"updated_at": "ultima_atualizacao"}).set_index("id").to_dict("index")
+        manager.estoque = registros
+        manager.historico = historico.to_dict("records")
+        manager.indice_busca.reconstruir(manager.estoque.keys(), (item["nome"] for item in manager.estoque.values()))
+    else:  # SupabaseManager com ClienteSupabaseSimulado
+        manager.supabase.carregar(TABELA_PRODUTOS, catalogo.to_dict("records"))
+        manager.supabase.carregar(TABELA_HISTORICO, historico.to_dict("records"))
+    esfriar(manager)
+
+
+def renderizar_historico(manager: RepositorioEstoque, data_referencia: datetime) -> pd.DataFrame:
+    """Mesmo trabalho da página Histórico: primeira página de 50 linhas dos últimos 30 dias, contagem e formatação."""
+    filtros = {"data_inicio": (data_referencia - timedelta(days=30)).date(), "data_fim": data_referencia.date()}
+    pagina = manager.get_historico_pagina(**filtros, tamanho_pagina=50)
+    manager.contar_historico(**filtros, exato=False)
+    df = pd.DataFrame(pagina)
+    if not df.empty:
+        df["data"] = pd.to_datetime(df["data"], format="ISO8601").dt.strftime('%d/%m/%Y %H:%M:%S')
+    return df
+
+
+def medir_tamanho(backend: str, n: int, m: int, semente: int, repeticoes: int, pasta: str) -> Dict[str, Any]:
+    """Gera, carrega e mede um tamanho de catálogo; devolve os tempos de cada operação."""
+    referencia = pd.Timestamp.now().normalize()
+    inicio = time.perf_counter()
+    produtos = gerar_produtos(n, semente, referencia)
+    historico = gerar_historico(produtos, m, semente=semente, data_referencia=referencia)
+    tempo_geracao = time.perf_counter() - inicio
+
+    config = {"caminho": os.path.join(pasta, f"estoque_{n}.db")}
+    manager = criar_manager(backend, config)
+    inicio = time.perf_counter()
+    carregar(manager, produtos, historico)
+    tempo_carga = time.perf_counter() - inicio
+
+    preparar = lambda: esfriar(manager)
+    df = manager.gerar_relatorio()
+    fornecedor = df["Fornecedor"].mode().iat[0]
+    localizacao = df["Localização"].mode().iat[0]
+    selecao = {"Fornecedor": fornecedor, "Localização": localizacao, "Status": ROTULOS_STATUS[ABAIXO_MINIMO]}
+
+    def filtros_barra_lateral():
+        catalogo = manager.gerar_relatorio()
+        indice = manager.obter_indice_filtros(catalogo)
+        indice.opcoes("Fornecedor"), indice.opcoes("Localização")
+        return indice.posicoes(selecao, base=manager.buscar_posicoes("PARAFUSO", catalogo))
+
+    def previsao_reposicao():
+        consumo = manager.obter_consumo_medio("media_movel", 30, 0.3)
+        return itens_para_reposicao(manager.gerar_relatorio(), consumo, 7, 100)
+
+    operacoes = {
+        "gerar_relatorio": (manager.gerar_relatorio, preparar),
+        "obter_estatisticas": (manager.obter_estatisticas, preparar),
+        "calcular_curva_abc": (lambda: calcular_curva_abc(df), None),
+        "filtros_indice": (lambda: IndiceFiltros(df), None),
+        "filtros_barra_lateral": (filtros_barra_lateral, preparar),
+        "previsao_reposicao": (previsao_reposicao, preparar),
+        "historico_pagina": (lambda: renderizar_historico(manager, referencia.to_pydatetime()), preparar),
+    }
+    resultado = {"produtos": n, "historico": m, "geracao_s": round(tempo_geracao, 4),
+                 "carga_s": round(tempo_carga, 4), "operacoes": {}}
+    for nome, (func, preparo) in operacoes.items():
+        tempos = medir(func, repeticoes, preparo)
+        resultado["operacoes"][nome] = {"min_s": round(min(tempos), 6),
+                                        "mediana_s": round(statistics.median(tempos), 6),
+                                        "repeticoes": len(tempos)}
+
+    if hasattr(manager, "fechar"):
+        manager.fechar()
+    return resultado
+
+
+def versao_codigo() -> Optional[str]:
+    """Commit atual (com sufixo -dirty se houver alterações), para identificar o JSON."""
+    try:
+        saida = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual: Dict[str, Any], base: Dict[str, Any], limite: float = LIMITE_REGRESSAO) -> List[str]:
+    """Imprime a razão atual/base das medianas e retorna as operações que passaram do limite."""
+    bases = {(r["produtos"], nome): op["mediana_s"]
+             for r in base["resultados"] for nome, op in r["operacoes"].items()}
+    regressoes = []
+    print(f"\nComparação com {base.get('versao') or 'base'} ({base.get('backend')}):")
+    print(f"{'Produtos':>10} | {'Operação':<22} | {'base (s)':>10} | {'atual (s)':>10} | {'razão':>6}")
+    for r in atual["resultados"]:
+        for nome, op in r["operacoes"].items():
+            anterior = bases.get((r["produtos"], nome))
+            if not anterior:
+                continue
+            razao = op["mediana_s"] / anterior
+            regrediu = razao > limite and op["mediana_s"] - anterior > TOLERANCIA_S
+            marca = " ⚠️" if regrediu else ""
+            print(f"{r['produtos']:>10,} | {nome:<22} | {anterior:>10.4f} | {op['mediana_s']:>10.4f} | {razao:>5.2f}x{marca}")
+            if regrediu:
+                regressoes.append(f"{nome} ({r['produtos']:,} produtos): {razao:.2f}x")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS_BENCHMARK, default="sqlite")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="quantidades de produtos")
+    parser.add_argument("--historico", type=float, default=1.0,
+                        help="linhas de histórico por produto (padrão: 1, ou seja, M = N)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/escala_<backend>_<versão>.json)")
+    parser.add_argument("--comparar", metavar="BASE_JSON", help="resultado anterior para detectar regressões")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO,
+                        help="razão atual/base a partir da qual a operação é regressão")
+    args = parser.parse_args()
+
+    versao = versao_codigo()
+    relatorio = {
+        "versao": versao,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "backend": args.backend,
+        "semente": args.semente,
+        "historico_por_produto": args.historico,
+        "ambiente": {"python": platform.python_version(), "pandas": pd.__version__,
+                     "numpy": np.__version__, "plataforma": platform.platform()},
+        "resultados": [],
+    }
+
+    print(f"{'Produtos':>10} | {'Histórico':>10} | {'Operação':<22} | {'mín (s)':>9} | {'mediana (s)':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in args.tamanhos:
+            resultado = medir_tamanho(args.backend, n, int(n * args.historico), args.semente, args.repeticoes, pasta)
+            relatorio["resultados"].append(resultado)
+            for nome, op in resultado["operacoes"].items():
+                print(f"{n:>10,} | {resultado['historico']:>10,} | {nome:<22} | {op['min_s']:>9.4f} | {op['mediana_s']:>11.4f}")
+
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"escala_{args.backend}_{versao or 'local'}.json")
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.limite)
+        if regressoes:
+            print("\nRegressões:\n  " + "\n  ".join(regressoes))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
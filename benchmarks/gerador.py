@@ -0,0 +1,115 @@
+"""Gerador determinístico de catálogo e histórico sintéticos para os benchmarks.
+
+A mesma semente (e a mesma data de referência) gera sempre os mesmos dados:
+  - fornecedores com popularidade de Zipf (poucos concentram a maioria dos SKUs);
+  - localizações "corredor-prateleira" (A-01 ... T-30), com corredores mais cheios que outros;
+  - consumo diário log-normal (cauda longa, como numa curva ABC real), com ~30% de
+    itens parados; mínimo e máximo derivados do consumo e do prazo de reposição;
+  - histórico com Saídas proporcionais ao consumo de cada item e Entradas de reposição,
+    registrando o saldo final como no Supabase.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+NUM_FORNECEDORES = 150
+CORREDORES = "ABCDEFGHIJKLMNOPQRST"
+PRATELEIRAS_POR_CORREDOR = 30
+FRACAO_PARADOS = 0.3
+USUARIOS = ("admin", "almoxarife1", "almoxarife2", "compras", "Sistema")
+
+FAMILIAS = ("ABRAÇADEIRA TIPO D", "ABRAÇADEIRA TIPO U", "PARAFUSO SEXTAVADO", "PORCA SEXTAVADA",
+            "ARRUELA LISA", "BUCHA DE REDUÇÃO", "LUVA PVC", "CABO FLEXÍVEL", "FITA ISOLANTE",
+            "DISJUNTOR", "LUVA DE PROTEÇÃO", "REBITE POP", "BROCA AÇO RÁPIDO", "CONEXÃO TÊ",
+            "VÁLVULA ESFERA", "MANGUEIRA", "RELÉ", "TERMINAL OLHAL", "ANEL O-RING", "ROLAMENTO")
+MEDIDAS = ("1/4", "5/16", "3/8", "1/2", "5/8", "3/4", "1", "1 1/4", "1 1/2", "2")
+UNIDADES = ("PÇ", "UN", "M", "CX", "KG")
+
+
+def _referencia(data_referencia: Optional[pd.Timestamp]) -> pd.Timestamp:
+    return pd.Timestamp(data_referencia if data_referencia is not None else pd.Timestamp.now()).normalize()
+
+
+def gerar_produtos(n: int, semente: int = 42, data_referencia: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Catálogo de n itens no formato da tabela `produtos`, com a coluna auxiliar `consumo_diario`."""
+    rng = np.random.default_rng(semente)
+
+    pesos_fornecedor = 1.0 / np.arange(1, NUM_FORNECEDORES + 1) ** 1.1
+    fornecedor = rng.choice(NUM_FORNECEDORES, n, p=pesos_fornecedor / pesos_fornecedor.sum())
+    pesos_corredor = rng.dirichlet(np.full(len(CORREDORES), 2.0))
+    corredor = rng.choice(len(CORREDORES), n, p=pesos_corredor)
+    prateleira = rng.integers(1, PRATELEIRAS_POR_CORREDOR + 1, n)
+
+    consumo = rng.lognormal(mean=-0.5, sigma=1.4, size=n)
+    consumo[rng.random(n) < FRACAO_PARADOS] = 0.0
+    prazo = rng.integers(7, 31, n)
+    ciclo = rng.integers(15, 61, n)
+    minimo = np.ceil(np.maximum(consumo, 0.05) * prazo).astype(int) + rng.integers(1, 10, n)
+    maximo = minimo + np.ceil(np.maximum(consumo, 0.05) * ciclo).astype(int) + rng.integers(5, 50, n)
+    quantidade = np.floor(rng.uniform(0, 1.15, n) * maximo).astype(int)
+    quantidade[rng.random(n) < 0.05] = 0
+
+    familia = rng.integers(0, len(FAMILIAS), n)
+    medida = rng.integers(0, len(MEDIDAS), n)
+    ids = pd.Series(np.arange(1, n + 1)).astype(str).str.zfill(max(3, len(str(n))))
+    nomes = (pd.Series(np.asarray(FAMILIAS)[familia]) + " " + pd.Series(np.asarray(MEDIDAS)[medida])
+             + " #" + ids)
+
+    return pd.DataFrame({
+        "id": ids,
+        "nome": nomes,
+        "descricao": "Item sintético para benchmark",
+        "unidade": np.asarray(UNIDADES)[rng.choice(len(UNIDADES), n, p=[0.6, 0.2, 0.1, 0.07, 0.03])],
+        "quantidade": quantidade,
+        "minimo": minimo,
+        "maximo": maximo,
+        "localizacao": pd.Series(np.asarray(list(CORREDORES))[corredor]) + "-" + pd.Series(prateleira).astype(str).str.zfill(2),
+        "fornecedor": np.asarray([f"Fornecedor {k:03d}" for k in range(1, NUM_FORNECEDORES + 1)])[fornecedor],
+        "preco": np.round(rng.lognormal(mean=1.5, sigma=1.2, size=n), 2),
+        "updated_at": _referencia(data_referencia).isoformat(),
+        "consumo_diario": consumo,
+    })
+
+
+def gerar_historico(produtos: pd.DataFrame, m: int, dias: int = 180, semente: int = 42,
+                    data_referencia: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """m movimentações dos últimos `dias` dias no formato da tabela `historico`.
+
+    Itens com mais consumo recebem mais movimentações; cerca de 80% são Saídas e o
+    saldo registrado é a soma acumulada das movimentações do item (nunca negativa).
+    """
+    colunas = ["id", "nome", "tipo", "quantidade", "data", "usuario", "observacao", "variacao"]
+    if m == 0 or produtos.empty:
+        return pd.DataFrame(columns=colunas)
+    rng = np.random.default_rng(semente + 1)
+
+    peso = produtos["consumo_diario"].to_numpy() + 0.01
+    item = rng.choice(len(produtos), m, p=peso / peso.sum())
+    segundos = rng.integers(0, dias * 86400, m)
+    # ordena por (item, data) para acumular o saldo de cada item em ordem cronológica
+    ordem = np.lexsort((segundos, item))
+    item, segundos = item[ordem], segundos[ordem]
+
+    saida = rng.random(m) < 0.8
+    consumo = produtos["consumo_diario"].to_numpy()[item]
+    retirada = rng.poisson(np.maximum(consumo, 0.2) * 3) + 1
+    reposicao = produtos["maximo"].to_numpy()[item] - produtos["minimo"].to_numpy()[item]
+    delta = np.where(saida, -retirada, reposicao)
+
+    acumulado = pd.Series(delta).groupby(item).cumsum().to_numpy()
+    piso = pd.Series(acumulado).groupby(item).transform("min").to_numpy()
+    saldo = np.maximum(produtos["maximo"].to_numpy()[item], -piso) + acumulado
+
+    inicio = _referencia(data_referencia) - pd.Timedelta(days=dias)
+    datas = (inicio + pd.to_timedelta(segundos, unit="s")).strftime("%Y-%m-%dT%H:%M:%S")
+    return pd.DataFrame({
+        "id": produtos["id"].to_numpy()[item],
+        "nome": produtos["nome"].to_numpy()[item],
+        "tipo": np.where(saida, "Saída", "Entrada"),
+        "quantidade": saldo.astype(int),
+        "data": datas,
+        "usuario": np.asarray(USUARIOS)[rng.integers(0, len(USUARIOS), m)],
+        "observacao": np.where(saida, "Requisição", "Recebimento NF"),
+        "variacao": delta.astype(int),
+    }, columns=colunas)
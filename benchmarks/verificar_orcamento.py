@@ -0,0 +1,133 @@
+"""Verifica o orçamento de chamadas ao backend de cada página (falha se alguma passar do limite).
+
+Roda o app com o AppTest do Streamlit sobre um SQLite temporário com um catálogo
+sintético, abre cada página com o rastreamento ligado e compara, com o cache frio
+e com o cache quente, as chamadas diretas ao backend, as chamadas repetidas na
+mesma execução e as idas ao banco com os limites de `orcamento_requisicoes.toml`.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.verificar_orcamento
+    python -m benchmarks.verificar_orcamento --produtos 500 --detalhar
+
+A mesma verificação roda no pytest (tests/test_orcamento.py).
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import tomllib
+import unicodedata
+from typing import Any, Dict, List
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_escala import carregar
+from benchmarks.gerador import gerar_historico, gerar_produtos
+from src.core.cache_manager import cache_dados
+from src.core.configuracao import criar_manager
+
+CAMINHO_ORCAMENTO = os.path.join(os.path.dirname(__file__), "orcamento_requisicoes.toml")
+CAMINHO_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+LIMITES = ("chamadas", "duplicadas", "requisicoes_frio", "requisicoes_quente")
+TIMEOUT_SEGUNDOS = 60
+
+
+def chave_pagina(rotulo: str) -> str:
+    """"📦 Estoque" -> "estoque", "🔄 Movimentações" -> "movimentacoes" (seções do TOML)."""
+    texto = unicodedata.normalize("NFKD", rotulo).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", texto.lower()).strip("_")
+
+
+def preparar_banco(backend: str, caminho: str, produtos: int) -> Dict[str, Any]:
+    """Configuração do app para o backend, com o catálogo sintético já carregado."""
+    config = {"backend": backend, "caminho": caminho}
+    if backend == "sqlite":
+        manager = criar_manager(backend, config)
+        catalogo = gerar_produtos(produtos)
+        carregar(manager, catalogo, gerar_historico(catalogo, produtos * 5))
+        manager.fechar()
+    return config
+
+
+def carregar_orcamento(caminho: str = CAMINHO_ORCAMENTO) -> Dict[str, Any]:
+    """Limites por página do arquivo TOML."""
+    with open(caminho, "rb") as arquivo:
+        return tomllib.load(arquivo)
+
+
+def medir_backend(backend: str = "sqlite", produtos: int = 200) -> Dict[str, Dict[str, Any]]:
+    """`medir_paginas` sobre um banco temporário do backend (catálogo sintético no SQLite)."""
+    with tempfile.TemporaryDirectory() as pasta:
+        return medir_paginas(preparar_banco(backend, os.path.join(pasta, "estoque.db"), produtos))
+
+
+def medir_paginas(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Rastro de uma execução de cada página, com o cache frio e depois com o cache quente."""
+    app = AppTest.from_file(CAMINHO_APP, default_timeout=TIMEOUT_SEGUNDOS)
+    app.secrets["banco"] = config
+    app.run()
+    app.session_state["autenticado"] = True
+    app.session_state["rastrear_requisicoes"] = True
+    app.run()
+
+    medidas = {}
+    for rotulo in app.radio(key="pagina_ativa").options:
+        app.radio(key="pagina_ativa").set_value(rotulo).run()
+        cache_dados.limpar()
+        app.run()
+        frio = app.session_state["rastros"][-1]
+        app.run()
+        quente = app.session_state["rastros"][-1]
+        if app.exception:
+            raise RuntimeError(f"{rotulo}: {app.exception[0].value}")
+        medidas[rotulo] = {
+            "chamadas": frio["chamadas"],
+            "duplicadas": frio["duplicadas"],
+            "requisicoes_frio": frio["requisicoes"],
+            "requisicoes_quente": quente["requisicoes"],
+            "detalhes": frio["detalhes"],
+        }
+    return medidas
+
+
+def verificar(medidas: Dict[str, Dict[str, Any]], orcamento: Dict[str, Any], detalhar: bool = False) -> List[str]:
+    """Imprime medidas x limites e retorna as violações (seção da página ou [padrao])."""
+    padrao = orcamento.get("padrao", {})
+    violacoes = []
+    print(f"{'Página':<18} | " + " | ".join(f"{limite:>18}" for limite in LIMITES))
+    for rotulo, medida in medidas.items():
+        limites = {**padrao, **orcamento.get(chave_pagina(rotulo), {})}
+        celulas = []
+        for limite in LIMITES:
+            valor, maximo = medida[limite], limites.get(limite)
+            estourou = maximo is not None and valor > maximo
+            celulas.append(f"{valor:>6} / {maximo if maximo is not None else '-':>6}{' ⚠️' if estourou else '   '}  ")
+            if estourou:
+                violacoes.append(f"{rotulo}: {limite} = {valor} (limite {maximo})")
+        print(f"{rotulo:<18} | " + " | ".join(celulas))
+        if detalhar:
+            for chamada in medida["detalhes"]:
+                if chamada["nivel"] == 0 and chamada["camada"] == "backend":
+                    marca = " (repetida)" if chamada["duplicada"] else ""
+                    print(f"    {chamada['operacao']}({chamada['argumentos']}) <- {chamada['chamador']}{marca}")
+    return violacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "memoria"], default="sqlite")
+    parser.add_argument("--produtos", type=int, default=200, help="tamanho do catálogo sintético (SQLite)")
+    parser.add_argument("--orcamento", default=CAMINHO_ORCAMENTO, help="arquivo TOML com os limites por página")
+    parser.add_argument("--detalhar", action="store_true", help="lista as chamadas diretas de cada página")
+    args = parser.parse_args()
+
+    violacoes = verificar(medir_backend(args.backend, args.produtos), carregar_orcamento(args.orcamento), args.detalhar)
+    if violacoes:
+        print("\nOrçamento excedido:\n  " + "\n  ".join(violacoes))
+        sys.exit(1)
+    print("\nTodas as páginas dentro do orçamento.")
+
+
+if __name__ == "__main__":
+    main()
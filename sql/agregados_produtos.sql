@@ -0,0 +1,37 @@
+-- Agregados do catálogo calculados no banco: os KPIs do Dashboard/Resumo Geral e as
+-- análises por fornecedor e por localização chegam como poucas linhas já somadas, em
+-- vez do catálogo inteiro (ver `RepositorioEstoque.obter_estatisticas`).
+--
+-- `security_invoker` faz as visões respeitarem as políticas de RLS de `produtos`.
+-- Fornecedor/localização nulos ficam fora dos grupos, como no `groupby` do pandas.
+--
+-- Uso via supabase-py:
+--   supabase.table("produtos_estatisticas").select("*").execute()
+--   supabase.table("produtos_por_fornecedor").select("*").order("valor_total", desc=True).execute()
+
+-- Uma linha: totais, itens abaixo do mínimo/acima do máximo e soma dos máximos (ocupação)
+create or replace view public.produtos_estatisticas with (security_invoker = true) as
+select count(*)::bigint                                  as total_itens,
+       coalesce(sum(quantidade), 0)::bigint              as quantidade_total,
+       coalesce(sum(quantidade * preco), 0)::float8      as valor_total,
+       count(*) filter (where quantidade < minimo)::bigint as itens_criticos,
+       count(*) filter (where quantidade > maximo)::bigint as itens_excesso,
+       coalesce(sum(maximo), 0)::bigint                  as maximo_total
+  from public.produtos;
+
+create or replace view public.produtos_por_fornecedor with (security_invoker = true) as
+select fornecedor,
+       count(*)::bigint                             as total_skus,
+       coalesce(sum(quantidade), 0)::bigint         as qtd_total,
+       coalesce(sum(quantidade * preco), 0)::float8 as valor_total
+  from public.produtos
+ where fornecedor is not null
+ group by fornecedor;
+
+create or replace view public.produtos_por_localizacao with (security_invoker = true) as
+select localizacao,
+       count(*)::bigint                     as total_skus,
+       coalesce(sum(quantidade), 0)::bigint as qtd_total
+  from public.produtos
+ where localizacao is not null
+ group by localizacao;
@@ -0,0 +1,85 @@
+-- Atualização em massa de `produtos` (reajuste de preço, mínimo, máximo e localização)
+-- com um único UPDATE sobre todos os itens que atendem ao filtro.
+--
+-- `p_filtro` (jsonb, campos combinados com AND; ao menos um é obrigatório):
+--   fornecedor, localizacao, status (código de src/core/classificacao.py) e ids (array).
+-- `p_ajuste` (jsonb): preco_percentual ou preco_valor (R$), minimo, maximo, localizacao.
+--   O preço é arredondado para 2 casas e nunca fica abaixo de 0,01.
+--
+-- A chamada é recusada (nenhuma linha alterada) se o ajuste deixar o mínimo maior ou
+-- igual ao máximo em algum item afetado. Retorna os códigos alterados; `updated_at`
+-- é atualizada pelo trigger de sql/produtos_sincronizacao.sql.
+--
+-- Uso via supabase-py:
+--   supabase.rpc("atualizar_produtos_massa", {"p_filtro": {"fornecedor": "..."},
+--                                             "p_ajuste": {"preco_percentual": 8.5}}).execute()
+
+-- Mesma classificação de `classificar_status` (sem a faixa de reposição)
+create or replace function public.produtos_status(p_quantidade numeric, p_minimo numeric, p_maximo numeric)
+returns integer
+language sql
+immutable
+as $$
+    select case
+        when p_quantidade = 0 then 0
+        when p_quantidade < p_minimo then 1
+        when p_quantidade > p_maximo then 3
+        else 4
+    end;
+$$;
+
+-- Filtro da atualização em massa (mesma regra de `atualizacao_massa.selecionar`)
+create or replace function public.produto_no_filtro(p produtos, p_filtro jsonb)
+returns boolean
+language sql
+stable
+as $$
+    select (p_filtro->>'fornecedor' is null or p.fornecedor = p_filtro->>'fornecedor')
+       and (p_filtro->>'localizacao' is null or p.localizacao = p_filtro->>'localizacao')
+       and (not p_filtro ? 'ids' or p.id in (select jsonb_array_elements_text(p_filtro->'ids')))
+       and (p_filtro->>'status' is null
+            or public.produtos_status(p.quantidade, p.minimo, p.maximo) = (p_filtro->>'status')::integer);
+$$;
+
+create or replace function public.atualizar_produtos_massa(
+    p_filtro jsonb,
+    p_ajuste jsonb
+) returns setof text
+language plpgsql
+as $$
+declare
+    v_percentual numeric := (p_ajuste->>'preco_percentual')::numeric;
+    v_valor numeric := (p_ajuste->>'preco_valor')::numeric;
+    v_minimo integer := (p_ajuste->>'minimo')::integer;
+    v_maximo integer := (p_ajuste->>'maximo')::integer;
+    v_localizacao text := p_ajuste->>'localizacao';
+begin
+    if not (p_filtro ?| array['fornecedor', 'localizacao', 'status', 'ids']) then
+        raise exception 'Informe ao menos um filtro' using errcode = 'P0001';
+    end if;
+    if v_percentual is not null and v_valor is not null then
+        raise exception 'Use o ajuste de preço em %% ou em R$, não os dois' using errcode = 'P0001';
+    end if;
+
+    if (v_minimo is not null or v_maximo is not null) and exists (
+        select 1 from produtos p
+         where public.produto_no_filtro(p, p_filtro)
+           and coalesce(v_minimo, p.minimo) >= coalesce(v_maximo, p.maximo)
+    ) then
+        raise exception 'O mínimo deve ser menor que o máximo em todos os itens afetados' using errcode = 'P0001';
+    end if;
+
+    return query
+    update produtos p
+       set preco = case
+               when v_percentual is not null then greatest(round((p.preco * (1 + v_percentual / 100))::numeric, 2), 0.01)
+               when v_valor is not null then greatest(round((p.preco + v_valor)::numeric, 2), 0.01)
+               else p.preco
+           end,
+           minimo = coalesce(v_minimo, p.minimo),
+           maximo = coalesce(v_maximo, p.maximo),
+           localizacao = coalesce(v_localizacao, p.localizacao)
+     where public.produto_no_filtro(p, p_filtro)
+    returning p.id;
+end;
+$$;
@@ -0,0 +1,16 @@
+-- Índices para a aba Histórico (paginação por chave e filtros no servidor).
+--
+-- A paginação ordena por (data desc, id desc, seq desc) e continua a partir da última
+-- linha exibida; os filtros por item e por tipo seguem a mesma ordenação. `id` é o
+-- código do item e as linhas de um lote compartilham o `now()` da transação, então
+-- (data, id) se repete: `seq` (chave da linha) desempata o cursor.
+
+alter table historico add column if not exists seq bigint generated always as identity;
+
+drop index if exists historico_data_id_idx;
+create index if not exists historico_data_id_seq_idx on historico (data desc, id desc, seq desc);
+create index if not exists historico_id_data_idx on historico (id, data desc);
+create index if not exists historico_tipo_data_idx on historico (tipo, data desc);
+
+-- Mantém as estatísticas usadas pela contagem estimada (count=estimated) atualizadas
+analyze historico;
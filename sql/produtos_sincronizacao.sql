@@ -0,0 +1,47 @@
+-- Sincronização incremental do catálogo (`produtos`).
+--
+-- `updated_at` é atualizada por trigger a cada INSERT/UPDATE e serve de marca d'água
+-- para buscar apenas as linhas alteradas. Exclusões são registradas como tombstones
+-- em `produtos_excluidos`, para que as cópias locais também removam esses itens.
+
+alter table produtos add column if not exists updated_at timestamptz not null default clock_timestamp();
+create index if not exists produtos_updated_at_idx on produtos (updated_at);
+
+create or replace function public.produtos_marcar_atualizacao()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+drop trigger if exists produtos_updated_at on produtos;
+create trigger produtos_updated_at
+    before insert or update on produtos
+    for each row execute function public.produtos_marcar_atualizacao();
+
+create table if not exists produtos_excluidos (
+    id text not null,
+    excluido_em timestamptz not null default clock_timestamp()
+);
+create index if not exists produtos_excluidos_excluido_em_idx on produtos_excluidos (excluido_em);
+
+create or replace function public.produtos_registrar_exclusao()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into produtos_excluidos (id) values (old.id);
+    return old;
+end;
+$$;
+
+drop trigger if exists produtos_tombstone on produtos;
+create trigger produtos_tombstone
+    after delete on produtos
+    for each row execute function public.produtos_registrar_exclusao();
+
+-- Tombstones antigos podem ser descartados periodicamente (ex.: com pg_cron):
+--   delete from produtos_excluidos where excluido_em < now() - interval '7 days';
@@ -0,0 +1,60 @@
+-- Movimentação atômica de estoque (Entrada/Saída) em uma única chamada RPC.
+--
+-- Aplica o delta em `produtos` com um UPDATE condicional (a Saída só é aceita se
+-- `quantidade >= p_quantidade`, avaliado sob o lock da linha) e registra a linha
+-- correspondente em `historico` na mesma transação.
+--
+-- Retorna a nova quantidade, ou NULL se o item não existir ou a Saída deixaria o
+-- estoque negativo.
+--
+-- `historico.quantidade` é o saldo final; `variacao` guarda o delta com sinal
+-- (negativo nas Saídas), de onde a previsão lê o consumo de cada Saída.
+--
+-- Aplicar no SQL Editor do Supabase. Uso via supabase-py:
+--   supabase.rpc("registrar_movimentacao", {"p_id": ..., "p_tipo": "Saída", ...}).execute()
+
+alter table public.historico add column if not exists variacao integer;
+
+create or replace function public.registrar_movimentacao(
+    p_id text,
+    p_tipo text,
+    p_quantidade integer,
+    p_observacao text default '',
+    p_usuario text default 'Sistema'
+) returns integer
+language plpgsql
+as $$
+declare
+    v_nova_quantidade integer;
+    v_nome text;
+begin
+    if p_quantidade is null or p_quantidade <= 0 then
+        return null;
+    end if;
+
+    if p_tipo = 'Entrada' then
+        update produtos
+           set quantidade = quantidade + p_quantidade
+         where id = p_id
+        returning quantidade, nome into v_nova_quantidade, v_nome;
+    elsif p_tipo = 'Saída' then
+        update produtos
+           set quantidade = quantidade - p_quantidade
+         where id = p_id
+           and quantidade >= p_quantidade
+        returning quantidade, nome into v_nova_quantidade, v_nome;
+    else
+        raise exception 'Tipo de movimentação inválido: %', p_tipo;
+    end if;
+
+    if v_nova_quantidade is null then
+        return null;
+    end if;
+
+    insert into historico (id, nome, tipo, quantidade, data, usuario, observacao, variacao)
+    values (p_id, v_nome, p_tipo, v_nova_quantidade, now(), p_usuario, p_observacao,
+            case when p_tipo = 'Entrada' then p_quantidade else -p_quantidade end);
+
+    return v_nova_quantidade;
+end;
+$$;
@@ -0,0 +1,97 @@
+-- Movimentações em lote (Entrada/Saída) em uma única chamada RPC por bloco.
+--
+-- `p_movimentos` é um array JSON de objetos {id, tipo, quantidade, observacao}.
+-- As linhas são aplicadas na ordem recebida, com o mesmo UPDATE condicional de
+-- `registrar_movimentacao` (Saída nunca deixa saldo negativo). As linhas aceitas
+-- são gravadas em `historico` com um único INSERT multi-linha ao final.
+--
+-- Depende da coluna `historico.variacao` criada em sql/registrar_movimentacao.sql.
+--
+-- Retorna uma linha de resultado por movimentação (índice base 0 no array).
+--
+-- Uso via supabase-py:
+--   supabase.rpc("registrar_movimentacoes_lote", {"p_movimentos": [...], "p_usuario": "..."}).execute()
+
+create or replace function public.registrar_movimentacoes_lote(
+    p_movimentos jsonb,
+    p_usuario text default 'Sistema'
+) returns table (linha integer, id text, aceito boolean, nova_quantidade integer, motivo text)
+language plpgsql
+as $$
+#variable_conflict use_column
+declare
+    v_mov record;
+    v_nova integer;
+    v_nome text;
+    v_hist_ids text[] := '{}';
+    v_hist_nomes text[] := '{}';
+    v_hist_tipos text[] := '{}';
+    v_hist_qtds integer[] := '{}';
+    v_hist_obs text[] := '{}';
+    v_hist_variacoes integer[] := '{}';
+begin
+    for v_mov in
+        select (e.ordem - 1)::integer as linha,
+               e.valor->>'id' as id,
+               e.valor->>'tipo' as tipo,
+               (e.valor->>'quantidade')::integer as quantidade,
+               coalesce(e.valor->>'observacao', '') as observacao
+          from jsonb_array_elements(p_movimentos) with ordinality as e(valor, ordem)
+    loop
+        v_nova := null;
+        linha := v_mov.linha;
+        id := v_mov.id;
+
+        if v_mov.quantidade is null or v_mov.quantidade <= 0 then
+            aceito := false; nova_quantidade := null; motivo := 'Quantidade inválida';
+            return next;
+            continue;
+        end if;
+
+        if v_mov.tipo = 'Entrada' then
+            update produtos p
+               set quantidade = p.quantidade + v_mov.quantidade
+             where p.id = v_mov.id
+            returning p.quantidade, p.nome into v_nova, v_nome;
+        elsif v_mov.tipo = 'Saída' then
+            update produtos p
+               set quantidade = p.quantidade - v_mov.quantidade
+             where p.id = v_mov.id
+               and p.quantidade >= v_mov.quantidade
+            returning p.quantidade, p.nome into v_nova, v_nome;
+        else
+            aceito := false; nova_quantidade := null; motivo := 'Tipo inválido';
+            return next;
+            continue;
+        end if;
+
+        if v_nova is null then
+            aceito := false;
+            nova_quantidade := null;
+            if exists (select 1 from produtos p where p.id = v_mov.id) then
+                motivo := 'Estoque insuficiente';
+            else
+                motivo := 'Item não encontrado';
+            end if;
+            return next;
+            continue;
+        end if;
+
+        v_hist_ids := v_hist_ids || v_mov.id;
+        v_hist_nomes := v_hist_nomes || v_nome;
+        v_hist_tipos := v_hist_tipos || v_mov.tipo;
+        v_hist_qtds := v_hist_qtds || v_nova;
+        v_hist_obs := v_hist_obs || v_mov.observacao;
+        v_hist_variacoes := v_hist_variacoes
+            || case when v_mov.tipo = 'Entrada' then v_mov.quantidade else -v_mov.quantidade end;
+
+        aceito := true; nova_quantidade := v_nova; motivo := null;
+        return next;
+    end loop;
+
+    insert into historico (id, nome, tipo, quantidade, data, usuario, observacao, variacao)
+    select h.id, h.nome, h.tipo, h.quantidade, now(), p_usuario, h.observacao, h.variacao
+      from unnest(v_hist_ids, v_hist_nomes, v_hist_tipos, v_hist_qtds, v_hist_obs, v_hist_variacoes)
+           as h(id, nome, tipo, quantidade, observacao, variacao);
+end;
+$$;
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from src.core.classificacao import ROTULOS_STATUS, SEM_ESTOQUE, ABAIXO_MINIMO
+from src.core.previsao import previsao_reposicao
+from src.core.metricas import metricas
+
+# Limites da Curva ABC sobre o % de valor acumulado (80/15/5)
+LIMITE_CLASSE_A = 80
+LIMITE_CLASSE_B = 95
+
+
+@metricas.instrumentar("analise")
+def calcular_curva_abc(df_estoque: pd.DataFrame) -> pd.DataFrame:
+    """Calcula a Curva ABC baseada no Valor Total de cada item (colunas numéricas)."""
+    if df_estoque.empty:
+        return pd.DataFrame()
+
+    # Ordenar por Valor Total e calcular a participação
+    df = df_estoque.sort_values(by='Valor Total', ascending=False).reset_index(drop=True)
+    df['Valor Acumulado'] = df['Valor Total'].cumsum()
+
+    valor_total_estoque = df['Valor Total'].sum()
+
+    df['% Valor Acumulado'] = (df['Valor Acumulado'] / valor_total_estoque) * 100
+    df['% Item Acumulado'] = (df.index + 1) / len(df) * 100
+
+    # Classificação ABC
+    df['Classe ABC'] = np.select(
+        [df['% Valor Acumulado'] <= LIMITE_CLASSE_A, df['% Valor Acumulado'] <= LIMITE_CLASSE_B],
+        ['A', 'B'], default='C'
+    )
+
+    return df[['Código', 'nome', 'Quantidade', 'Valor Total', 'Classe ABC', '% Valor Acumulado', '% Item Acumulado', 'Fornecedor', 'Localização']]
+
+
+@metricas.instrumentar("analise")
+def resumo_curva_abc(df_abc: pd.DataFrame) -> pd.DataFrame:
+    """Total de SKUs e % de valor acumulado até o último item de cada classe."""
+    return df_abc.groupby('Classe ABC').agg(
+        Total_SKUs=('Código', 'count'),
+        **{'% Valor Total': ('% Valor Acumulado', 'max')}
+    ).reset_index().sort_values('Classe ABC')
+
+
+@metricas.instrumentar("analise")
+def analise_por_fornecedor(df_estoque: pd.DataFrame) -> pd.DataFrame:
+    """SKUs, quantidade e valor total por fornecedor (maior valor primeiro)."""
+    return df_estoque.groupby('Fornecedor').agg(
+        Total_SKUs=('Código', 'count'),
+        Qtd_Total=('Quantidade', 'sum'),
+        Valor_Total=('Valor Total', 'sum')
+    ).reset_index().sort_values('Valor_Total', ascending=False)
+
+
+@metricas.instrumentar("analise")
+def analise_por_localizacao(df_estoque: pd.DataFrame) -> pd.DataFrame:
+    """SKUs e quantidade total por localização (maior quantidade primeiro)."""
+    return df_estoque.groupby('Localização').agg(
+        Total_SKUs=('Código', 'count'),
+        Qtd_Total=('Quantidade', 'sum')
+    ).reset_index().sort_values('Qtd_Total', ascending=False)
+
+
+@metricas.instrumentar("analise")
+def itens_criticos(df_estoque: pd.DataFrame) -> pd.DataFrame:
+    """Itens sem estoque ou abaixo do mínimo, do menor saldo para o maior."""
+    return df_estoque[
+        df_estoque['Status'].isin([ROTULOS_STATUS[SEM_ESTOQUE], ROTULOS_STATUS[ABAIXO_MINIMO]])
+    ].sort_values('Quantidade', ascending=True)
+
+
+@metricas.instrumentar("analise")
+def itens_para_reposicao(df_estoque: pd.DataFrame, consumo: pd.Series, prazo_entrega_dias: int = 0,
+                         horizonte_dias: float = 100) -> pd.DataFrame:
+    """Previsão de reposição restrita aos itens que atingem o mínimo dentro do horizonte."""
+    df_previsao = previsao_reposicao(df_estoque, consumo, prazo_entrega_dias)
+    return df_previsao[
+        (df_previsao['Qtd. Atual'] < df_previsao['Máximo']) &
+        (df_previsao['Dias até Mínimo'] <= horizonte_dias)
+    ].sort_values('Dias até Mínimo', ascending=True)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Tuple
+from src.core.classificacao import classificar_status, ROTULOS_STATUS, REPOSICAO
+
+# Filtro: {"fornecedor", "localizacao", "status" (código de classificacao), "ids"}; todos combinados com AND
+CAMPOS_FILTRO = ("fornecedor", "localizacao", "status", "ids")
+# Ajuste: preço em % ou em R$ (um dos dois) e novos mínimo, máximo e localização
+CAMPOS_AJUSTE = ("preco_percentual", "preco_valor", "minimo", "maximo", "localizacao")
+PRECO_MINIMO = 0.01  # o ajuste nunca deixa um preço abaixo do aceito no cadastro
+MOTIVO_MINIMO_MAXIMO = "o mínimo deve ser menor que o máximo em todos os itens afetados"
+
+# Nomes das colunas em `produtos` e no relatório (`montar_relatorio`)
+COLUNAS_PRODUTOS = {"id": "id", "fornecedor": "fornecedor", "localizacao": "localizacao", "quantidade": "quantidade",
+                    "minimo": "minimo", "maximo": "maximo", "preco": "preco"}
+COLUNAS_RELATORIO = {"id": "Código", "fornecedor": "Fornecedor", "localizacao": "Localização",
+                     "quantidade": "Quantidade", "minimo": "Mínimo", "maximo": "Máximo", "preco": "Preço"}
+
+
+def normalizar(filtro: Dict[str, Any], ajuste: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Remove campos vazios, converte os tipos e valida filtro e ajuste (ValueError se inválidos).
+
+    Exige ao menos um filtro: a atualização em massa nunca se aplica ao catálogo inteiro.
+    """
+    invalidos = set(filtro) - set(CAMPOS_FILTRO) | set(ajuste) - set(CAMPOS_AJUSTE)
+    if invalidos:
+        raise ValueError(f"Campos não suportados: {', '.join(sorted(invalidos))}")
+
+    filtro = {campo: valor for campo, valor in filtro.items() if valor not in (None, "", [])}
+    ajuste = {campo: valor for campo, valor in ajuste.items() if valor not in (None, "")}
+    if not filtro:
+        raise ValueError("Informe ao menos um filtro (fornecedor, localização, status ou códigos).")
+    if not ajuste:
+        raise ValueError("Informe ao menos um ajuste (preço, mínimo, máximo ou localização).")
+    if "preco_percentual" in ajuste and "preco_valor" in ajuste:
+        raise ValueError("Use o ajuste de preço em % ou em R$, não os dois.")
+
+    if "ids" in filtro:
+        filtro["ids"] = [str(item_id) for item_id in filtro["ids"]]
+    if "status" in filtro:
+        filtro["status"] = int(filtro["status"])
+        if filtro["status"] not in ROTULOS_STATUS or filtro["status"] == REPOSICAO:
+            raise ValueError(f"Status inválido: {filtro['status']}")
+    for campo in ("preco_percentual", "preco_valor"):
+        if campo in ajuste:
+            ajuste[campo] = float(ajuste[campo])
+    if ajuste.get("preco_percentual", 0) <= -100:
+        raise ValueError("O ajuste percentual deve ser maior que -100%.")
+    for campo in ("minimo", "maximo"):
+        if campo in ajuste:
+            ajuste[campo] = int(ajuste[campo])
+            if ajuste[campo] < 0:
+                raise ValueError(f"O {campo} não pode ser negativo.")
+    return filtro, ajuste
+
+
+def selecionar(df: pd.DataFrame, filtro: Dict[str, Any], colunas: Dict[str, str] = COLUNAS_RELATORIO) -> np.ndarray:
+    """Máscara booleana das linhas que atendem ao filtro (mesma regra do UPDATE no banco)."""
+    mascara = np.ones(len(df), dtype=bool)
+    if df.empty:
+        return mascara
+    if "fornecedor" in filtro:
+        mascara &= (df[colunas["fornecedor"]] == filtro["fornecedor"]).to_numpy()
+    if "localizacao" in filtro:
+        mascara &= (df[colunas["localizacao"]] == filtro["localizacao"]).to_numpy()
+    if "ids" in filtro:
+        mascara &= df[colunas["id"]].isin(filtro["ids"]).to_numpy()
+    if "status" in filtro:
+        status = classificar_status(df[colunas["quantidade"]], df[colunas["minimo"]], df[colunas["maximo"]])
+        mascara &= status == filtro["status"]
+    return mascara
+
+
+def arredondar_preco(precos) -> np.ndarray:
+    """Duas casas com meio para cima (como `round` do PostgreSQL e do SQLite), nunca abaixo de PRECO_MINIMO."""
+    # O arredondamento intermediário descarta o erro binário (4.2 * 1.075 = 4.51499...), como o banco faz
+    centavos = np.floor(np.round(np.asarray(precos, dtype=float) * 100, 6) + 0.5)
+    return np.maximum(centavos / 100, PRECO_MINIMO)
+
+
+def novos_valores(df: pd.DataFrame, ajuste: Dict[str, Any],
+                  colunas: Dict[str, str] = COLUNAS_RELATORIO) -> Dict[str, np.ndarray]:
+    """Valores de cada campo ajustado (preco, minimo, maximo, localizacao) para as linhas de `df`."""
+    precos = df[colunas["preco"]].to_numpy(dtype=float)
+    valores = {}
+    if "preco_percentual" in ajuste:
+        valores["preco"] = arredondar_preco(precos * (1 + ajuste["preco_percentual"] / 100))
+    elif "preco_valor" in ajuste:
+        valores["preco"] = arredondar_preco(precos + ajuste["preco_valor"])
+    for campo in ("minimo", "maximo", "localizacao"):
+        if campo in ajuste:
+            valores[campo] = np.full(len(df), ajuste[campo], dtype=object if campo == "localizacao" else np.int64)
+    return valores
+
+
+def conflitos_minimo_maximo(df: pd.DataFrame, ajuste: Dict[str, Any],
+                            colunas: Dict[str, str] = COLUNAS_RELATORIO) -> np.ndarray:
+    """Máscara das linhas em que o ajuste deixaria o mínimo maior ou igual ao máximo."""
+    if "minimo" not in ajuste and "maximo" not in ajuste:
+        return np.zeros(len(df), dtype=bool)
+    minimo = np.full(len(df), ajuste["minimo"]) if "minimo" in ajuste else df[colunas["minimo"]].to_numpy()
+    maximo = np.full(len(df), ajuste["maximo"]) if "maximo" in ajuste else df[colunas["maximo"]].to_numpy()
+    return minimo >= maximo
+
+
+def previa_atualizacao(catalogo: pd.DataFrame, filtro: Dict[str, Any], ajuste: Dict[str, Any]) -> pd.DataFrame:
+    """Linhas afetadas do relatório com os valores atuais e novos e o impacto no valor em estoque."""
+    filtro, ajuste = normalizar(filtro, ajuste)
+    afetados = catalogo[selecionar(catalogo, filtro)] if not catalogo.empty else catalogo
+    colunas = ["Código", "nome", "Fornecedor", "Localização", "Status", "Quantidade", "Mínimo", "Máximo", "Preço"]
+    previa = afetados[colunas].reset_index(drop=True) if not afetados.empty else pd.DataFrame(columns=colunas)
+
+    novos = novos_valores(previa, ajuste)
+    rotulos = {"preco": "Novo Preço", "minimo": "Novo Mínimo", "maximo": "Novo Máximo",
+               "localizacao": "Nova Localização"}
+    for campo, valores in novos.items():
+        previa[rotulos[campo]] = valores
+    preco_novo = previa["Novo Preço"] if "Novo Preço" in previa else previa["Preço"]
+    previa["Valor Total"] = previa["Quantidade"] * previa["Preço"]
+    previa["Novo Valor Total"] = previa["Quantidade"] * preco_novo
+    previa["Diferença"] = previa["Novo Valor Total"] - previa["Valor Total"]
+    previa["Conflito Mín/Máx"] = conflitos_minimo_maximo(previa, ajuste)
+    return previa
+
+
+def resumo_previa(previa: pd.DataFrame) -> Dict[str, Any]:
+    """Itens afetados, valor em estoque antes/depois, impacto e itens com conflito de mínimo/máximo."""
+    return {
+        "itens": len(previa),
+        "valor_atual": float(previa["Valor Total"].sum()),
+        "valor_novo": float(previa["Novo Valor Total"].sum()),
+        "impacto": float(previa["Diferença"].sum()),
+        "conflitos": int(previa["Conflito Mín/Máx"].sum()),
+    }
+
+
+def ids_da_lista(texto: str) -> List[str]:
+    """Códigos digitados separados por vírgula, ponto e vírgula, espaço ou linha."""
+    return [parte for parte in texto.replace(";", ",").replace("\n", ",").replace(" ", ",").split(",") if parte]
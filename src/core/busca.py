@@ -0,0 +1,187 @@
+import threading
+import unicodedata
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, Optional
+
+SEPARADOR_CAMPOS = "\x01"  # entre código e nome: trigramas não atravessam os campos
+# Camada incremental maior que esta fração do índice base dispara uma reconstrução
+FRACAO_COMPACTACAO = 0.2
+MINIMO_COMPACTACAO = 1000
+
+
+def normalizar_texto(texto) -> str:
+    """Minúsculas e sem acentos ('ABRAÇADEIRA' -> 'abracadeira')."""
+    return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _unicos(valores: np.ndarray) -> np.ndarray:
+    """Valores distintos e ordenados (sort + máscara; mais rápido que np.unique aqui)."""
+    valores = np.sort(valores)
+    return valores[np.concatenate(([True], valores[1:] != valores[:-1]))] if len(valores) else valores
+
+
+def _trigramas(texto: str) -> np.ndarray:
+    """Códigos inteiros (7 bits por caractere ASCII) dos trigramas distintos de um texto."""
+    b = np.frombuffer(texto.encode("ascii"), dtype=np.uint8).astype(np.int64)
+    if len(b) < 3:
+        return np.empty(0, dtype=np.int64)
+    a, m, c = b[:-2], b[1:-1], b[2:]
+    return _unicos(((a << 14) | (m << 7) | c)[(a > 1) & (m > 1) & (c > 1)])
+
+
+class IndiceBusca:
+    """Índice invertido de trigramas sobre código e nome, sem acentos.
+
+    A base é um CSR em arrays numpy (trigrama -> slots ordenados), construída de uma
+    vez por versão do catálogo; inclusões/alterações entram numa camada incremental
+    (novo slot por item) e exclusões apenas desligam o slot, até a próxima
+    reconstrução. A busca intersecta as listas dos trigramas do termo e confirma os
+    candidatos com uma comparação de substring, então o resultado é exato.
+    Termos com menos de 3 caracteres não têm trigramas e caem numa varredura.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ref_catalogo = None
+        self._mapa_posicoes = None
+        self._construir([], [])
+
+    def _construir(self, codigos: List[str], textos: List[str]):
+        n = len(textos)
+        self._codigos = list(codigos)   # slot -> código
+        self._textos = list(textos)     # slot -> texto normalizado
+        self._slot = {codigo: slot for slot, codigo in enumerate(self._codigos)}
+        self._vivo = bytearray(b"\x01" * n)  # slot -> ainda válido (máscara numpy sem cópia)
+        self._delta = {}                # trigrama -> slots incluídos após a base
+        self._n_base = n
+
+        if n == 0:
+            self._ngramas = np.empty(0, dtype=np.int64)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._postings = np.empty(0, dtype=np.int32)
+            return
+
+        # Todos os textos num único buffer separado por \x00; janelas com bytes de
+        # controle (separadores) são descartadas, então nenhum trigrama atravessa itens
+        b = np.frombuffer("\x00".join(textos).encode("ascii"), dtype=np.uint8).astype(np.int64)
+        tamanhos = np.fromiter(map(len, textos), dtype=np.int64, count=n)
+        slots = np.repeat(np.arange(n, dtype=np.int64), tamanhos + 1)[:len(b)]
+        a, m, c = b[:-2], b[1:-1], b[2:]
+        validos = (a > 1) & (m > 1) & (c > 1)
+        chaves = _unicos((((a << 14) | (m << 7) | c)[validos] << 32) | slots[:-2][validos])
+
+        # Chaves ordenadas por (trigrama, slot): cada trigrama ocupa uma faixa contígua
+        self._postings = (chaves & 0xFFFFFFFF).astype(np.int32)
+        ngramas = chaves >> 32
+        novo = np.ones(len(ngramas), dtype=bool)  # vazio se nenhum texto tem 3 caracteres
+        novo[1:] = ngramas[1:] != ngramas[:-1]
+        inicios = np.flatnonzero(novo)
+        self._ngramas = ngramas[inicios]
+        self._offsets = np.append(inicios, len(chaves))
+
+    def reconstruir(self, codigos: Iterable, nomes: Iterable):
+        """Reconstrói o índice inteiro para uma nova versão do catálogo."""
+        codigos = [str(codigo) for codigo in codigos]
+        textos = [normalizar_texto(codigo) + SEPARADOR_CAMPOS + normalizar_texto(nome)
+                  for codigo, nome in zip(codigos, nomes)]
+        with self._lock:
+            self._construir(codigos, textos)
+
+    def atualizar(self, codigo, nome):
+        """Inclui ou altera um item (novo slot na camada incremental)."""
+        codigo = str(codigo)
+        texto = normalizar_texto(codigo) + SEPARADOR_CAMPOS + normalizar_texto(nome)
+        with self._lock:
+            slot_atual = self._slot.get(codigo)
+            if slot_atual is not None:
+                if self._textos[slot_atual] == texto:
+                    return
+                self._vivo[slot_atual] = 0
+            slot = len(self._codigos)
+            self._codigos.append(codigo)
+            self._textos.append(texto)
+            self._vivo.append(1)
+            self._slot[codigo] = slot
+            for ngrama in _trigramas(texto).tolist():
+                self._delta.setdefault(ngrama, []).append(slot)
+
+            if len(self._codigos) - self._n_base > max(MINIMO_COMPACTACAO, FRACAO_COMPACTACAO * self._n_base):
+                self._compactar()
+
+    def atualizar_lote(self, codigos: Iterable, nomes: Iterable):
+        """Aplica `atualizar` a vários itens."""
+        with self._lock:
+            for codigo, nome in zip(codigos, nomes):
+                self.atualizar(codigo, nome)
+
+    def remover(self, codigo):
+        """Remove um item (o slot deixa de ser válido)."""
+        with self._lock:
+            slot = self._slot.pop(str(codigo), None)
+            if slot is not None:
+                self._vivo[slot] = 0
+
+    def _compactar(self):
+        vivos = sorted(self._slot.values())
+        self._construir([self._codigos[s] for s in vivos], [self._textos[s] for s in vivos])
+
+    def _lista(self, ngrama: int) -> np.ndarray:
+        """Slots (ordenados) que contêm o trigrama: base + camada incremental."""
+        i = np.searchsorted(self._ngramas, ngrama)
+        base = (self._postings[self._offsets[i]:self._offsets[i + 1]]
+                if i < len(self._ngramas) and self._ngramas[i] == ngrama else self._postings[:0])
+        extra = self._delta.get(ngrama)
+        # Slots incrementais são sempre maiores que os da base: a concatenação segue ordenada
+        return np.concatenate([base, np.asarray(extra, dtype=np.int32)]) if extra else base
+
+    def buscar(self, termo: str) -> Optional[List[str]]:
+        """Códigos cujo código ou nome contém o termo (None para termo vazio)."""
+        termo = normalizar_texto(termo).strip()
+        if not termo:
+            return None
+
+        with self._lock:
+            vivo = np.frombuffer(self._vivo, dtype=bool)
+            ngramas = _trigramas(termo)
+            if len(ngramas) == 0:
+                candidatos = np.flatnonzero(vivo)
+            else:
+                listas = sorted((self._lista(g) for g in ngramas.tolist()), key=len)
+                candidatos = listas[0]
+                # Interseção guiada pela menor lista: busca binária nas demais
+                for lista in listas[1:]:
+                    if len(candidatos) == 0:
+                        break
+                    i = np.minimum(np.searchsorted(lista, candidatos), len(lista) - 1)
+                    candidatos = candidatos[lista[i] == candidatos]
+                candidatos = candidatos[vivo[candidatos]]
+
+            # Confirmação: conter todos os trigramas não garante conter o termo contíguo
+            textos, codigos = self._textos, self._codigos
+            return [codigos[s] for s in candidatos.tolist() if termo in textos[s]]
+
+    def posicoes(self, termo: str, catalogo: pd.DataFrame, coluna: str = "Código") -> Optional[np.ndarray]:
+        """Posições (para `iloc`) das linhas do catálogo que casam com o termo (None sem termo).
+
+        O mapa código -> posição é montado uma vez por DataFrame de catálogo (os
+        relatórios cacheados devolvem o mesmo objeto até a próxima invalidação).
+        """
+        codigos = self.buscar(termo)
+        if codigos is None:
+            return None
+        with self._lock:
+            if self._ref_catalogo is None or self._ref_catalogo() is not catalogo:
+                self._mapa_posicoes = pd.Index(catalogo[coluna].astype(str))
+                self._ref_catalogo = weakref.ref(catalogo)
+            mapa = self._mapa_posicoes
+        posicoes = mapa.get_indexer(codigos)
+        return np.sort(posicoes[posicoes >= 0])
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+
+# Instância única do processo, mantida pelo sincronizador do catálogo
+indice_catalogo = IndiceBusca()
@@ -0,0 +1,167 @@
+import itertools
+import threading
+import time
+import weakref
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class CacheDependente:
+    """Cache em memória compartilhado pelo processo, com invalidação por tabela e por chave.
+
+    Cada visão cacheada declara de quais tabelas depende. Uma escrita invalida apenas
+    as visões daquela tabela (ou, para visões indexadas por chave, apenas as chaves
+    afetadas), em vez de limpar todo o cache como `st.cache_data.clear()`.
+    As entradas são separadas por instância: dois gerenciadores da mesma classe (ex.:
+    dois arquivos SQLite no mesmo processo) nunca compartilham resultados.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # (visao, instancia, chave_args) -> (valor, expira_em, tabelas, chave_item)
+        self._entradas: Dict[Tuple[str, int, Hashable], Tuple[Any, float, Tuple[str, ...], Optional[Hashable]]] = {}
+        # Número de cada instância (não reaproveitado como `id()` após a coleta do objeto)
+        self._instancias: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+        self._proxima_instancia = itertools.count(1)
+        # Geração de cada tabela: impede que uma leitura iniciada antes de uma escrita
+        # grave um valor já desatualizado no cache.
+        self._geracoes: Dict[str, int] = {}
+        # Relógio lógico das escritas: instante da última escrita de cada (tabela, chave),
+        # de cada tabela inteira e da última limpeza, para validar cópias feitas fora do cache
+        self._relogio = 0
+        self._escritas: Dict[Tuple[str, Hashable], int] = {}
+        self._escritas_tabela: Dict[str, int] = {}
+        self._limpo_em = 0
+        self._metricas: Dict[str, Dict[str, int]] = {}
+
+    def _metrica(self, visao: str) -> Dict[str, int]:
+        if visao not in self._metricas:
+            self._metricas[visao] = {"hits": 0, "misses": 0, "invalidacoes": 0}
+        return self._metricas[visao]
+
+    def _instancia(self, objeto: Any) -> int:
+        """Número da instância dona das entradas (chamado sob o lock)."""
+        numero = self._instancias.get(objeto)
+        if numero is None:
+            numero = self._instancias[objeto] = next(self._proxima_instancia)
+        return numero
+
+    def geracao(self, tabela: str) -> int:
+        """Retorna a geração atual de uma tabela (incrementada a cada invalidação)."""
+        with self._lock:
+            return self._geracoes.get(tabela, 0)
+
+    def relogio(self) -> int:
+        """Instante lógico atual; tomado antes de uma leitura, serve para `alterado_desde`."""
+        with self._lock:
+            return self._relogio
+
+    def alterado_desde(self, tabela: str, chave: Hashable, instante: int) -> bool:
+        """Indica se a chave (ou a tabela inteira) foi escrita ou o cache limpo depois de `instante`."""
+        with self._lock:
+            ultima = max(self._escritas.get((tabela, chave), 0), self._escritas_tabela.get(tabela, 0), self._limpo_em)
+            return ultima > instante
+
+    def consultar(self, metodo: Callable, *args, **kwargs) -> Optional[Any]:
+        """Valor já cacheado de um método `memorizar` ligado à instância (None se ausente ou expirado), sem executá-lo."""
+        visao = getattr(metodo, "visao", None)
+        with self._lock:
+            chave = (visao, self._instancia(metodo.__self__), (args, tuple(sorted(kwargs.items()))))
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[1] > time.monotonic():
+                return entrada[0]
+            return None
+
+    def memorizar(self, tabelas: Iterable[str], ttl: float = 60, por_chave: bool = False) -> Callable:
+        """Decorador de métodos: cacheia o retorno por instância e argumentos.
+
+        `tabelas` lista as tabelas das quais a visão depende. Com `por_chave=True`, o
+        primeiro argumento é tratado como a chave do registro (ex.: id do item), o que
+        permite invalidações pontuais via `invalidar(tabela, chaves=[...])`.
+        """
+        tabelas = tuple(tabelas)
+
+        def decorador(func: Callable) -> Callable:
+            visao = func.__qualname__
+
+            @wraps(func)
+            def wrapper(_self, *args, **kwargs):
+                chave_args = (args, tuple(sorted(kwargs.items())))
+                agora = time.monotonic()
+
+                with self._lock:
+                    chave = (visao, self._instancia(_self), chave_args)
+                    entrada = self._entradas.get(chave)
+                    if entrada is not None and entrada[1] > agora:
+                        self._metrica(visao)["hits"] += 1
+                        return entrada[0]
+                    self._metrica(visao)["misses"] += 1
+                    geracoes_inicio = tuple(self._geracoes.get(t, 0) for t in tabelas)
+
+                # Executa fora do lock para não serializar as sessões
+                valor = func(_self, *args, **kwargs)
+
+                with self._lock:
+                    geracoes_fim = tuple(self._geracoes.get(t, 0) for t in tabelas)
+                    if geracoes_inicio == geracoes_fim:
+                        chave_item = args[0] if por_chave and args else None
+                        self._entradas[chave] = (valor, time.monotonic() + ttl, tabelas, chave_item)
+                return valor
+
+            wrapper.visao = visao
+            return wrapper
+
+        return decorador
+
+    def invalidar(self, tabela: str, chaves: Optional[Iterable[Hashable]] = None) -> int:
+        """Invalida as visões que dependem de `tabela` e retorna quantas entradas foram removidas.
+
+        Com `chaves`, visões indexadas por chave só perdem as entradas dessas chaves;
+        visões agregadas sobre a tabela inteira são sempre invalidadas.
+        """
+        chaves = set(chaves) if chaves is not None else None
+        with self._lock:
+            self._geracoes[tabela] = self._geracoes.get(tabela, 0) + 1
+            self._relogio += 1
+            if chaves is None:
+                self._escritas_tabela[tabela] = self._relogio
+            else:
+                for chave_item in chaves:
+                    self._escritas[(tabela, chave_item)] = self._relogio
+            remover = []
+            for chave, (_, _, tabelas, chave_item) in self._entradas.items():
+                if tabela not in tabelas:
+                    continue
+                if chaves is not None and chave_item is not None and chave_item not in chaves:
+                    continue
+                remover.append(chave)
+            for chave in remover:
+                del self._entradas[chave]
+                self._metrica(chave[0])["invalidacoes"] += 1
+            return len(remover)
+
+    def limpar(self):
+        """Remove todas as entradas do cache (equivalente ao antigo `st.cache_data.clear()`)."""
+        with self._lock:
+            for tabela in list(self._geracoes):
+                self._geracoes[tabela] += 1
+            self._relogio += 1
+            self._limpo_em = self._relogio
+            self._entradas.clear()
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna contadores de hit/miss/invalidação e a taxa de acerto por visão."""
+        with self._lock:
+            resultado = {}
+            for visao, m in self._metricas.items():
+                total = m["hits"] + m["misses"]
+                resultado[visao] = {
+                    **m,
+                    "entradas": sum(1 for chave in self._entradas if chave[0] == visao),
+                    "taxa_acerto": (m["hits"] / total) if total else 0.0,
+                }
+            return resultado
+
+
+# Instância única do processo (mesmo escopo do antigo st.cache_data)
+cache_dados = CacheDependente()
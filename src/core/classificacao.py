@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Códigos de status (ordem de precedência da classificação)
+SEM_ESTOQUE = 0
+ABAIXO_MINIMO = 1
+REPOSICAO = 2
+ACIMA_MAXIMO = 3
+NORMAL = 4
+
+ROTULOS_STATUS = {
+    SEM_ESTOQUE: "🔴 Sem Estoque",
+    ABAIXO_MINIMO: "🟡 Abaixo do Mínimo",
+    REPOSICAO: "🔵 Reposição",
+    ACIMA_MAXIMO: "🟠 Acima do Máximo",
+    NORMAL: "🟢 Normal",
+}
+
+# Cores usadas nos gráficos de distribuição por status
+CORES_STATUS = {
+    ROTULOS_STATUS[NORMAL]: "#2ca02c",
+    ROTULOS_STATUS[ABAIXO_MINIMO]: "#ff7f0e",
+    ROTULOS_STATUS[SEM_ESTOQUE]: "#d62728",
+    ROTULOS_STATUS[ACIMA_MAXIMO]: "#1f77b4",
+    ROTULOS_STATUS[REPOSICAO]: "#9467bd",
+}
+
+# Faixa de alerta de reposição: acima do mínimo, mas abaixo de 120% dele
+FATOR_REPOSICAO = 1.2
+
+
+def classificar_status(quantidade, minimo, maximo, incluir_reposicao: bool = False) -> np.ndarray:
+    """Classifica todos os itens de uma vez e retorna um array de códigos (int8).
+
+    Mesma precedência das antigas regras linha a linha: sem estoque, abaixo do mínimo,
+    (opcionalmente) reposição, acima do máximo e, por fim, normal.
+    """
+    qtd = np.asarray(quantidade, dtype=float)
+    minimo = np.asarray(minimo, dtype=float)
+    maximo = np.asarray(maximo, dtype=float)
+
+    condicoes = [qtd == 0, qtd < minimo]
+    codigos = [SEM_ESTOQUE, ABAIXO_MINIMO]
+    if incluir_reposicao:
+        condicoes.append(qtd < minimo * FATOR_REPOSICAO)
+        codigos.append(REPOSICAO)
+    condicoes.append(qtd > maximo)
+    codigos.append(ACIMA_MAXIMO)
+
+    return np.select(condicoes, codigos, default=NORMAL).astype(np.int8)
+
+
+def status_categorico(quantidade, minimo, maximo, incluir_reposicao: bool = False) -> pd.Categorical:
+    """Retorna a coluna 'Status' como categórica (rótulos legíveis sobre códigos int8)."""
+    codigos = classificar_status(quantidade, minimo, maximo, incluir_reposicao)
+    categorias = [ROTULOS_STATUS[c] for c in sorted(ROTULOS_STATUS) if incluir_reposicao or c != REPOSICAO]
+    # from_codes exige códigos contíguos às categorias: remapeia quando a reposição fica de fora
+    if not incluir_reposicao:
+        codigos = np.where(codigos > REPOSICAO, codigos - 1, codigos)
+    return pd.Categorical.from_codes(codigos, categories=categorias)
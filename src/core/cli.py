@@ -0,0 +1,113 @@
+"""Linha de comando para rodar relatórios, importações e a previsão de reposição em lote.
+
+Exemplos:
+    python -m src.core.cli relatorio --tipo abc --formato parquet --saida abc.parquet
+    python -m src.core.cli relatorio --tipo catalogo --formato csv > catalogo.csv
+    python -m src.core.cli reposicao --metodo exponencial --prazo 10 --saida reposicao.csv
+    python -m src.core.cli importar lote1.csv lote2.xlsx --processos 2
+
+O backend e as credenciais vêm de `.streamlit/secrets.toml` ou das variáveis de
+ambiente ESTOQUE_BACKEND, ESTOQUE_SQLITE, SUPABASE_URL e SUPABASE_KEY.
+"""
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, List, Optional
+from src.core import tarefas
+from src.core.configuracao import BACKENDS, carregar_configuracao, criar_manager
+from src.core.exportacao import exportar_blocos, fatiar, escrever_arquivo
+from src.core.importacao import TAMANHO_BLOCO_IMPORTACAO
+from src.core.previsao import METODOS_CONSUMO
+
+FORMATOS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+
+
+def _gravar(pedacos: Iterable[bytes], saida: Optional[str]) -> int:
+    """Grava na saída indicada (ou no stdout), bloco a bloco."""
+    if saida is None:
+        return escrever_arquivo(pedacos, sys.stdout.buffer)
+    with open(saida, "wb") as destino:
+        return escrever_arquivo(pedacos, destino)
+
+
+def _relatorio(args, config) -> int:
+    formato = FORMATOS[args.formato]
+    if args.tipo == "estatisticas":
+        print(json.dumps(tarefas.obter_estatisticas(args.backend, config), ensure_ascii=False, default=str))
+        return 0
+    if args.tipo == "catalogo":
+        pedacos = criar_manager(args.backend, config).exportar_catalogo(formato)
+    else:
+        pedacos = exportar_blocos(fatiar(tarefas.gerar_relatorio(args.tipo, args.backend, config)), formato)
+    _gravar(pedacos, args.saida)
+    return 0
+
+
+def _reposicao(args, config) -> int:
+    df = tarefas.calcular_reposicao(args.metodo, args.janela, args.alpha, args.prazo, args.horizonte,
+                                    args.backend, config)
+    _gravar(exportar_blocos(fatiar(df), FORMATOS[args.formato]), args.saida)
+    return 0
+
+
+def _importar(args, config) -> int:
+    tarefa = partial(tarefas.importar_arquivo, atualizar_existentes=args.atualizar, tamanho_bloco=args.bloco,
+                     salvar_rejeitadas=args.salvar_rejeitadas, backend=args.backend, config=config)
+    if args.processos > 1 and len(args.arquivos) > 1:
+        # Um arquivo por processo; cada worker cria o próprio gerenciador e pool HTTP
+        with ProcessPoolExecutor(max_workers=args.processos) as pool:
+            resumos = list(pool.map(tarefa, args.arquivos))
+    else:
+        resumos = [tarefa(caminho) for caminho in args.arquivos]
+
+    for resumo in resumos:
+        print(json.dumps(resumo, ensure_ascii=False))
+    return 0 if all(r["linhas"] == r["importadas"] + r["rejeitadas"] for r in resumos) else 1
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.core.cli", description="Gestão de Estoque em lote.")
+    parser.add_argument("--backend", choices=BACKENDS,
+                        help="Origem dos dados (padrão: [banco] backend do secrets.toml ou supabase; "
+                             "'memoria' usa o catálogo de exemplo).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    relatorio = comandos.add_parser("relatorio", help="Exporta um relatório do catálogo.")
+    relatorio.add_argument("--tipo", choices=["catalogo", "estatisticas", *tarefas.RELATORIOS], default="catalogo")
+    relatorio.add_argument("--formato", choices=FORMATOS, default="csv")
+    relatorio.add_argument("--saida", help="Arquivo de destino (padrão: stdout).")
+    relatorio.set_defaults(executar=_relatorio)
+
+    reposicao = comandos.add_parser("reposicao", help="Calcula a previsão de reposição.")
+    reposicao.add_argument("--metodo", choices=METODOS_CONSUMO, default="media_movel")
+    reposicao.add_argument("--janela", type=int, default=30, help="Janela de histórico (dias).")
+    reposicao.add_argument("--alpha", type=float, default=0.3, help="Alpha da suavização exponencial.")
+    reposicao.add_argument("--prazo", type=int, default=7, help="Prazo de entrega do fornecedor (dias).")
+    reposicao.add_argument("--horizonte", type=float, default=100, help="Itens que atingem o mínimo em até N dias.")
+    reposicao.add_argument("--formato", choices=FORMATOS, default="csv")
+    reposicao.add_argument("--saida", help="Arquivo de destino (padrão: stdout).")
+    reposicao.set_defaults(executar=_reposicao)
+
+    importar = comandos.add_parser("importar", help="Importa arquivos de catálogo (CSV/XLSX).")
+    importar.add_argument("arquivos", nargs="+")
+    importar.add_argument("--atualizar", action="store_true", help="Atualiza itens com código já existente.")
+    importar.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_IMPORTACAO, help="Itens por bloco.")
+    importar.add_argument("--processos", type=int, default=1, help="Arquivos importados em paralelo.")
+    importar.add_argument("--salvar-rejeitadas", action="store_true",
+                          help="Grava as linhas recusadas em <arquivo>_rejeitadas.csv.")
+    importar.set_defaults(executar=_importar)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    args = criar_parser().parse_args(argv)
+    config = carregar_configuracao()
+    return args.executar(args, config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import threading
+import time
+import httpx
+from typing import Any, Dict, Iterator, Tuple
+from supabase import create_client, Client, ClientOptions
+from src.core.metricas import metricas
+
+MAX_CONEXOES = 20
+MAX_CONEXOES_OCIOSAS = 10
+EXPIRACAO_OCIOSA_SEGUNDOS = 30
+TIMEOUT_SEGUNDOS = 30
+
+
+class FluxoContado(httpx.SyncByteStream):
+    """Corpo da resposta que soma os bytes recebidos (comprimidos, como chegam da rede) nas métricas."""
+
+    def __init__(self, fluxo: httpx.SyncByteStream, origem: str):
+        self._fluxo = fluxo
+        self._origem = origem
+
+    def __iter__(self) -> Iterator[bytes]:
+        for parte in self._fluxo:
+            metricas.registrar_bytes(self._origem, len(parte))
+            yield parte
+
+    def close(self):
+        self._fluxo.close()
+
+
+class TransporteMedido(httpx.HTTPTransport):
+    """Transporte HTTP com pool limitado que contabiliza o uso das conexões."""
+
+    def __init__(self, limites: httpx.Limits, **kwargs):
+        super().__init__(limits=limites, **kwargs)
+        self.max_conexoes = limites.max_connections
+        self._lock = threading.Lock()
+        self._em_andamento = 0
+        self._pico = 0
+        self._total = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self._em_andamento += 1
+            self._total += 1
+            self._pico = max(self._pico, self._em_andamento)
+        inicio = time.perf_counter()
+        try:
+            resposta = super().handle_request(request)
+            # Latência até os cabeçalhos; os bytes são contados conforme o corpo é lido
+            metricas.registrar_requisicao("supabase", time.perf_counter() - inicio)
+            resposta.stream = FluxoContado(resposta.stream, "supabase")
+            return resposta
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+
+    def metricas(self) -> Dict[str, Any]:
+        """Tamanho do pool, conexões ociosas e utilização (requisições em andamento / limite)."""
+        conexoes = list(getattr(self._pool, "connections", []))
+        with self._lock:
+            return {
+                "max_conexoes": self.max_conexoes,
+                "conexoes_abertas": len(conexoes),
+                "conexoes_ociosas": sum(1 for c in conexoes if c.is_idle()),
+                "requisicoes_em_andamento": self._em_andamento,
+                "pico_em_andamento": self._pico,
+                "requisicoes_total": self._total,
+                "utilizacao": self._em_andamento / self.max_conexoes if self.max_conexoes else 0.0,
+            }
+
+
+def criar_cliente_supabase(url: str, key: str, max_conexoes: int = MAX_CONEXOES,
+                           max_ociosas: int = MAX_CONEXOES_OCIOSAS) -> Tuple[Client, TransporteMedido]:
+    """Cria o cliente Supabase sobre um único `httpx.Client` com keep-alive e pool limitado.
+
+    O mesmo cliente HTTP atende PostgREST, Auth e Storage, então as conexões TLS são
+    reaproveitadas entre todas as requisições (e sessões) que compartilham o cliente.
+    """
+    transporte = TransporteMedido(
+        httpx.Limits(
+            max_connections=max_conexoes,
+            max_keepalive_connections=max_ociosas,
+            keepalive_expiry=EXPIRACAO_OCIOSA_SEGUNDOS
+        ),
+        http2=True
+    )
+    http = httpx.Client(transport=transporte, timeout=TIMEOUT_SEGUNDOS, follow_redirects=True)
+    cliente = create_client(url, key, options=ClientOptions(httpx_client=http))
+    return cliente, transporte
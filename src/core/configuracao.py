@@ -0,0 +1,76 @@
+import os
+from typing import Any, Callable, Dict, Optional
+from src.core.conexao import MAX_CONEXOES
+from src.core.repositorio import RepositorioEstoque
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: apenas variáveis de ambiente
+    tomllib = None
+
+CAMINHO_SECRETS = os.path.join(".streamlit", "secrets.toml")
+BACKENDS = ("supabase", "sqlite", "memoria", "simulado")
+
+# Variáveis de ambiente que sobrescrevem o secrets.toml
+VARIAVEIS_AMBIENTE = {
+    "url": "SUPABASE_URL",
+    "key": "SUPABASE_KEY",
+    "max_conexoes": "SUPABASE_MAX_CONEXOES",
+    "backend": "ESTOQUE_BACKEND",
+    "caminho": "ESTOQUE_SQLITE",
+}
+
+
+def carregar_configuracao(caminho_secrets: str = CAMINHO_SECRETS) -> Dict[str, Any]:
+    """Lê as seções [supabase] e [banco] do secrets.toml do Streamlit, sobrescritas pelas VARIAVEIS_AMBIENTE.
+
+    [banco] escolhe o backend (`backend = "sqlite"`) e o arquivo do SQLite (`caminho`).
+    """
+    config: Dict[str, Any] = {}
+    if tomllib is not None and os.path.exists(caminho_secrets):
+        with open(caminho_secrets, "rb") as arquivo:
+            secrets = tomllib.load(arquivo)
+        config.update(secrets.get("supabase", {}))
+        config.update(secrets.get("banco", {}))
+    for chave, variavel in VARIAVEIS_AMBIENTE.items():
+        valor = os.environ.get(variavel)
+        if valor:
+            config[chave] = valor
+    return config
+
+
+def criar_manager(backend: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                  ao_erro: Optional[Callable[[str], None]] = None,
+                  obter_usuario: Optional[Callable[[], str]] = None) -> RepositorioEstoque:
+    """Cria o gerenciador de dados do backend escolhido, sem depender do Streamlit.
+
+    Sem `backend`, usa o de `config["backend"]` (Supabase, por padrão); "simulado" usa
+    o `ClienteSupabaseSimulado` com `latencia`/`variacao` (s) da configuração. Recebe
+    apenas valores simples (picklable), então pode ser chamado dentro de cada processo
+    de um pool: clientes HTTP e conexões não são compartilhados entre processos.
+    """
+    config = carregar_configuracao() if config is None else config
+    backend = backend or config.get("backend", "supabase")
+
+    if backend == "memoria":
+        from src.core.gestor_estoque import EstoqueManager
+        return EstoqueManager(obter_usuario=obter_usuario, ao_erro=ao_erro)
+    if backend == "sqlite":
+        from src.core.sqlite_manager import CAMINHO_PADRAO, SqliteManager
+        return SqliteManager(config.get("caminho", CAMINHO_PADRAO), ao_erro=ao_erro, obter_usuario=obter_usuario)
+    if backend == "simulado":
+        # Supabase em processo (sem rede), com latência injetada por requisição
+        from src.core.supabase_manager import SupabaseManager
+        from src.core.supabase_simulado import ClienteSupabaseSimulado
+        cliente = ClienteSupabaseSimulado(latencia=float(config.get("latencia", 0)),
+                                          variacao=float(config.get("variacao", 0)),
+                                          max_conexoes=int(config.get("max_conexoes", MAX_CONEXOES)))
+        return SupabaseManager(cliente=cliente, ao_erro=ao_erro, obter_usuario=obter_usuario)
+    if backend != "supabase":
+        raise ValueError(f"Backend desconhecido: {backend} (use um de {', '.join(BACKENDS)})")
+
+    from src.core.supabase_manager import SupabaseManager
+    if not config.get("url") or not config.get("key"):
+        raise KeyError("Credenciais do Supabase não encontradas (secrets.toml ou SUPABASE_URL/SUPABASE_KEY).")
+    return SupabaseManager(config["url"], config["key"], int(config.get("max_conexoes", MAX_CONEXOES)),
+                           ao_erro=ao_erro, obter_usuario=obter_usuario)
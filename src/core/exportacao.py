@@ -0,0 +1,130 @@
+import io
+import tempfile
+import pandas as pd
+from typing import BinaryIO, Iterable, Iterator
+from src.core.formatacao import formatar_para_exibicao
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow ficam indisponíveis; CSV continua funcionando
+    pa = None
+
+# Formato -> (extensão, MIME); Parquet e Arrow mantêm as colunas numéricas
+FORMATOS_EXPORTACAO = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.stream"),
+}
+TAMANHO_BLOCO_EXPORTACAO = 50_000
+
+
+def formatos_disponiveis() -> list:
+    """Formatos suportados no ambiente (Parquet/Arrow exigem o pyarrow)."""
+    return [f for f in FORMATOS_EXPORTACAO if f == "CSV" or pa is not None]
+
+
+def fatiar(df: pd.DataFrame, tamanho_bloco: int = TAMANHO_BLOCO_EXPORTACAO) -> Iterator[pd.DataFrame]:
+    """Divide um DataFrame em fatias (visões, sem cópia) de até `tamanho_bloco` linhas."""
+    for inicio in range(0, max(len(df), 1), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+
+class _SaidaEmBlocos(io.RawIOBase):
+    """Destino de escrita que acumula apenas os bytes ainda não entregues.
+
+    O Parquet grava offsets absolutos no rodapé, então `tell` reflete o total já
+    escrito mesmo depois que os blocos anteriores foram consumidos.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        dados = bytes(dados)
+        self._partes.append(dados)
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def retirar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes = []
+        return dados
+
+
+def _csv_em_blocos(blocos: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    cabecalho = True
+    for bloco in blocos:
+        texto = formatar_para_exibicao(bloco).to_csv(index=False, sep=";", header=cabecalho)
+        # BOM apenas no início, para o Excel reconhecer o UTF-8
+        yield ("\ufeff" + texto if cabecalho else texto).encode("utf-8")
+        cabecalho = False
+
+
+def _esquema_estavel(esquema: "pa.Schema") -> "pa.Schema":
+    """Alarga inteiros para int64 e colunas nulas para texto (outras fatias podem ter outros dtypes)."""
+    campos = []
+    for campo in esquema:
+        tipo = campo.type
+        if pa.types.is_integer(tipo):
+            tipo = pa.int64()
+        elif pa.types.is_null(tipo):
+            tipo = pa.string()
+        campos.append(pa.field(campo.name, tipo))
+    return pa.schema(campos)
+
+
+def _colunar_em_blocos(blocos: Iterable[pd.DataFrame], formato: str) -> Iterator[bytes]:
+    saida = _SaidaEmBlocos()
+    escritor = None
+    esquema = None
+    for bloco in blocos:
+        if escritor is None:
+            esquema = _esquema_estavel(pa.Schema.from_pandas(bloco, preserve_index=False))
+            escritor = (pq.ParquetWriter(saida, esquema) if formato == "Parquet"
+                        else pa.ipc.new_stream(saida, esquema))
+        escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+        yield saida.retirar()
+    if escritor is not None:
+        escritor.close()
+        yield saida.retirar()
+
+
+def exportar_blocos(blocos: Iterable[pd.DataFrame], formato: str = "CSV") -> Iterator[bytes]:
+    """Codifica fatias de DataFrame no formato escolhido, produzindo o arquivo em pedaços de bytes.
+
+    Só uma fatia fica em memória por vez. O CSV sai formatado para o Excel brasileiro
+    (';', R$ e BOM); Parquet e Arrow IPC preservam os tipos numéricos e o Status
+    categórico, prontos para ferramentas de BI.
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    if formato == "CSV":
+        return _csv_em_blocos(blocos)
+    if pa is None:
+        raise ImportError("Instale o pacote 'pyarrow' para exportar em Parquet ou Arrow IPC.")
+    return _colunar_em_blocos(blocos, formato)
+
+
+def escrever_arquivo(pedacos: Iterable[bytes], destino: BinaryIO) -> int:
+    """Grava os pedaços em um arquivo aberto e retorna o total de bytes."""
+    total = 0
+    for pedaco in pedacos:
+        destino.write(pedaco)
+        total += len(pedaco)
+    return total
+
+
+def arquivo_temporario(pedacos: Iterable[bytes]) -> BinaryIO:
+    """Reúne a exportação num arquivo temporário em disco (sem buffer), pronto para leitura."""
+    arquivo = tempfile.TemporaryFile(buffering=0)
+    escrever_arquivo(pedacos, arquivo)
+    arquivo.seek(0)
+    return arquivo
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+COLUNAS_FILTRO = ("Fornecedor", "Localização", "Status")
+
+
+class IndiceFiltros:
+    """Bitmaps por valor das colunas filtráveis do catálogo (um por fornecedor, localização e status).
+
+    Construído uma vez por DataFrame de catálogo: cada valor guarda um bitmap
+    compactado (`np.packbits`, n/8 bytes), filtros combinados são um AND bit a bit
+    e as listas de opções da barra lateral saem do próprio índice, sem `unique()`.
+    """
+
+    def __init__(self, catalogo: pd.DataFrame, colunas=COLUNAS_FILTRO):
+        self.catalogo = catalogo
+        self.n = len(catalogo)
+        self._valores: Dict[str, List[Any]] = {}
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+
+        for coluna in colunas:
+            if coluna not in catalogo.columns:
+                self._valores[coluna], self._bitmaps[coluna] = [], {}
+                continue
+            codigos, valores = pd.factorize(catalogo[coluna], sort=False)
+            valores = list(valores)
+            # Posições agrupadas por valor com uma única ordenação (códigos -1 = vazio ficam no início)
+            ordem = np.argsort(codigos, kind="stable")
+            limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+            bitmaps = {}
+            for k, valor in enumerate(valores):
+                bits = np.zeros(self.n, dtype=bool)
+                bits[ordem[limites[k]:limites[k + 1]]] = True
+                bitmaps[valor] = np.packbits(bits)
+            self._valores[coluna], self._bitmaps[coluna] = valores, bitmaps
+
+    def opcoes(self, coluna: str) -> List[Any]:
+        """Valores distintos da coluna, na ordem em que aparecem no catálogo."""
+        return list(self._valores.get(coluna, []))
+
+    def contagem(self, coluna: str, valor: Any) -> int:
+        """Quantidade de itens com o valor informado."""
+        bits = self._bitmaps.get(coluna, {}).get(valor)
+        return 0 if bits is None else int(np.unpackbits(bits, count=self.n).sum())
+
+    def posicoes(self, selecao: Dict[str, Any], base: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Posições (para `iloc`) que atendem a todos os filtros (valores None são ignorados).
+
+        `base` restringe o resultado a posições já selecionadas (ex.: as da busca por
+        texto). Retorna `base` sem alteração quando nenhum filtro está ativo.
+        """
+        bits = None
+        for coluna, valor in selecao.items():
+            if valor is None:
+                continue
+            bitmap = self._bitmaps.get(coluna, {}).get(valor)
+            if bitmap is None:
+                return np.empty(0, dtype=np.int64)
+            bits = bitmap if bits is None else np.bitwise_and(bits, bitmap)
+
+        if bits is None:
+            return base
+        mascara = np.unpackbits(bits, count=self.n).view(bool)
+        return np.flatnonzero(mascara) if base is None else base[mascara[base]]
@@ -0,0 +1,35 @@
+import pandas as pd
+from typing import Iterable
+
+# Troca os separadores do padrão en-US ("1,234.56") para o pt-BR ("1.234,56") em uma única passada
+_TROCA_SEPARADORES = str.maketrans(",.", ".,")
+
+COLUNAS_MOEDA = ("Preço", "Valor Total")
+COLUNAS_PERCENTUAL = ("% Valor Acumulado", "% Item Acumulado")
+
+
+def formatar_moeda(serie: pd.Series) -> pd.Series:
+    """Formata uma série numérica como moeda brasileira (ex.: R$ 1.234,56)."""
+    return serie.map("R$ {:,.2f}".format, na_action="ignore").astype("string").str.translate(_TROCA_SEPARADORES)
+
+
+def formatar_percentual(serie: pd.Series) -> pd.Series:
+    """Formata uma série numérica como percentual brasileiro (ex.: 12,50%)."""
+    return serie.map("{:,.2f}%".format, na_action="ignore").astype("string").str.translate(_TROCA_SEPARADORES)
+
+
+def formatar_para_exibicao(df: pd.DataFrame, moeda: Iterable[str] = COLUNAS_MOEDA,
+                           percentual: Iterable[str] = COLUNAS_PERCENTUAL) -> pd.DataFrame:
+    """Retorna uma cópia do DataFrame com as colunas monetárias e percentuais formatadas.
+
+    Os DataFrames do sistema são sempre numéricos; esta é a única etapa que gera texto
+    e deve ser aplicada apenas ao que vai para a tela ou para a exportação.
+    """
+    df = df.copy()
+    for coluna in moeda:
+        if coluna in df.columns:
+            df[coluna] = formatar_moeda(df[coluna])
+    for coluna in percentual:
+        if coluna in df.columns:
+            df[coluna] = formatar_percentual(df[coluna])
+    return df
@@ -0,0 +1,404 @@
+# Arquivo: src/core/gestor_estoque.py
+
+import pandas as pd
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple, Optional
+import itertools
+import threading
+from src.core import atualizacao_massa
+from src.core.previsao import consumo_diario
+from src.core.busca import IndiceBusca
+from src.core.cache_manager import cache_dados
+from src.core.classificacao import (classificar_status, ROTULOS_STATUS,
+                               SEM_ESTOQUE, ABAIXO_MINIMO, REPOSICAO, ACIMA_MAXIMO)
+from src.core.repositorio import (RepositorioEstoque, TABELA_HISTORICO, TAMANHO_PAGINA_HISTORICO, TAMANHO_LOTE_MOVIMENTACOES,
+                                  TIPOS_MOVIMENTACAO, MOTIVO_NAO_ENCONTRADO, MOTIVO_INVALIDA, MOTIVO_INSUFICIENTE,
+                                  MOTIVO_CONFLITO, converter_campos, hash_senha, montar_relatorio, resultado_movimentacao)
+
+class EstoqueManager(RepositorioEstoque):
+    """Backend em memória com dados de exemplo (demonstração e testes, sem banco)."""
+    
+    NOME_BACKEND = "Memória (dados de exemplo)"
+    COLUNA_VERSAO = "versao"
+    
+    def __init__(self, obter_usuario: Optional[Callable[[], str]] = None,
+                 ao_erro: Optional[Callable[[str], None]] = None):
+        super().__init__(ao_erro, obter_usuario)
+        self.estoque = {}
+        self.historico = []
+        self._sequencia_historico = itertools.count(1)
+        self._lock = threading.RLock()
+        self._versao = 0
+        self._relatorio: Tuple[int, Optional[pd.DataFrame]] = (-1, None)
+        self.indice_busca = IndiceBusca()
+        self.usuarios = {
+            "admin": {"username": "admin", "senha_hash": hash_senha("admin123"), "tipo": "Administrador"},
+            "user": {"username": "user", "senha_hash": hash_senha("user123"), "tipo": "Operador"}
+        }
+        self.inicializar_estoque()
+    
+    def inicializar_estoque(self):
+        """Inicializa estoque com dados de exemplo baseados na planilha"""
+        dados_exemplo = [
+            {"id": "001", "nome": "ABRAÇADEIRA TIPO D 1/2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 50, "minimo": 10, "maximo": 100, "localizacao": "A-01", 
+             "fornecedor": "Fornecedor A", "preco": 2.50},
+            
+            {"id": "002", "nome": "ABRAÇADEIRA TIPO D 3/4", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 30, "minimo": 15, "maximo": 80, "localizacao": "A-02", 
+             "fornecedor": "Fornecedor A", "preco": 3.00},
+            
+            {"id": "003", "nome": "ABRAÇADEIRA TIPO D 1", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 5, "minimo": 20, "maximo": 60, "localizacao": "A-03", 
+             "fornecedor": "Fornecedor A", "preco": 3.50},
+            
+            {"id": "004", "nome": "ABRAÇADEIRA TIPO D 2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 25, "minimo": 10, "maximo": 50, "localizacao": "A-04", 
+             "fornecedor": "Fornecedor B", "preco": 4.50},
+            
+            {"id": "005", "nome": "ABRAÇADEIRA TIPO U 1/2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 100, "minimo": 30, "maximo": 200, "localizacao": "B-01", 
+             "fornecedor": "Fornecedor B", "preco": 1.80},
+            
+            {"id": "006", "nome": "ABRAÇADEIRA TIPO U 3/4", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 75, "minimo": 25, "maximo": 150, "localizacao": "B-02", 
+             "fornecedor": "Fornecedor C", "preco": 2.20},
+            
+            {"id": "007", "nome": "PARAFUSO SEXTAVADO 1/2 x 2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 200, "minimo": 50, "maximo": 300, "localizacao": "C-01", 
+             "fornecedor": "Fornecedor C", "preco": 0.50},
+            
+            {"id": "008", "nome": "PORCA SEXTAVADA 1/2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 150, "minimo": 50, "maximo": 250, "localizacao": "C-02", 
+             "fornecedor": "Fornecedor D", "preco": 0.30},
+            
+            {"id": "009", "nome": "ARRUELA LISA 1/2", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 180, "minimo": 100, "maximo": 300, "localizacao": "C-03", 
+             "fornecedor": "Fornecedor D", "preco": 0.15},
+            
+            {"id": "010", "nome": "BUCHA DE REDUÇÃO 1 x 3/4", "descricao": "Abraçadeira de metal para fixação de tubos de 1/2 polegada.","unidade": "PÇ", 
+             "quantidade": 8, "minimo": 20, "maximo": 60, "localizacao": "D-01", 
+             "fornecedor": "Fornecedor E", "preco": 5.00}
+        ]
+        self.estoque = {}
+        for item in dados_exemplo:
+            item_id = item.pop("id")
+            self.estoque[item_id] = {
+                "nome": item["nome"], 
+                "descricao": item["descricao"], 
+                "unidade": item["unidade"],
+                "quantidade": item["quantidade"],
+                "minimo": item["minimo"],
+                "maximo": item["maximo"],
+                "localizacao": item["localizacao"],
+                "fornecedor": item["fornecedor"],
+                "preco": item["preco"]
+            }
+            self._carimbar(self.estoque[item_id])
+        self.indice_busca.reconstruir(self.estoque.keys(), (item["nome"] for item in self.estoque.values()))
+        self._alterado()
+    
+    @staticmethod
+    def _carimbar(item: Dict, agora: Optional[str] = None):
+        """Nova versão do item a cada escrita: `versao` (token da checagem otimista) e a data da alteração"""
+        item["versao"] = item.get("versao", 0) + 1
+        item["ultima_atualizacao"] = agora or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _alterado(self, ids: Optional[List[str]] = None):
+        """Marca o catálogo (ou só os itens `ids`) como alterado (o relatório é remontado na próxima leitura)"""
+        self._versao += 1
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=ids)
+    
+    def buscar_usuario(self, username: str) -> Optional[Dict]:
+        """Busca usuário pelo nome"""
+        usuario = self.usuarios.get(username)
+        return dict(usuario) if usuario else None
+    
+    # PRODUTOS
+    
+    def get_estoque_frame(self) -> pd.DataFrame:
+        """Catálogo no formato da tabela `produtos`"""
+        with self._lock:
+            return pd.DataFrame([{"id": id, **item} for id, item in self.estoque.items()])
+    
+    def gerar_relatorio(self) -> pd.DataFrame:
+        """Gera relatório completo do estoque (colunas numéricas; formatação na exibição)"""
+        with self._lock:
+            versao, df = self._relatorio
+            if versao != self._versao:
+                catalogo = self.get_estoque_frame()
+                df = montar_relatorio(catalogo) if not catalogo.empty else pd.DataFrame()
+                self._relatorio = (self._versao, df)
+            return df
+    
+    def get_item_by_id(self, item_id: str) -> Optional[Dict]:
+        """Busca item pelo código"""
+        with self._lock:
+            item = self.estoque.get(item_id)
+            return {"id": item_id, **item} if item is not None else None
+
+    def buscar_itens(self, ids: List[str]) -> List[Dict]:
+        """Busca vários itens pelo código"""
+        with self._lock:
+            return [{"id": item_id, **self.estoque[item_id]} for item_id in ids if item_id in self.estoque]
+    
+    def ids_existentes(self, ids: List[str]) -> set:
+        """Retorna quais dos códigos informados já existem"""
+        return {id for id in ids if id in self.estoque}
+    
+    def adicionar_item(self, item_id: str, nome: str, unidade: str, 
+                      quantidade: int, minimo: int, maximo: int, 
+                      localizacao: str, fornecedor: str, preco: float) -> bool:
+        """Adiciona novo item ao estoque"""
+        with self._lock:
+            if item_id in self.estoque:
+                self._erro(f"Erro ao adicionar item: o código {item_id} já existe.")
+                return False
+            
+            self.estoque[item_id] = {
+                "nome": nome,
+                "unidade": unidade,
+                "quantidade": int(quantidade),
+                "minimo": int(minimo),
+                "maximo": int(maximo),
+                "localizacao": localizacao,
+                "fornecedor": fornecedor,
+                "preco": float(preco)
+            }
+            self._carimbar(self.estoque[item_id])
+            self.indice_busca.atualizar(item_id, nome)
+            self._alterado([item_id])
+        return True
+    
+    def adicionar_itens_lote(self, itens: List[Dict], atualizar_existentes: bool = False) -> bool:
+        """Adiciona (ou atualiza, sem mexer no saldo) vários itens de uma vez"""
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            for item in itens:
+                existe = item["id"] in self.estoque
+                if existe and not atualizar_existentes:
+                    continue
+                dados = {campo: valor for campo, valor in item.items()
+                         if campo != "id" and not (existe and campo == "quantidade")}
+                self.estoque[item["id"]] = {**self.estoque.get(item["id"], {}), **dados}
+                self._carimbar(self.estoque[item["id"]], agora)
+                self.indice_busca.atualizar(item["id"], self.estoque[item["id"]].get("nome", ""))
+            self._alterado([item["id"] for item in itens])
+        return True
+    
+    def atualizar_em_massa(self, filtro: Dict, ajuste: Dict) -> Optional[List[str]]:
+        """Aplica o ajuste a todos os itens do filtro de uma vez (nada muda se algum mínimo ficar >= máximo)"""
+        try:
+            filtro, ajuste = atualizacao_massa.normalizar(filtro, ajuste)
+        except (TypeError, ValueError) as e:
+            self._erro(f"Erro na atualização em massa: {e}")
+            return None
+        
+        colunas = atualizacao_massa.COLUNAS_PRODUTOS
+        with self._lock:
+            catalogo = self.get_estoque_frame()
+            if catalogo.empty:
+                return []
+            afetados = catalogo[atualizacao_massa.selecionar(catalogo, filtro, colunas)]
+            if atualizacao_massa.conflitos_minimo_maximo(afetados, ajuste, colunas).any():
+                self._erro(f"Erro na atualização em massa: {atualizacao_massa.MOTIVO_MINIMO_MAXIMO}")
+                return None
+            
+            ids = afetados["id"].tolist()
+            novos = {campo: valores.tolist() for campo, valores in
+                     atualizacao_massa.novos_valores(afetados, ajuste, colunas).items()}
+            agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for posicao, item_id in enumerate(ids):
+                item = self.estoque[item_id]
+                for campo, valores in novos.items():
+                    item[campo] = valores[posicao]
+                self._carimbar(item, agora)
+            self._alterado(ids)
+        return ids
+    
+    def excluir_item(self, item_id: str) -> bool:
+        """Exclui um item do estoque e o seu histórico"""
+        with self._lock:
+            if item_id not in self.estoque:
+                return False
+            del self.estoque[item_id]
+            self.historico = [registro for registro in self.historico if registro["id"] != item_id]
+            self.indice_busca.remover(item_id)
+            self._alterado([item_id])
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+        return True
+    
+    def atualizar_item(self, item_id: str, campos: Dict[str, Any], versao: Optional[Any] = None) -> bool:
+        """Atualiza vários campos de um item de uma vez (com checagem de versão opcional)"""
+        try:
+            campos = converter_campos(campos)
+        except (TypeError, ValueError) as e:
+            self._erro(f"Erro ao atualizar item: {e}")
+            return False
+        
+        with self._lock:
+            item = self.estoque.get(item_id)
+            if item is None:
+                return False
+            if versao is not None and item.get(self.COLUNA_VERSAO) != versao:
+                self._erro(f"Erro ao atualizar item: {MOTIVO_CONFLITO}.")
+                return False
+            if not campos:
+                return True
+            item.update(campos)
+            self._carimbar(item)
+            if "nome" in campos:
+                self.indice_busca.atualizar(item_id, campos["nome"])
+            self._alterado([item_id])
+        return True
+    
+    # MOVIMENTAÇÕES
+    
+    def _aplicar_movimento(self, item_id: str, tipo: str, quantidade: int, observacao: str,
+                           usuario: str) -> Tuple[Optional[int], Optional[str]]:
+        """Aplica uma Entrada/Saída e registra o histórico; retorna (nova quantidade, motivo da rejeição)"""
+        if quantidade <= 0 or tipo not in TIPOS_MOVIMENTACAO:
+            return None, MOTIVO_INVALIDA
+        
+        with self._lock:
+            item = self.estoque.get(item_id)
+            if item is None:
+                return None, MOTIVO_NAO_ENCONTRADO
+            if tipo == "Saída" and item["quantidade"] < quantidade:
+                return None, MOTIVO_INSUFICIENTE
+            
+            variacao = quantidade if tipo == "Entrada" else -quantidade
+            item["quantidade"] += variacao
+            self._carimbar(item)
+            self.registrar_historico(item_id, item["nome"], tipo, item["quantidade"], observacao, usuario, variacao)
+            self._alterado([item_id])
+            return item["quantidade"], None
+    
+    def movimentar_estoque(self, item_id: str, tipo: str, quantidade: int, observacao: str = "") -> Optional[int]:
+        """Aplica Entrada/Saída e registra o histórico de forma atômica; retorna a nova quantidade"""
+        return self._aplicar_movimento(item_id, tipo, int(quantidade), observacao, self._usuario_atual())[0]
+    
+    def movimentar_lote(self, movimentos: List[Dict], tamanho_lote: int = TAMANHO_LOTE_MOVIMENTACOES) -> List[Dict]:
+        """Aplica uma lista de movimentações e retorna o status de cada linha"""
+        usuario = self._usuario_atual()
+        resultados = []
+        for mov in movimentos:
+            mov = {"id": str(mov["id"]), "tipo": mov["tipo"], "quantidade": int(mov["quantidade"]),
+                   "observacao": mov.get("observacao", "") or ""}
+            nova_quantidade, motivo = self._aplicar_movimento(mov["id"], mov["tipo"], mov["quantidade"],
+                                                              mov["observacao"], usuario)
+            resultados.append(resultado_movimentacao(mov, nova_quantidade, motivo))
+        return resultados
+    
+    def registrar_historico(self, item_id: str, nome: str, tipo: str, quantidade_final: int,
+                            observacao: str, usuario: str, variacao: Optional[int] = None):
+        """Registra a movimentação no histórico (mesmas colunas da tabela `historico`)"""
+        self.historico.append({
+            "seq": next(self._sequencia_historico),
+            "id": item_id,
+            "nome": nome,
+            "tipo": tipo,
+            "quantidade": quantidade_final,
+            "data": datetime.now().isoformat(),
+            "usuario": usuario,
+            "observacao": observacao,
+            "variacao": variacao
+        })
+        self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+    
+    # HISTÓRICO
+    
+    def _filtrar_historico(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                           tipo: Optional[str] = None, item_id: Optional[str] = None,
+                           usuario: Optional[str] = None) -> List[Dict]:
+        """Movimentações que atendem aos filtros do Histórico"""
+        inicio = data_inicio.isoformat() if data_inicio else None
+        fim = (data_fim + timedelta(days=1)).isoformat() if data_fim else None
+        usuario = usuario.lower() if usuario else None
+        with self._lock:
+            return [
+                r for r in self.historico
+                if (inicio is None or r["data"] >= inicio) and (fim is None or r["data"] < fim)
+                and (not tipo or r["tipo"] == tipo) and (not item_id or r["id"] == item_id)
+                and (not usuario or usuario in (r["usuario"] or "").lower())
+            ]
+    
+    def get_historico_data(self) -> List[Dict]:
+        """Todas as movimentações, mais recentes primeiro"""
+        return sorted(self._filtrar_historico(), key=lambda r: r["data"], reverse=True)
+    
+    def get_historico_pagina(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                             tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                             cursor: Optional[Tuple[str, str, int]] = None,
+                             tamanho_pagina: int = TAMANHO_PAGINA_HISTORICO) -> List[Dict]:
+        """Uma página do histórico em (data desc, id desc, seq desc), continuando após o cursor (data, id, seq)"""
+        chave = lambda r: (r["data"], r["id"], r["seq"])
+        registros = sorted(self._filtrar_historico(data_inicio, data_fim, tipo, item_id, usuario), key=chave, reverse=True)
+        if cursor:
+            registros = [r for r in registros if chave(r) < tuple(cursor)]
+        return registros[:tamanho_pagina]
+    
+    def contar_historico(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                         exato: bool = False) -> int:
+        """Quantidade de movimentações que atendem aos filtros"""
+        return len(self._filtrar_historico(data_inicio, data_fim, tipo, item_id, usuario))
+    
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=600)
+    def obter_consumo_medio(_self, metodo: str = "media_movel", janela_dias: int = 30, alpha: float = 0.3) -> pd.Series:
+        """Consumo diário médio por item, recalculado apenas quando o histórico muda"""
+        # Só a janela (e um dia antes, para o saldo anterior das linhas sem `variacao`), lida sob o lock
+        desde = date.today() - timedelta(days=janela_dias + 1)
+        return consumo_diario(pd.DataFrame(_self._filtrar_historico(data_inicio=desde)), metodo, janela_dias, alpha)
+    
+    # CONSULTAS AUXILIARES
+    
+    def obter_alertas(self) -> Dict[str, List]:
+        """Retorna alertas de estoque"""
+        alertas = {
+            "critico": [],
+            "baixo": [],
+            "reposicao": [],
+            "excesso": []
+        }
+        if not self.estoque:
+            return alertas
+        
+        ids = list(self.estoque.keys())
+        itens = list(self.estoque.values())
+        quantidades = np.array([item["quantidade"] for item in itens])
+        minimos = np.array([item["minimo"] for item in itens])
+        maximos = np.array([item["maximo"] for item in itens])
+        codigos = classificar_status(quantidades, minimos, maximos, incluir_reposicao=True)
+        
+        grupos = {SEM_ESTOQUE: "critico", ABAIXO_MINIMO: "baixo", REPOSICAO: "reposicao", ACIMA_MAXIMO: "excesso"}
+        for codigo, chave in grupos.items():
+            limite = "maximo" if codigo == ACIMA_MAXIMO else "minimo"
+            for i in np.flatnonzero(codigos == codigo):
+                alertas[chave].append({
+                    "id": ids[i],
+                    "nome": itens[i]["nome"],
+                    "quantidade": itens[i]["quantidade"],
+                    limite: itens[i][limite]
+                })
+        
+        return alertas
+    
+    def get_status(self, qtd: int, minimo: int, maximo: int) -> str:
+        """Retorna status do item baseado na quantidade"""
+        return ROTULOS_STATUS[int(classificar_status([qtd], [minimo], [maximo])[0])]
+    
+    def buscar_item(self, termo: str) -> Dict:
+        """Busca item por código ou nome (índice de trigramas, sem acentos)"""
+        codigos = self.indice_busca.buscar(termo)
+        if codigos is None:
+            return dict(self.estoque)
+        return {id: self.estoque[id] for id in codigos}
+    
+    def calcular_valor_total(self) -> float:
+        """Calcula valor total do estoque"""
+        total = 0
+        for item in self.estoque.values():
+            total += item["quantidade"] * item["preco"]
+        return total
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+from src.core.cache_manager import CacheDependente, cache_dados
+
+# Ausência de entrada no mapa (None é um valor válido: item inexistente)
+AUSENTE = object()
+
+
+class MapaIdentidade:
+    """Mapa de identidade de uma sessão: última linha lida de cada item, por código.
+
+    Cada entrada guarda o instante lógico do cache (`CacheDependente.relogio`) anterior
+    à leitura; uma escrita no item (ou na tabela inteira) depois desse instante a
+    invalida, assim como o `ttl`, que cobre escritas feitas por outro processo.
+    Itens inexistentes também são lembrados (valor None).
+    """
+
+    def __init__(self, tabela: str = "produtos", ttl: float = 60, cache: CacheDependente = cache_dados):
+        self.tabela = tabela
+        self.ttl = ttl
+        self.cache = cache
+        self._lock = threading.Lock()
+        # código -> (linha, instante lógico, lido em)
+        self._entradas: Dict[Hashable, Tuple[Optional[Dict[str, Any]], int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obter(self, chave: Hashable) -> Any:
+        """Linha guardada do item (None se ele não existe) ou AUSENTE se não houver cópia válida."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+        if entrada is None:
+            return AUSENTE
+        linha, instante, lido_em = entrada
+        if time.monotonic() - lido_em > self.ttl or self.cache.alterado_desde(self.tabela, chave, instante):
+            with self._lock:
+                self._entradas.pop(chave, None)
+            return AUSENTE
+        return linha
+
+    def guardar(self, chave: Hashable, linha: Optional[Dict[str, Any]], instante: int):
+        """Guarda a linha lida depois do instante lógico `instante`."""
+        with self._lock:
+            self._entradas[chave] = (linha, instante, time.monotonic())
+
+    def nova_execucao(self):
+        """Descarta as entradas expiradas (chamado a cada execução do script)."""
+        limite = time.monotonic() - self.ttl
+        with self._lock:
+            for chave in [c for c, (_, _, lido_em) in self._entradas.items() if lido_em < limite]:
+                del self._entradas[chave]
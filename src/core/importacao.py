@@ -0,0 +1,291 @@
+import io
+import time
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+UNIDADES = ["PÇ", "M", "KG", "UN", "CX"]
+TAMANHO_BLOCO_IMPORTACAO = 500
+
+# Aliases aceitos nos cabeçalhos das planilhas (comparados sem acento e em minúsculas)
+COLUNAS_MOVIMENTACAO = {
+    "id": "id", "codigo": "id", "cod": "id", "cod. item": "id",
+    "tipo": "tipo", "tipo de mov.": "tipo",
+    "quantidade": "quantidade", "qtd": "quantidade",
+    "observacao": "observacao", "obs": "observacao",
+}
+
+TIPOS_MOVIMENTACAO = {"entrada": "Entrada", "saida": "Saída"}
+
+# Aceita tanto os nomes do banco quanto os cabeçalhos da exportação da aba Estoque
+COLUNAS_CATALOGO = {
+    "id": "id", "codigo": "id",
+    "nome": "nome",
+    "unidade": "unidade",
+    "quantidade": "quantidade",
+    "minimo": "minimo",
+    "maximo": "maximo",
+    "localizacao": "localizacao",
+    "fornecedor": "fornecedor",
+    "preco": "preco", "preco bruto": "preco", "preco unitario": "preco",
+}
+
+
+def _sem_acento(serie: pd.Series) -> pd.Series:
+    """Remove acentos de uma série de strings (vetorizado)."""
+    return serie.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+
+
+def _detectar_separador(amostra: bytes) -> str:
+    """Escolhe entre ';' (padrão da exportação do sistema) e ',' pela primeira linha."""
+    primeira_linha = amostra.split(b"\n", 1)[0]
+    return ";" if primeira_linha.count(b";") >= primeira_linha.count(b",") else ","
+
+
+def _normalizar_colunas(df: pd.DataFrame, aliases: Dict[str, str]) -> pd.DataFrame:
+    """Renomeia os cabeçalhos da planilha para os nomes internos (mantendo o primeiro em caso de repetição)."""
+    cabecalhos = _sem_acento(pd.Series(df.columns, dtype=str)).str.strip().str.lower()
+    df = df.rename(columns={
+        original: aliases[normalizado]
+        for original, normalizado in zip(df.columns, cabecalhos)
+        if normalizado in aliases
+    })
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def _para_numero(serie: pd.Series) -> pd.Series:
+    """Converte texto em número aceitando também o formato brasileiro (ex.: 'R$ 1.234,56')."""
+    texto = serie.fillna("").astype(str).str.replace("R$", "", regex=False).str.strip()
+    formato_br = texto.str.contains(",", regex=False)
+    texto = texto.where(~formato_br, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto.replace("", None), errors="coerce")
+
+
+def ler_planilha(arquivo) -> pd.DataFrame:
+    """Lê um arquivo CSV ou XLSX enviado pelo usuário mantendo todas as colunas como texto."""
+    nome = getattr(arquivo, "name", "")
+    if nome.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(arquivo, dtype=str)
+
+    conteudo = arquivo.read() if hasattr(arquivo, "read") else arquivo
+    return pd.read_csv(io.BytesIO(conteudo), sep=_detectar_separador(conteudo),
+                       dtype=str, encoding="utf-8-sig", keep_default_na=False)
+
+
+def validar_movimentacoes(df: pd.DataFrame, catalogo: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Valida um arquivo de movimentações inteiro de forma vetorizada.
+
+    `catalogo` é o DataFrame de `gerar_relatorio` (colunas 'Código' e 'Quantidade').
+    Retorna (válidas, rejeitadas); ambas trazem a coluna 'linha' (linha na planilha,
+    contando o cabeçalho) e as rejeitadas trazem o 'motivo'. As válidas trazem
+    'saldo_previsto', o saldo após a linha se todas as anteriores forem aceitas.
+    """
+    df = _normalizar_colunas(df, COLUNAS_MOVIMENTACAO)
+    for coluna in ("id", "tipo", "quantidade"):
+        if coluna not in df.columns:
+            raise ValueError(f"Coluna obrigatória ausente no arquivo: '{coluna}'")
+    if "observacao" not in df.columns:
+        df["observacao"] = ""
+
+    df = df[["id", "tipo", "quantidade", "observacao"]].copy()
+    df.insert(0, "linha", df.index + 2)
+    df["id"] = df["id"].fillna("").astype(str).str.strip().str.upper()
+    df["observacao"] = df["observacao"].fillna("").astype(str).str.strip()
+    df["tipo"] = _sem_acento(df["tipo"].fillna("").astype(str)).str.strip().str.lower().map(TIPOS_MOVIMENTACAO)
+    quantidade = pd.to_numeric(df["quantidade"], errors="coerce")
+
+    ids_catalogo = catalogo["Código"].astype(str) if not catalogo.empty else pd.Series(dtype=str)
+
+    # Cada regra produz uma máscara; a primeira regra violada define o motivo
+    regras = [
+        (df["id"] == "", "Código vazio"),
+        (~df["id"].isin(ids_catalogo), "Item não encontrado"),
+        (df["tipo"].isna(), "Tipo inválido (use Entrada ou Saída)"),
+        (quantidade.isna() | (quantidade <= 0) | (quantidade % 1 != 0), "Quantidade inválida"),
+    ]
+    df["motivo"] = None
+    for mascara, motivo in reversed(regras):
+        df.loc[mascara, "motivo"] = motivo
+
+    rejeitadas = df[df["motivo"].notna()].copy()
+    validas = df[df["motivo"].isna()].drop(columns="motivo").copy()
+    validas["quantidade"] = quantidade[validas.index].astype(int)
+
+    # Saldo previsto: saldo atual + soma acumulada dos deltas por item, na ordem do arquivo
+    if not validas.empty:
+        saldo_atual = pd.Series(catalogo["Quantidade"].values, index=ids_catalogo.values)
+        delta = validas["quantidade"].where(validas["tipo"] == "Entrada", -validas["quantidade"])
+        validas["saldo_previsto"] = validas["id"].map(saldo_atual) + delta.groupby(validas["id"]).cumsum()
+    else:
+        validas["saldo_previsto"] = pd.Series(dtype=int)
+
+    return validas, rejeitadas
+
+
+def movimentacoes_para_lote(validas: pd.DataFrame) -> List[Dict]:
+    """Converte o DataFrame validado na lista aceita por `movimentar_lote`."""
+    return validas[["id", "tipo", "quantidade", "observacao"]].to_dict("records")
+
+
+def ler_catalogo_em_blocos(arquivo, tamanho_bloco: int = TAMANHO_BLOCO_IMPORTACAO) -> Iterator[Tuple[pd.DataFrame, Optional[float]]]:
+    """Lê um CSV/XLSX de catálogo em blocos, sem carregar o arquivo inteiro.
+
+    Gera (bloco, progresso); o índice do bloco é a posição da linha no arquivo e o
+    progresso é a fração lida (None quando o tamanho total não é conhecido).
+    """
+    nome = getattr(arquivo, "name", "")
+    if nome.lower().endswith((".xlsx", ".xls")):
+        from openpyxl import load_workbook
+
+        planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+        total = planilha.max_row
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = ["" if c is None else str(c) for c in next(linhas, ())]
+        inicio, bloco = 0, []
+        for linha in linhas:
+            bloco.append(["" if v is None else str(v) for v in linha])
+            if len(bloco) == tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho, index=range(inicio, inicio + len(bloco))), \
+                    ((inicio + len(bloco) + 1) / total if total else None)
+                inicio, bloco = inicio + len(bloco), []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho, index=range(inicio, inicio + len(bloco))), 1.0
+        return
+
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    tamanho = getattr(arquivo, "size", None)
+    for bloco in pd.read_csv(arquivo, sep=_detectar_separador(amostra), dtype=str, encoding="utf-8-sig",
+                             keep_default_na=False, chunksize=tamanho_bloco):
+        yield bloco, (min(arquivo.tell() / tamanho, 1.0) if tamanho else None)
+
+
+def colunas_catalogo(df: pd.DataFrame) -> List[str]:
+    """Colunas do catálogo (nomes internos) presentes no arquivo."""
+    return [c for c in dict.fromkeys(COLUNAS_CATALOGO.values()) if c in _normalizar_colunas(df.head(0), COLUNAS_CATALOGO)]
+
+
+def ids_catalogo(df: pd.DataFrame) -> List[str]:
+    """Códigos não vazios do bloco, normalizados como em `validar_catalogo`."""
+    df = _normalizar_colunas(df, COLUNAS_CATALOGO)
+    if "id" not in df.columns:
+        return []
+    ids = df["id"].fillna("").astype(str).str.strip().str.upper()
+    return list(dict.fromkeys(ids[ids != ""]))
+
+
+def validar_catalogo(df: pd.DataFrame, ids_vistos: Set[str],
+                     existentes: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Aplica, de forma vetorizada, as mesmas regras do formulário de cadastro.
+
+    `ids_vistos` acumula os códigos dos blocos anteriores para detectar duplicados
+    no arquivo inteiro (é atualizado por esta função). Para os códigos de `existentes`
+    (linhas atuais de `produtos`), as colunas ausentes do arquivo vêm do cadastro e não
+    dos valores padrão, então as regras (ex.: mínimo < máximo) valem para o item
+    resultante. Retorna (válidos, rejeitados).
+    """
+    df = _normalizar_colunas(df, COLUNAS_CATALOGO)
+    for coluna in ("id", "nome", "preco"):
+        if coluna not in df.columns:
+            raise ValueError(f"Coluna obrigatória ausente no arquivo: '{coluna}'")
+
+    # Valores padrão do formulário de cadastro para colunas opcionais
+    padroes = {"unidade": "PÇ", "quantidade": "0", "minimo": "0", "maximo": "100", "localizacao": "", "fornecedor": ""}
+    ausentes = [coluna for coluna in padroes if coluna not in df.columns]
+    for coluna in ausentes:
+        df[coluna] = padroes[coluna]
+
+    df = df[list(dict.fromkeys(COLUNAS_CATALOGO.values()))].copy()
+    df.insert(0, "linha", df.index + 2)
+    df["id"] = df["id"].fillna("").astype(str).str.strip().str.upper()
+    if existentes and ausentes:
+        atuais = pd.DataFrame.from_records(list(existentes.values())).set_index("id")
+        for coluna in ausentes:
+            if coluna in atuais.columns:
+                valores = df["id"].map(atuais[coluna])
+                df[coluna] = valores.where(valores.notna(), df[coluna]).astype(str)
+    for coluna in ("nome", "unidade", "localizacao", "fornecedor"):
+        df[coluna] = df[coluna].fillna("").astype(str).str.strip()
+    df["unidade"] = df["unidade"].str.upper().replace("", "PÇ")
+
+    numeros = {c: _para_numero(df[c]) for c in ("quantidade", "minimo", "maximo", "preco")}
+    inteiro_invalido = lambda serie: serie.isna() | (serie < 0) | (serie % 1 != 0)
+
+    duplicado = df["id"].duplicated() | df["id"].isin(ids_vistos)
+    regras = [
+        ((df["id"] == "") | (df["nome"] == ""), "O Código do Item e o Nome são obrigatórios."),
+        (df["id"].str.len() > 10, "Código com mais de 10 caracteres."),
+        (df["nome"].str.len() > 100, "Nome com mais de 100 caracteres."),
+        (duplicado & (df["id"] != ""), "Código duplicado no arquivo."),
+        (~df["unidade"].isin(UNIDADES), "Unidade de medida inválida."),
+        (inteiro_invalido(numeros["quantidade"]), "Quantidade inválida."),
+        (inteiro_invalido(numeros["minimo"]) | inteiro_invalido(numeros["maximo"]), "Mínimo/Máximo inválidos."),
+        (numeros["minimo"] >= numeros["maximo"], "Estoque Mínimo deve ser menor que o Estoque Máximo."),
+        (numeros["preco"].isna() | (numeros["preco"] < 0.01), "Preço Unitário inválido."),
+    ]
+    df["motivo"] = None
+    for mascara, motivo in reversed(regras):
+        df.loc[mascara, "motivo"] = motivo
+
+    ids_vistos.update(df.loc[df["id"] != "", "id"])
+
+    rejeitados = df[df["motivo"].notna()].copy()
+    validos = df[df["motivo"].isna()].drop(columns="motivo").copy()
+    for coluna in ("quantidade", "minimo", "maximo"):
+        validos[coluna] = numeros[coluna][validos.index].astype(int)
+    validos["preco"] = numeros["preco"][validos.index].astype(float)
+    return validos, rejeitados
+
+
+def importar_catalogo(arquivo, estoque_manager, tamanho_bloco: int = TAMANHO_BLOCO_IMPORTACAO,
+                      atualizar_existentes: bool = False) -> Iterator[Dict[str, Any]]:
+    """Importa um catálogo em blocos, gerando o progresso após cada bloco.
+
+    Por bloco: uma consulta `in_` para os códigos já cadastrados, validação vetorizada,
+    um insert dos itens novos e, com `atualizar_existentes`, um upsert dos existentes
+    apenas com as colunas do arquivo. A quantidade de um item existente não muda (o
+    saldo só muda por movimentação). Cada evento traz os totais acumulados, a vazão
+    (linhas/s) e as linhas rejeitadas daquele bloco.
+    """
+    ids_vistos: Set[str] = set()
+    inicio = time.perf_counter()
+    linhas = importadas = total_rejeitadas = 0
+
+    for bloco, progresso in ler_catalogo_em_blocos(arquivo, tamanho_bloco):
+        ids = ids_catalogo(bloco)
+        if atualizar_existentes:
+            # As linhas atuais completam as colunas ausentes na validação dos existentes
+            atuais = estoque_manager.buscar_itens(ids) if ids else []
+            existentes = None if atuais is None else {linha["id"]: linha for linha in atuais}
+        else:
+            existentes = estoque_manager.ids_existentes(ids) if ids else set()
+        validos, rejeitados = validar_catalogo(bloco, ids_vistos, existentes if atualizar_existentes else None)
+
+        if existentes is None:
+            falha = validos.assign(motivo="Falha ao consultar o banco de dados.")
+            validos, rejeitados = validos.iloc[0:0], pd.concat([rejeitados, falha])
+        ja_existe = validos["id"].isin(list(existentes or ()))
+        if ja_existe.any() and not atualizar_existentes:
+            rejeitados = pd.concat([rejeitados, validos[ja_existe].assign(motivo="O Código já existe no estoque.")])
+            validos, ja_existe = validos[~ja_existe], ja_existe[~ja_existe]
+
+        colunas = ["id"] + [c for c in colunas_catalogo(bloco) if c not in ("id", "quantidade")]
+        for gravar, atualizar in ((validos[~ja_existe], False), (validos[ja_existe], True)):
+            if gravar.empty:
+                continue
+            registros = (gravar[colunas] if atualizar else gravar.drop(columns="linha")).to_dict("records")
+            if estoque_manager.adicionar_itens_lote(registros, atualizar_existentes=atualizar):
+                importadas += len(gravar)
+            else:
+                rejeitados = pd.concat([rejeitados, gravar.assign(motivo="Falha ao gravar o bloco.")])
+
+        linhas += len(bloco)
+        total_rejeitadas += len(rejeitados)
+        decorrido = time.perf_counter() - inicio
+        yield {
+            "linhas": linhas,
+            "importadas": importadas,
+            "rejeitadas": total_rejeitadas,
+            "rejeitadas_bloco": rejeitados.sort_values("linha"),
+            "progresso": progresso,
+            "linhas_por_segundo": linhas / decorrido if decorrido > 0 else 0.0,
+        }
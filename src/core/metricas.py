@@ -0,0 +1,370 @@
+import contextlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Limites (s) dos buckets de latência, como nos histogramas do Prometheus
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTIS = (0.5, 0.95, 0.99)
+PREFIXO_PROMETHEUS = "estoque"
+# Arquivos que não contam como "chamador" de uma operação rastreada (o próprio núcleo)
+PASTA_NUCLEO = os.path.dirname(os.path.abspath(__file__))
+
+
+class Histograma:
+    """Contagens por bucket de latência; os quantis são interpolados dentro do bucket."""
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_LATENCIA):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+
+    def observar(self, valor: float):
+        indice = next((i for i, limite in enumerate(self.limites) if valor <= limite), len(self.limites))
+        self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+        self.maximo = max(self.maximo, valor)
+
+    def quantil(self, q: float) -> float:
+        """Mesma interpolação linear do `histogram_quantile` do Prometheus (limitada ao máximo observado)."""
+        if not self.total:
+            return 0.0
+        posicao = q * self.total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= posicao:
+                inferior = self.limites[i - 1] if i > 0 else 0.0
+                superior = self.limites[i] if i < len(self.limites) else self.maximo
+                return min(inferior + (superior - inferior) * (posicao - acumulado) / contagem, self.maximo)
+            acumulado += contagem
+        return self.maximo
+
+
+class EstatisticaOperacao:
+    """Latência, chamadas, erros, linhas retornadas e requisições ao banco de uma operação."""
+
+    def __init__(self):
+        self.latencia = Histograma()
+        self.erros = 0
+        self.linhas = 0
+        self.requisicoes = 0
+        self.bytes = 0
+
+
+class Rastro:
+    """Todas as chamadas medidas durante uma execução do script (modo de rastreamento).
+
+    Cada chamada guarda quem a fez (arquivo:linha fora de `src/core`), o início e a
+    duração relativos à execução, as idas ao banco e se uma chamada idêntica (mesma
+    operação e argumentos) já tinha sido feita na mesma execução.
+    """
+
+    def __init__(self, nivel_base: int, requisicoes_inicio: int):
+        self.inicio = time.perf_counter()
+        self.nivel_base = nivel_base
+        self.requisicoes_inicio = requisicoes_inicio
+        self.requisicoes = 0
+        self.duracao = 0.0
+        self.chamadas: List[Dict[str, Any]] = []
+        self._vistas: set = set()
+
+    def abrir(self, componente: str, operacao: str, camada: str, argumentos: Tuple,
+              nomeados: Dict[str, Any], nivel: int) -> Dict[str, Any]:
+        """Registra o início de uma chamada; duração e requisições são preenchidas por `medir`."""
+        chave = (componente, operacao, _chave_argumentos(argumentos, nomeados))
+        chamada = {
+            "ordem": len(self.chamadas),
+            "componente": componente,
+            "operacao": operacao,
+            "camada": camada,
+            "argumentos": chave[2],
+            "chamador": _chamador(),
+            "nivel": nivel - self.nivel_base,
+            "inicio_ms": (time.perf_counter() - self.inicio) * 1000,
+            "duracao_ms": 0.0,
+            "requisicoes": 0,
+            "duplicada": chave in self._vistas,
+        }
+        self._vistas.add(chave)
+        self.chamadas.append(chamada)
+        return chamada
+
+    def resumo(self) -> Dict[str, Any]:
+        """Totais da execução: chamadas diretas ao backend, duplicadas e idas ao banco."""
+        diretas = [c for c in self.chamadas if c["nivel"] == 0 and c["camada"] == "backend"]
+        return {
+            "duracao_ms": round(self.duracao * 1000, 2),
+            "chamadas": len(diretas),
+            "duplicadas": sum(c["duplicada"] for c in diretas),
+            "requisicoes": self.requisicoes,
+            "detalhes": [dict(c, inicio_ms=round(c["inicio_ms"], 2), duracao_ms=round(c["duracao_ms"], 2))
+                         for c in self.chamadas],
+        }
+
+
+class _Contexto(threading.local):
+    """Estado da thread atual: cada sessão do Streamlit executa o script na própria thread."""
+
+    def __init__(self):
+        self.requisicoes = 0
+        self.bytes = 0
+        self.pilha: List[Tuple[str, str]] = []
+        self.rastro: Optional[Rastro] = None
+
+
+def _chave_argumentos(argumentos: Tuple, nomeados: Dict[str, Any]) -> str:
+    """Representação curta dos argumentos; DataFrames e arrays entram pela identidade (sem repr)."""
+    def curto(valor: Any) -> str:
+        if isinstance(valor, (pd.DataFrame, pd.Series, np.ndarray)):
+            return f"<{type(valor).__name__} {id(valor):x}>"
+        texto = repr(valor)
+        return texto if len(texto) <= 60 else texto[:57] + "..."
+    return ", ".join([curto(v) for v in argumentos] + [f"{k}={curto(v)}" for k, v in nomeados.items()])
+
+
+def _chamador() -> str:
+    """`arquivo:linha (função)` do primeiro quadro da pilha fora de `src/core` (página ou app.py)."""
+    quadro = sys._getframe(1)
+    while quadro is not None and (os.path.abspath(quadro.f_code.co_filename).startswith(PASTA_NUCLEO)
+                                  or quadro.f_code.co_filename == contextlib.__file__):
+        quadro = quadro.f_back
+    if quadro is None:
+        return "-"
+    return f"{os.path.relpath(quadro.f_code.co_filename)}:{quadro.f_lineno} ({quadro.f_code.co_name})"
+
+
+def _tamanho(valor: Any) -> Optional[int]:
+    """Linhas de um retorno (DataFrame, lista, dicionário...) ou None se não for uma coleção."""
+    if isinstance(valor, (pd.DataFrame, pd.Series, np.ndarray, list, tuple, dict, set)):
+        return len(valor)
+    return None
+
+
+class RegistroMetricas:
+    """Métricas de desempenho compartilhadas pelo processo (mesmo escopo do `cache_dados`).
+
+    Registra, por (componente, operação), um histograma de latência, o número de
+    chamadas e erros, as linhas retornadas e as requisições ao banco feitas durante a
+    chamada (HTTP no Supabase, conexões no SQLite), atribuídas pela thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operacoes: Dict[Tuple[str, str], EstatisticaOperacao] = {}
+        self._requisicoes: Dict[str, EstatisticaOperacao] = {}
+        self._contexto = _Contexto()
+
+    def _estatistica(self, componente: str, operacao: str) -> EstatisticaOperacao:
+        chave = (componente, operacao)
+        if chave not in self._operacoes:
+            self._operacoes[chave] = EstatisticaOperacao()
+        return self._operacoes[chave]
+
+    @contextmanager
+    def medir(self, operacao: str, componente: str = "app", camada: str = "app",
+              argumentos: Tuple = (), nomeados: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Mede um bloco de código; o dicionário devolvido recebe `linhas` (opcional) e, ao final,
+        `duracao`, `requisicoes` e `bytes` do bloco. Com um `rastrear` ativo na thread, a
+        chamada também entra no rastro da execução."""
+        contexto = self._contexto
+        requisicoes, bytes_inicio = contexto.requisicoes, contexto.bytes
+        rastro = contexto.rastro
+        chamada = (rastro.abrir(componente, operacao, camada, argumentos, nomeados or {}, len(contexto.pilha))
+                   if rastro else None)
+        contexto.pilha.append((componente, operacao))
+        medida: Dict[str, Any] = {}
+        inicio = time.perf_counter()
+        erro = False
+        try:
+            yield medida
+        except Exception:
+            erro = True
+            raise
+        finally:
+            contexto.pilha.pop()
+            medida.update(duracao=time.perf_counter() - inicio,
+                          requisicoes=contexto.requisicoes - requisicoes,
+                          bytes=contexto.bytes - bytes_inicio)
+            if chamada is not None:
+                chamada.update(duracao_ms=medida["duracao"] * 1000, requisicoes=medida["requisicoes"])
+            with self._lock:
+                estatistica = self._estatistica(componente, operacao)
+                estatistica.latencia.observar(medida["duracao"])
+                estatistica.erros += erro
+                estatistica.linhas += medida.get("linhas") or 0
+                estatistica.requisicoes += medida["requisicoes"]
+                estatistica.bytes += medida["bytes"]
+
+    def instrumentar(self, componente: Optional[str] = None) -> Callable:
+        """Decorador: mede cada chamada. Sem `componente`, usa a classe do primeiro argumento
+        (o backend, para métodos de `RepositorioEstoque`)."""
+
+        def decorador(func: Callable) -> Callable:
+            if getattr(func, "instrumentado", False):
+                return func
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if componente is None:  # método: o componente é a classe e `self` fica fora dos argumentos
+                    nome, camada, argumentos = type(args[0]).__name__, "backend", args[1:]
+                else:
+                    nome, camada, argumentos = componente, componente, args
+                with self.medir(func.__name__, nome, camada, argumentos, kwargs) as medida:
+                    valor = func(*args, **kwargs)
+                    medida["linhas"] = _tamanho(valor)
+                    return valor
+
+            wrapper.instrumentado = True
+            return wrapper
+
+        return decorador
+
+    @contextmanager
+    def rastrear(self, ativo: bool = True) -> Iterator[Optional[Rastro]]:
+        """Ativa o rastreamento das chamadas na thread atual durante o bloco (None se `ativo` for falso)."""
+        contexto = self._contexto
+        if not ativo or contexto.rastro is not None:
+            yield None
+            return
+        rastro = contexto.rastro = Rastro(len(contexto.pilha), contexto.requisicoes)
+        try:
+            yield rastro
+        finally:
+            contexto.rastro = None
+            rastro.duracao = time.perf_counter() - rastro.inicio
+            rastro.requisicoes = contexto.requisicoes - rastro.requisicoes_inicio
+
+    def registrar_erro(self):
+        """Conta um erro tratado (ex.: exibido com `_erro`) na operação em andamento na thread."""
+        pilha = self._contexto.pilha
+        if pilha:
+            with self._lock:
+                self._estatistica(*pilha[-1]).erros += 1
+
+    def registrar_requisicao(self, origem: str, duracao: float, tamanho_bytes: int = 0):
+        """Registra uma ida ao banco (requisição HTTP, consulta ao cliente simulado, conexão SQLite)."""
+        self._contexto.requisicoes += 1
+        self._contexto.bytes += tamanho_bytes
+        with self._lock:
+            if origem not in self._requisicoes:
+                self._requisicoes[origem] = EstatisticaOperacao()
+            estatistica = self._requisicoes[origem]
+            estatistica.latencia.observar(duracao)
+            estatistica.requisicoes += 1
+            estatistica.bytes += tamanho_bytes
+
+    def registrar_bytes(self, origem: str, tamanho_bytes: int):
+        """Soma bytes recebidos depois da requisição (corpo da resposta lido em partes)."""
+        self._contexto.bytes += tamanho_bytes
+        with self._lock:
+            if origem in self._requisicoes:
+                self._requisicoes[origem].bytes += tamanho_bytes
+
+    def limpar(self):
+        with self._lock:
+            self._operacoes.clear()
+            self._requisicoes.clear()
+
+    @staticmethod
+    def _linha(estatistica: EstatisticaOperacao) -> Dict[str, Any]:
+        latencia = estatistica.latencia
+        return {
+            "chamadas": latencia.total,
+            "erros": estatistica.erros,
+            **{f"p{int(q * 100)}_ms": round(latencia.quantil(q) * 1000, 2) for q in QUANTIS},
+            "media_ms": round(latencia.soma / latencia.total * 1000, 2) if latencia.total else 0.0,
+            "max_ms": round(latencia.maximo * 1000, 2),
+            "linhas_por_chamada": round(estatistica.linhas / latencia.total, 1) if latencia.total else 0.0,
+            "requisicoes": estatistica.requisicoes,
+            "bytes": estatistica.bytes,
+        }
+
+    def resumo(self) -> List[Dict[str, Any]]:
+        """Uma linha por operação, com p50/p95/p99 em milissegundos, das mais lentas (p95) para as mais rápidas."""
+        with self._lock:
+            linhas = [{"componente": c, "operacao": o, **self._linha(e)} for (c, o), e in self._operacoes.items()]
+        return sorted(linhas, key=lambda l: l["p95_ms"], reverse=True)
+
+    def resumo_requisicoes(self) -> List[Dict[str, Any]]:
+        """Idas ao banco por origem (supabase, simulado, sqlite)."""
+        with self._lock:
+            return [{"origem": origem, **self._linha(e)} for origem, e in self._requisicoes.items()]
+
+    def exportar_prometheus(self, metricas_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                            metricas_conexao: Optional[Dict[str, Any]] = None) -> str:
+        """Texto no formato de exposição do Prometheus (histogramas, contadores do cache e do pool)."""
+        p = PREFIXO_PROMETHEUS
+        linhas: List[str] = []
+
+        def cabecalho(nome: str, tipo: str, ajuda: str):
+            linhas.extend([f"# HELP {p}_{nome} {ajuda}", f"# TYPE {p}_{nome} {tipo}"])
+
+        def histograma(nome: str, rotulos: Dict[str, str], h: Histograma):
+            acumulado = 0
+            for limite, contagem in zip(list(h.limites) + ["+Inf"], h.contagens):
+                acumulado += contagem
+                linhas.append(f"{p}_{nome}_bucket{_rotulos({**rotulos, 'le': str(limite)})} {acumulado}")
+            linhas.append(f"{p}_{nome}_sum{_rotulos(rotulos)} {h.soma:.6f}")
+            linhas.append(f"{p}_{nome}_count{_rotulos(rotulos)} {h.total}")
+
+        with self._lock:
+            operacoes = list(self._operacoes.items())
+            requisicoes = list(self._requisicoes.items())
+
+            cabecalho("operacao_segundos", "histogram", "Latência das operações de dados e de análise.")
+            for (componente, operacao), e in operacoes:
+                histograma("operacao_segundos", {"componente": componente, "operacao": operacao}, e.latencia)
+            for nome, atributo, ajuda in (("operacao_erros_total", "erros", "Erros por operação."),
+                                          ("operacao_linhas_total", "linhas", "Linhas retornadas por operação."),
+                                          ("operacao_requisicoes_total", "requisicoes", "Idas ao banco feitas pela operação."),
+                                          ("operacao_bytes_total", "bytes", "Bytes recebidos do banco pela operação.")):
+                cabecalho(nome, "counter", ajuda)
+                for (componente, operacao), e in operacoes:
+                    linhas.append(f"{p}_{nome}{_rotulos({'componente': componente, 'operacao': operacao})} {getattr(e, atributo)}")
+
+            cabecalho("requisicao_segundos", "histogram", "Latência de cada ida ao banco.")
+            for origem, e in requisicoes:
+                histograma("requisicao_segundos", {"origem": origem}, e.latencia)
+            cabecalho("requisicao_bytes_total", "counter", "Bytes recebidos do banco.")
+            for origem, e in requisicoes:
+                linhas.append(f"{p}_requisicao_bytes_total{_rotulos({'origem': origem})} {e.bytes}")
+
+        if metricas_cache:
+            for nome, chave, ajuda in (("cache_acertos_total", "hits", "Leituras atendidas pelo cache."),
+                                       ("cache_falhas_total", "misses", "Leituras que foram ao banco."),
+                                       ("cache_invalidacoes_total", "invalidacoes", "Entradas invalidadas por escritas."),
+                                       ("cache_entradas", "entradas", "Entradas atualmente no cache."),
+                                       ("cache_taxa_acerto", "taxa_acerto", "Acertos / leituras.")):
+                cabecalho(nome, "counter" if nome.endswith("_total") else "gauge", ajuda)
+                for visao, m in metricas_cache.items():
+                    linhas.append(f"{p}_{nome}{_rotulos({'visao': visao})} {m[chave]}")
+
+        if metricas_conexao:
+            for chave in ("max_conexoes", "conexoes_abertas", "conexoes_ociosas", "requisicoes_em_andamento",
+                          "pico_em_andamento", "utilizacao"):
+                if chave in metricas_conexao:
+                    cabecalho(f"pool_{chave}", "gauge", f"Pool de conexões: {chave.replace('_', ' ')}.")
+                    linhas.append(f"{p}_pool_{chave} {metricas_conexao[chave]}")
+
+        return "\n".join(linhas) + "\n"
+
+
+def _rotulos(rotulos: Dict[str, str]) -> str:
+    """`{chave="valor",...}` com barras, aspas e quebras de linha escapadas."""
+    def escapar(valor: Any) -> str:
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in rotulos.items()) + "}"
+
+
+# Instância única do processo
+metricas = RegistroMetricas()
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.core.metricas import metricas
+
+METODOS_CONSUMO = {"media_movel": "Média Móvel", "exponencial": "Suavização Exponencial"}
+
+
+def _hora_local(momento: pd.Timestamp) -> pd.Timestamp:
+    """Hora local sem fuso: instantes com fuso são convertidos, os sem fuso já são locais."""
+    if pd.isna(momento) or momento.tzinfo is None:
+        return momento
+    return pd.Timestamp(momento.to_pydatetime().astimezone().replace(tzinfo=None))
+
+
+def _referencia(data_referencia=None) -> pd.Timestamp:
+    """Dia de referência da previsão na hora local (hoje, por padrão)."""
+    referencia = pd.Timestamp(data_referencia) if data_referencia is not None else pd.Timestamp.now()
+    return _hora_local(referencia).normalize()
+
+
+def datas_locais(valores: pd.Series) -> pd.Series:
+    """Converte as datas ISO do histórico para a hora local sem fuso.
+
+    SQLite e memória gravam a hora local sem fuso; o Supabase grava com fuso (e o
+    `now()` das RPCs chega em UTC). Tudo vai para o mesmo relógio da janela
+    (`date.today()`) e da referência, para a Saída das 22h cair no dia local certo.
+    """
+    texto = valores.astype("string")
+    com_fuso = texto.str.contains(r"[T ]\d.*(?:Z|[+-]\d{2}:?\d{2})$").fillna(False).astype(bool)
+    datas = pd.to_datetime(texto.where(~com_fuso), errors="coerce", format="ISO8601").astype("datetime64[ns]")
+    if com_fuso.any():
+        instantes = pd.to_datetime(texto[com_fuso], errors="coerce", utc=True, format="ISO8601")
+        datas[com_fuso] = pd.to_datetime(instantes.map(_hora_local)).astype("datetime64[ns]")
+    return datas
+
+
+def consumo_por_movimentacao(historico: pd.DataFrame) -> pd.DataFrame:
+    """Quantidade consumida em cada Saída, derivada do histórico.
+
+    Cada linha grava a `variacao` do saldo (negativa nas Saídas), que é o consumo.
+    Linhas gravadas antes dessa coluna só têm o saldo final: o consumo é o saldo
+    anterior do mesmo item menos o registrado, e a Saída sem registro anterior do
+    item não tem consumo conhecido e é descartada.
+    """
+    colunas = ["id", "tipo", "quantidade", "data"] + (["variacao"] if "variacao" in historico.columns else [])
+    df = historico[colunas].copy()
+    df["data"] = datas_locais(df["data"])
+    df["quantidade"] = pd.to_numeric(df["quantidade"], errors="coerce")
+    variacao = pd.to_numeric(df["variacao"], errors="coerce") if "variacao" in df.columns else np.nan
+    df = df.assign(variacao=variacao).dropna(subset=["data"])
+    df = df[df["quantidade"].notna() | df["variacao"].notna()].sort_values(["id", "data"], kind="stable")
+
+    saldo_anterior = df.groupby("id", sort=False)["quantidade"].shift()
+    saida = df["tipo"].astype(str).str.upper().isin(["SAÍDA", "SAIDA"])
+    consumo = (-df["variacao"]).fillna(saldo_anterior - df["quantidade"])
+    df["consumo"] = consumo.where(saida).clip(lower=0)
+    return df.loc[df["consumo"].notna(), ["id", "data", "consumo"]]
+
+
+@metricas.instrumentar("previsao")
+def consumo_diario(historico: pd.DataFrame, metodo: str = "media_movel", janela_dias: int = 30,
+                   alpha: float = 0.3, data_referencia: Optional[pd.Timestamp] = None) -> pd.Series:
+    """Consumo diário estimado por item (Série indexada pelo código).
+
+    Os dois métodos são uma soma ponderada do consumo pela idade (em dias) de cada
+    Saída dentro da janela, calculada com um único groupby:
+      - "media_movel": peso 1/janela (média simples dos últimos `janela_dias` dias);
+      - "exponencial": peso alpha * (1 - alpha) ** idade, normalizado na janela
+        (dias sem saída entram como consumo zero, como numa série diária reamostrada).
+    """
+    if historico is None or historico.empty:
+        return pd.Series(dtype=float, name="consumo_diario")
+
+    movimentos = consumo_por_movimentacao(historico)
+    referencia = _referencia(data_referencia)
+    idade = (referencia - movimentos["data"].dt.normalize()).dt.days
+    dentro = (idade >= 0) & (idade < janela_dias)
+    movimentos, idade = movimentos[dentro], idade[dentro]
+
+    if metodo == "exponencial":
+        peso = alpha * (1 - alpha) ** idade / (1 - (1 - alpha) ** janela_dias)
+    else:
+        peso = 1.0 / janela_dias
+
+    return (movimentos["consumo"] * peso).groupby(movimentos["id"]).sum().rename("consumo_diario")
+
+
+@metricas.instrumentar("previsao")
+def previsao_reposicao(catalogo: pd.DataFrame, consumo: pd.Series, prazo_entrega_dias: int = 0,
+                       data_referencia: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Calcula dias até o mínimo e quantidade sugerida para todos os SKUs de uma vez.
+
+    `catalogo` é o DataFrame de `gerar_relatorio`. Itens sem consumo registrado ficam
+    com 'Dias até Mínimo' infinito. A quantidade sugerida repõe até o Máximo,
+    descontando o consumo esperado durante o prazo de entrega.
+    """
+    df = catalogo[["Código", "nome", "Quantidade", "Mínimo", "Máximo"]].rename(columns={"Quantidade": "Qtd. Atual"})
+    diario = df["Código"].map(consumo).fillna(0.0).to_numpy(dtype=float)
+    qtd = df["Qtd. Atual"].to_numpy(dtype=float)
+    minimo = df["Mínimo"].to_numpy(dtype=float)
+    maximo = df["Máximo"].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dias = np.where(diario > 0, np.maximum(qtd - minimo, 0) / diario, np.inf)
+
+    referencia = _referencia(data_referencia)
+    df["Consumo Diário Médio"] = diario.round(2)
+    df["Dias até Mínimo"] = dias.round(1)
+    df["Data Prevista (Mínimo)"] = referencia + pd.to_timedelta(np.where(np.isfinite(dias), dias, np.nan), unit="D")
+    df["Qtd. Sugerida para Compra"] = np.ceil(np.clip(maximo - qtd + diario * prazo_entrega_dias, 0, None)).astype(int)
+    return df
@@ -0,0 +1,455 @@
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from src.core.analise import analise_por_fornecedor, analise_por_localizacao
+from src.core.cache_manager import cache_dados
+from src.core.classificacao import status_categorico
+from src.core.exportacao import TAMANHO_BLOCO_EXPORTACAO, exportar_blocos, fatiar
+from src.core.filtros import IndiceFiltros
+from src.core.identidade import AUSENTE, MapaIdentidade
+from src.core.metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+TABELA_PRODUTOS = "produtos"
+TABELA_HISTORICO = "historico"
+TABELA_USUARIOS = "usuarios"
+TAMANHO_PAGINA_HISTORICO = 50
+TAMANHO_LOTE_MOVIMENTACOES = 500
+
+# Valores gravados/retornados por todos os backends
+TIPOS_MOVIMENTACAO = ("Entrada", "Saída")
+STATUS_ACEITO = "Aceito"
+STATUS_REJEITADO = "Rejeitado"
+MOTIVO_NAO_ENCONTRADO = "Item não encontrado"
+MOTIVO_INVALIDA = "Movimentação inválida"
+MOTIVO_INSUFICIENTE = "Estoque insuficiente"
+MOTIVO_CONFLITO = "o item foi alterado por outra sessão; recarregue e tente novamente"
+
+# Visões de agregados de sql/agregados_produtos.sql (o SQLite cria as mesmas no esquema)
+VISAO_ESTATISTICAS = "produtos_estatisticas"
+VISAO_POR_FORNECEDOR = "produtos_por_fornecedor"
+VISAO_POR_LOCALIZACAO = "produtos_por_localizacao"
+# Colunas das visões -> colunas de `analise_por_fornecedor` / `analise_por_localizacao`
+COLUNAS_POR_FORNECEDOR = {"fornecedor": "Fornecedor", "total_skus": "Total_SKUs", "qtd_total": "Qtd_Total",
+                          "valor_total": "Valor_Total"}
+COLUNAS_POR_LOCALIZACAO = {"localizacao": "Localização", "total_skus": "Total_SKUs", "qtd_total": "Qtd_Total"}
+
+# Métodos medidos em todos os backends (latência, linhas retornadas e idas ao banco)
+OPERACOES_INSTRUMENTADAS = (
+    "get_estoque_frame", "get_estoque_data", "gerar_relatorio", "obter_estatisticas", "agregar_estatisticas",
+    "obter_resumo_fornecedores", "obter_resumo_localizacoes", "agregar_por_fornecedor", "agregar_por_localizacao",
+    "get_item_by_id",
+    "obter_itens", "buscar_itens", "ids_existentes", "adicionar_item", "adicionar_itens_lote", "atualizar_item",
+    "excluir_item", "atualizar_em_massa",
+    "movimentar_estoque", "movimentar_lote", "get_historico_data", "get_historico_pagina",
+    "contar_historico", "obter_consumo_medio", "buscar_usuario", "autenticar_usuario",
+    "buscar_posicoes", "obter_indice_filtros",
+)
+
+# Colunas de `produtos` que podem ser alteradas por atualizar_item (e seus tipos)
+CAMPOS_EDITAVEIS = {
+    "nome": str, "descricao": str, "unidade": str, "localizacao": str, "fornecedor": str,
+    "quantidade": int, "minimo": int, "maximo": int, "preco": float,
+}
+
+
+# Hash de Senha (Função auxiliar)
+def hash_senha(senha: str) -> str:
+    """Hash de senha para segurança"""
+    return hashlib.sha256(senha.encode()).hexdigest()
+
+
+def converter_campo(campo: str, valor: Any) -> Any:
+    """Converte o valor para o tipo da coluna (ValueError para campos não editáveis)."""
+    if campo not in CAMPOS_EDITAVEIS:
+        raise ValueError(f"Campo não editável: {campo}")
+    return CAMPOS_EDITAVEIS[campo](valor)
+
+
+def converter_campos(campos: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte de uma vez todos os campos de uma edição (`converter_campo`)."""
+    return {campo: converter_campo(campo, valor) for campo, valor in campos.items()}
+
+
+def montar_relatorio(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte linhas de `produtos` nas colunas do relatório (Status e Valor Total numéricos)."""
+    df = df.copy()
+
+    # Limpeza de dados
+    df['quantidade'] = pd.to_numeric(df['quantidade'], errors='coerce', downcast='integer')
+    df['minimo'] = pd.to_numeric(df['minimo'], errors='coerce', downcast='integer')
+    df['maximo'] = pd.to_numeric(df['maximo'], errors='coerce', downcast='integer')
+    df['preco'] = pd.to_numeric(df['preco'], errors='coerce')
+
+    # Cálculo de Status (vetorizado, coluna categórica)
+    df['Status'] = status_categorico(df['quantidade'], df['minimo'], df['maximo'])
+
+    # Cálculo do Valor Total (mantido numérico; a formatação em R$ fica na exibição)
+    df['Valor Total'] = df['quantidade'] * df['preco']
+
+    # Seleção e Renomeação de Colunas
+    return df[['id', 'nome', 'unidade', 'quantidade', 'minimo', 'maximo', 'localizacao', 'fornecedor', 'Status', 'preco', 'Valor Total']].rename(columns={
+        'id': 'Código',
+        'nome': 'nome',
+        'unidade': 'Unidade',
+        'quantidade': 'Quantidade',
+        'minimo': 'Mínimo',
+        'maximo': 'Máximo',
+        'localizacao': 'Localização',
+        'fornecedor': 'Fornecedor',
+        'preco': 'Preço'
+    })
+
+
+def estatisticas_relatorio(df: pd.DataFrame) -> Dict:
+    """Estatísticas do Dashboard calculadas sobre o relatório (`montar_relatorio`)."""
+    if df.empty:
+        return {
+            "total_itens": 0, "quantidade_total": 0, "valor_total": 0.0,
+            "itens_criticos": 0, "itens_excesso": 0, "taxa_ocupacao": 0.0
+        }
+
+    # Tipos nativos (não numpy): o resultado vai para JSON na CLI e nas tarefas
+    qtd_total = int(df['Quantidade'].sum())
+    valor_total = float(df['Valor Total'].sum())
+
+    itens_criticos = int((df['Quantidade'] < df['Mínimo']).sum())
+    itens_excesso = int((df['Quantidade'] > df['Máximo']).sum())
+
+    maximo_total = int(df['Máximo'].sum())
+    taxa_ocupacao = (qtd_total / maximo_total) * 100 if maximo_total > 0 else 0.0
+
+    return {
+        "total_itens": len(df),
+        "quantidade_total": qtd_total,
+        "valor_total": valor_total,
+        "itens_criticos": itens_criticos,
+        "itens_excesso": itens_excesso,
+        "taxa_ocupacao": taxa_ocupacao
+    }
+
+
+def estatisticas_totais(totais: Dict[str, Any]) -> Dict:
+    """Estatísticas do Dashboard a partir da linha de `produtos_estatisticas` (mesmas chaves de `estatisticas_relatorio`)."""
+    quantidade_total = int(totais.get("quantidade_total") or 0)
+    maximo_total = int(totais.get("maximo_total") or 0)
+    return {
+        "total_itens": int(totais.get("total_itens") or 0),
+        "quantidade_total": quantidade_total,
+        "valor_total": float(totais.get("valor_total") or 0),
+        "itens_criticos": int(totais.get("itens_criticos") or 0),
+        "itens_excesso": int(totais.get("itens_excesso") or 0),
+        "taxa_ocupacao": (quantidade_total / maximo_total) * 100 if maximo_total > 0 else 0.0
+    }
+
+
+def resumo_relatorio(relatorio: pd.DataFrame, analise: Callable[[pd.DataFrame], pd.DataFrame],
+                     colunas: Dict[str, str]) -> pd.DataFrame:
+    """Aplica `analise_por_*` ao relatório (vazio: tabela sem linhas com as colunas do resumo)."""
+    if relatorio.empty:
+        return pd.DataFrame(columns=list(colunas.values()))
+    return analise(relatorio).reset_index(drop=True)
+
+
+def resumo_agregado(linhas: List[Dict[str, Any]], colunas: Dict[str, str]) -> pd.DataFrame:
+    """Linhas de uma visão de agregados com as colunas de `analise_por_*`."""
+    return pd.DataFrame(linhas, columns=list(colunas)).rename(columns=colunas)
+
+
+def resultado_movimentacao(mov: Dict[str, Any], nova_quantidade: Optional[int], motivo: Optional[str]) -> Dict[str, Any]:
+    """Linha do retorno de `movimentar_lote` (mesmo formato em todos os backends)."""
+    return {
+        **mov,
+        "status": STATUS_ACEITO if motivo is None else STATUS_REJEITADO,
+        "nova_quantidade": nova_quantidade,
+        "motivo": motivo
+    }
+
+
+class RepositorioEstoque(ABC):
+    """Interface de armazenamento usada pelas páginas: produtos, histórico e usuários.
+
+    Cada backend (Supabase, SQLite, memória) implementa os métodos abstratos com as
+    mesmas assinaturas, nomes de coluna e valores de retorno; os índices de busca e
+    filtros, as estatísticas e a exportação são comuns a todos.
+    """
+
+    NOME_BACKEND = ""
+    # Coluna alterada a cada escrita no item: versão para a concorrência otimista de atualizar_item
+    COLUNA_VERSAO = "updated_at"
+    TABELA_PRODUTOS = TABELA_PRODUTOS
+    TABELA_HISTORICO = TABELA_HISTORICO
+    TABELA_USUARIOS = TABELA_USUARIOS
+
+    def __init_subclass__(cls, **kwargs):
+        """Instrumenta as OPERACOES_INSTRUMENTADAS que a subclasse implementa (ver `metricas`)."""
+        super().__init_subclass__(**kwargs)
+        _instrumentar(cls)
+
+    def __init__(self, ao_erro: Optional[Callable[[str], None]] = None,
+                 obter_usuario: Optional[Callable[[], str]] = None):
+        exibir_erro = ao_erro or logger.error
+
+        def erro(mensagem: str):
+            metricas.registrar_erro()
+            exibir_erro(mensagem)
+
+        self._erro = erro
+        self._obter_usuario = obter_usuario or (lambda: "Sistema")
+        self.cache = cache_dados
+        self._indice_filtros: Optional[IndiceFiltros] = None
+
+    # PRODUTOS
+
+    @abstractmethod
+    def get_estoque_frame(self) -> pd.DataFrame:
+        """Catálogo completo (colunas de `produtos`) como DataFrame somente leitura."""
+
+    @abstractmethod
+    def gerar_relatorio(self) -> pd.DataFrame:
+        """Catálogo no formato de `montar_relatorio`."""
+
+    @abstractmethod
+    def get_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Linha de `produtos` do item (ou None), sempre lida do banco (validação antes de escrever)."""
+
+    @abstractmethod
+    def buscar_itens(self, ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Linhas de `produtos` dos códigos informados, em lote (None em caso de erro)."""
+
+    @abstractmethod
+    def ids_existentes(self, ids: List[str]) -> Optional[set]:
+        """Quais dos códigos informados já existem (None em caso de erro)."""
+
+    @abstractmethod
+    def adicionar_item(self, item_id, nome, unidade, quantidade, minimo, maximo, localizacao, fornecedor, preco) -> bool:
+        """Cadastra um item novo."""
+
+    @abstractmethod
+    def adicionar_itens_lote(self, itens: List[Dict[str, Any]], atualizar_existentes: bool = False) -> bool:
+        """Insere vários itens, atualizando ou ignorando códigos já existentes.
+
+        Na atualização só as colunas presentes nos registros são gravadas e a `quantidade`
+        de um item existente nunca muda: o saldo só muda por movimentação, que vai ao histórico.
+        """
+
+    @abstractmethod
+    def atualizar_item(self, item_id: str, campos: Dict[str, Any], versao: Optional[Any] = None) -> bool:
+        """Altera campos de `CAMPOS_EDITAVEIS` numa única escrita.
+
+        Com `versao` (valor de COLUNA_VERSAO lido junto com o item), a escrita só é
+        aplicada se o item não tiver sido alterado desde então (MOTIVO_CONFLITO).
+        """
+
+    @abstractmethod
+    def atualizar_em_massa(self, filtro: Dict[str, Any], ajuste: Dict[str, Any]) -> Optional[List[str]]:
+        """Aplica o ajuste (`atualizacao_massa`) a todos os itens do filtro numa única escrita.
+
+        Retorna os códigos alterados, ou None se o filtro/ajuste for inválido, o ajuste
+        deixar algum mínimo >= máximo ou a escrita falhar (nesse caso nada é alterado).
+        """
+
+    @abstractmethod
+    def excluir_item(self, item_id: str) -> bool:
+        """Exclui o item e o seu histórico."""
+
+    @abstractmethod
+    def movimentar_estoque(self, item_id: str, tipo: str, quantidade: int, observacao: str = "") -> Optional[int]:
+        """Entrada/Saída atômica com registro no histórico; nova quantidade ou None se rejeitada."""
+
+    @abstractmethod
+    def movimentar_lote(self, movimentos: List[Dict[str, Any]],
+                        tamanho_lote: int = TAMANHO_LOTE_MOVIMENTACOES) -> List[Dict[str, Any]]:
+        """Aplica movimentações {id, tipo, quantidade, observacao}; uma `resultado_movimentacao` por linha."""
+
+    def get_estoque_data(self) -> List[Dict[str, Any]]:
+        """Catálogo completo como lista de dicionários."""
+        return self.get_estoque_frame().to_dict("records")
+
+    def obter_itens(self, ids: List[str], mapa: Optional[MapaIdentidade] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Linhas dos códigos (None para os inexistentes) para exibição, lidas uma vez por sessão.
+
+        Ordem de consulta: o mapa de identidade da sessão, o catálogo já carregado no cache
+        e, para o que faltar, uma única busca em lote no banco. O mapa só devolve cópias
+        que nenhuma escrita no item invalidou; validações antes de escrever usam `get_item_by_id`.
+        """
+        mapa = mapa if mapa is not None else MapaIdentidade(self.TABELA_PRODUTOS)
+        # Instante anterior às leituras: uma escrita concorrente invalida o que for lido agora
+        instante = self.cache.relogio()
+        itens, faltantes = {}, []
+        for item_id in dict.fromkeys(ids):
+            linha = mapa.obter(item_id)
+            if linha is AUSENTE:
+                faltantes.append(item_id)
+            else:
+                itens[item_id] = linha
+        if not faltantes:
+            return itens
+
+        # O catálogo em cache é completo: o código que não estiver nele não existe
+        catalogo = self.cache.consultar(self.get_estoque_frame)
+        if catalogo is not None and not catalogo.empty:
+            selecao = catalogo[catalogo["id"].isin(faltantes)]
+            # NaN do DataFrame volta a ser None, como na linha lida do banco
+            linhas = selecao.astype(object).where(selecao.notna(), None).to_dict("records")
+        else:
+            linhas = self.buscar_itens(faltantes)
+            if linhas is None:
+                return itens
+        encontrados = {linha["id"]: linha for linha in linhas}
+
+        for item_id in faltantes:
+            itens[item_id] = encontrados.get(item_id)
+            mapa.guardar(item_id, itens[item_id], instante)
+        return itens
+
+    def obter_item(self, item_id: str, mapa: Optional[MapaIdentidade] = None) -> Optional[Dict[str, Any]]:
+        """Linha de um item para exibição (`obter_itens`), ou None."""
+        return self.obter_itens([item_id], mapa).get(item_id)
+
+    def entrada_estoque(self, item_id: str, quantidade: int, observacao: str = "") -> bool:
+        """Incrementa a quantidade do item e registra no histórico."""
+        return self.movimentar_estoque(item_id, "Entrada", quantidade, observacao) is not None
+
+    def saida_estoque(self, item_id: str, quantidade: int, observacao: str = "") -> bool:
+        """Decrementa a quantidade do item (sem permitir saldo negativo) e registra no histórico."""
+        return self.movimentar_estoque(item_id, "Saída", quantidade, observacao) is not None
+
+    def registrar_movimentacao(self, item_id: str, tipo: str, quantidade: int, observacao: str = "") -> Dict[str, Any]:
+        """Uma Entrada/Saída com o resultado detalhado (`resultado_movimentacao`): status, nova quantidade
+        e o motivo da rejeição (estoque insuficiente, item não encontrado ou o erro do banco)."""
+        return self.movimentar_lote([{"id": item_id, "tipo": tipo, "quantidade": quantidade, "observacao": observacao}])[0]
+
+    def exportar_catalogo(self, formato: str = "CSV", tamanho_bloco: int = TAMANHO_BLOCO_EXPORTACAO) -> Iterator[bytes]:
+        """Exporta o catálogo completo em blocos no formato escolhido."""
+        return exportar_blocos(fatiar(self.gerar_relatorio(), tamanho_bloco), formato)
+
+    # AGREGADOS (Dashboard e Relatórios)
+    # As páginas chamam `agregar_*`, que os backends com banco sobrescrevem para agrupar
+    # no servidor (uma resposta pequena, qualquer que seja o tamanho do catálogo).
+    # `obter_*` (CLI e tarefas) aproveita o relatório já em cache e, sem ele, agrega no banco.
+
+    def obter_estatisticas(self) -> Dict:
+        """Estatísticas do Dashboard: do relatório em cache ou agregadas no banco."""
+        relatorio = self.cache.consultar(self.gerar_relatorio)
+        if relatorio is not None:
+            return estatisticas_relatorio(relatorio)
+        return self.agregar_estatisticas()
+
+    def obter_resumo_fornecedores(self) -> pd.DataFrame:
+        """SKUs, quantidade e valor total por fornecedor (`analise_por_fornecedor`)."""
+        relatorio = self.cache.consultar(self.gerar_relatorio)
+        if relatorio is not None:
+            return resumo_relatorio(relatorio, analise_por_fornecedor, COLUNAS_POR_FORNECEDOR)
+        return self.agregar_por_fornecedor()
+
+    def obter_resumo_localizacoes(self) -> pd.DataFrame:
+        """SKUs e quantidade total por localização (`analise_por_localizacao`)."""
+        relatorio = self.cache.consultar(self.gerar_relatorio)
+        if relatorio is not None:
+            return resumo_relatorio(relatorio, analise_por_localizacao, COLUNAS_POR_LOCALIZACAO)
+        return self.agregar_por_localizacao()
+
+    def agregar_estatisticas(self) -> Dict:
+        """Estatísticas calculadas pelo backend (padrão: sobre o relatório completo)."""
+        return estatisticas_relatorio(self.gerar_relatorio())
+
+    def agregar_por_fornecedor(self) -> pd.DataFrame:
+        """Resumo por fornecedor calculado pelo backend (padrão: sobre o relatório completo)."""
+        return resumo_relatorio(self.gerar_relatorio(), analise_por_fornecedor, COLUNAS_POR_FORNECEDOR)
+
+    def agregar_por_localizacao(self) -> pd.DataFrame:
+        """Resumo por localização calculado pelo backend (padrão: sobre o relatório completo)."""
+        return resumo_relatorio(self.gerar_relatorio(), analise_por_localizacao, COLUNAS_POR_LOCALIZACAO)
+
+    # HISTÓRICO
+
+    @abstractmethod
+    def get_historico_data(self) -> List[Dict[str, Any]]:
+        """Todas as movimentações, mais recentes primeiro."""
+
+    @abstractmethod
+    def get_historico_pagina(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                             tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                             cursor: Optional[Tuple[str, str, int]] = None,
+                             tamanho_pagina: int = TAMANHO_PAGINA_HISTORICO) -> List[Dict[str, Any]]:
+        """Uma página do histórico em (data desc, id desc, seq desc), continuando após o `cursor` (data, id, seq).
+
+        `seq` é a chave da linha no histórico: desempata movimentações do mesmo item com a mesma data.
+        """
+
+    @abstractmethod
+    def contar_historico(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                         exato: bool = False) -> Optional[int]:
+        """Quantidade de movimentações que atendem aos filtros."""
+
+    @abstractmethod
+    def obter_consumo_medio(self, metodo: str = "media_movel", janela_dias: int = 30, alpha: float = 0.3) -> pd.Series:
+        """Consumo diário médio por item (`previsao.consumo_diario`)."""
+
+    def _usuario_atual(self) -> str:
+        """Usuário gravado no histórico das movimentações."""
+        return self._obter_usuario()
+
+    # USUÁRIOS
+
+    @abstractmethod
+    def buscar_usuario(self, username: str) -> Optional[Dict[str, Any]]:
+        """Linha de `usuarios` (username, senha_hash, tipo) ou None."""
+
+    def autenticar_usuario(self, username: str, senha: str) -> Optional[str]:
+        """Autentica o usuário e retorna o tipo de usuário se for bem-sucedido."""
+        usuario_db = self.buscar_usuario(username)
+        if usuario_db and usuario_db.get('senha_hash') == hash_senha(senha):
+            return usuario_db.get('tipo', 'Operador')
+        return None
+
+    # ÍNDICES E MÉTRICAS
+
+    def buscar_posicoes(self, termo: str, catalogo: pd.DataFrame) -> Optional[np.ndarray]:
+        """Posições das linhas de `gerar_relatorio` cujo código ou nome contém o termo (índice de trigramas)."""
+        return self.indice_busca.posicoes(termo, catalogo)
+
+    def obter_indice_filtros(self, catalogo: pd.DataFrame) -> IndiceFiltros:
+        """Bitmaps de Fornecedor/Localização/Status, reconstruídos só quando o relatório muda."""
+        indice = self._indice_filtros
+        if indice is None or indice.catalogo is not catalogo:
+            indice = self._indice_filtros = IndiceFiltros(catalogo)
+        return indice
+
+    def obter_metricas_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna os contadores de hit/miss/invalidação de cada visão cacheada."""
+        return self.cache.metricas()
+
+    def obter_metricas_desempenho(self) -> List[Dict[str, Any]]:
+        """Latência (p50/p95/p99), chamadas, erros e idas ao banco de cada operação medida no processo."""
+        return metricas.resumo()
+
+    def exportar_metricas_prometheus(self) -> str:
+        """Métricas de desempenho, do cache e do pool no formato de texto do Prometheus."""
+        return metricas.exportar_prometheus(self.obter_metricas_cache(), self.obter_metricas_conexao())
+
+    def obter_estado_sincronizacao(self) -> Dict[str, Any]:
+        """Estado da sincronização incremental do catálogo (vazio se o backend não sincroniza)."""
+        return {}
+
+    def obter_metricas_conexao(self) -> Dict[str, Any]:
+        """Tamanho e utilização do pool de conexões (vazio se o backend não usa conexões)."""
+        return {}
+
+
+def _instrumentar(cls: type):
+    """Envolve os métodos concretos de `cls` listados em OPERACOES_INSTRUMENTADAS."""
+    for nome in OPERACOES_INSTRUMENTADAS:
+        metodo = cls.__dict__.get(nome)
+        if callable(metodo) and not getattr(metodo, "__isabstractmethod__", False):
+            setattr(cls, nome, metricas.instrumentar()(metodo))
+
+
+_instrumentar(RepositorioEstoque)
@@ -0,0 +1,120 @@
+import threading
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional
+from src.core.busca import IndiceBusca, indice_catalogo
+
+# Recebe uma fábrica de consultas do supabase-py e devolve todas as linhas (paginando)
+BuscarPaginado = Callable[[Callable[[], Any]], List[Dict[str, Any]]]
+
+
+class SincronizadorCatalogo:
+    """Cópia local materializada de `produtos`, atualizada por delta.
+
+    A primeira sincronização traz a tabela inteira; as seguintes buscam apenas as
+    linhas com `updated_at` posterior à marca d'água e os tombstones de
+    `produtos_excluidos` (sql/produtos_sincronizacao.sql), mesclando-os no DataFrame
+    local. Sem a coluna de versão no banco, cada sincronização volta a ser completa.
+    O índice de busca, quando informado, recebe os mesmos deltas.
+    """
+
+    def __init__(self, tabela: str = "produtos", tabela_exclusoes: str = "produtos_excluidos",
+                 coluna_versao: str = "updated_at", margem_segundos: float = 5,
+                 intervalo_completo: float = 3600, indice: Optional[IndiceBusca] = None):
+        self.tabela = tabela
+        self.tabela_exclusoes = tabela_exclusoes
+        self.coluna_versao = coluna_versao
+        # Sobreposição da marca d'água: cobre transações que gravaram uma versão
+        # anterior à marca mas só foram confirmadas depois da última leitura
+        self.margem = pd.Timedelta(seconds=margem_segundos)
+        self.intervalo_completo = intervalo_completo
+        self.indice = indice
+
+        self._lock = threading.Lock()
+        self._df: Optional[pd.DataFrame] = None
+        self._marca: Optional[pd.Timestamp] = None
+        self._ultima_completa = 0.0
+        self._falha_incremental = None
+        self.incremental = True
+        self.metricas = {"completas": 0, "incrementais": 0, "linhas_recebidas": 0, "exclusoes_recebidas": 0}
+
+    def _maior_versao(self, df: pd.DataFrame) -> Optional[pd.Timestamp]:
+        versoes = pd.to_datetime(df[self.coluna_versao], utc=True, format="ISO8601")
+        return versoes.max() if not versoes.empty else None
+
+    def _completa(self, supabase, buscar: BuscarPaginado):
+        dados = buscar(lambda: supabase.table(self.tabela).select("*").order("id"))
+        df = pd.DataFrame(dados)
+        self.incremental = df.empty or self.coluna_versao in df.columns
+        if not df.empty:
+            df = df.set_index("id", drop=False).rename_axis(None)
+        self._df = df
+        if self.indice is not None:
+            self.indice.reconstruir(df.get("id", []), df.get("nome", []))
+        self._marca = self._maior_versao(df) if self.incremental and not df.empty else None
+        self._ultima_completa = time.monotonic()
+        self.metricas["completas"] += 1
+        self.metricas["linhas_recebidas"] += len(dados)
+
+    def _incremental(self, supabase, buscar: BuscarPaginado):
+        desde = (self._marca - self.margem).isoformat()
+        alterados = buscar(lambda: supabase.table(self.tabela).select("*")
+                           .gte(self.coluna_versao, desde).order(self.coluna_versao))
+        excluidos = buscar(lambda: supabase.table(self.tabela_exclusoes).select("id")
+                           .gte("excluido_em", desde).order("excluido_em"))
+
+        if alterados or excluidos:
+            df_alterados = pd.DataFrame(alterados)
+            # Linhas alteradas refletem o estado atual: prevalecem sobre um tombstone
+            # do mesmo código (item excluído e recriado dentro do intervalo)
+            remover = {item["id"] for item in excluidos} | set(df_alterados.get("id", []))
+            df = self._df.drop(index=list(remover), errors="ignore")
+            if not df_alterados.empty:
+                df = pd.concat([df, df_alterados.set_index("id", drop=False).rename_axis(None)]).sort_index()
+                self._marca = max(self._marca, self._maior_versao(df_alterados))
+            self._df = df
+
+            if self.indice is not None:
+                for codigo in remover - set(df_alterados.get("id", [])):
+                    self.indice.remover(codigo)
+                self.indice.atualizar_lote(df_alterados.get("id", []), df_alterados.get("nome", []))
+
+        self.metricas["incrementais"] += 1
+        self.metricas["linhas_recebidas"] += len(alterados)
+        self.metricas["exclusoes_recebidas"] += len(excluidos)
+
+    def sincronizar(self, supabase, buscar: BuscarPaginado) -> pd.DataFrame:
+        """Atualiza a cópia local e a retorna (indexada pelo código; não deve ser modificada)."""
+        with self._lock:
+            agora = time.monotonic()
+            precisa_completa = (
+                self._df is None or self._marca is None or not self.incremental
+                or agora - self._ultima_completa > self.intervalo_completo
+                or (self._falha_incremental is not None and agora - self._falha_incremental < self.intervalo_completo)
+            )
+            if precisa_completa:
+                self._completa(supabase, buscar)
+            else:
+                try:
+                    self._incremental(supabase, buscar)
+                    self._falha_incremental = None
+                except Exception:
+                    # Tabela de tombstones indisponível: modo completo até a próxima tentativa
+                    self._falha_incremental = agora
+                    self._completa(supabase, buscar)
+            return self._df
+
+    def estado(self) -> Dict[str, Any]:
+        """Resumo para a tela de Configurações."""
+        with self._lock:
+            return {
+                "modo": "incremental" if self.incremental and self._marca is not None
+                        and self._falha_incremental is None else "completo",
+                "itens": 0 if self._df is None else len(self._df),
+                "marca_dagua": None if self._marca is None else self._marca.isoformat(),
+                **self.metricas,
+            }
+
+
+# Instância única do processo, compartilhada pelas sessões (como o cache de dados)
+sincronizador_catalogo = SincronizadorCatalogo(indice=indice_catalogo)
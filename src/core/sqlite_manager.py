@@ -0,0 +1,638 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import pandas as pd
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from src.core import atualizacao_massa
+from src.core.cache_manager import cache_dados
+from src.core.busca import IndiceBusca
+from src.core.exportacao import TAMANHO_BLOCO_EXPORTACAO, exportar_blocos
+from src.core.metricas import metricas
+from src.core.previsao import consumo_diario
+from src.core.repositorio import (RepositorioEstoque, TABELA_PRODUTOS, TABELA_HISTORICO, TABELA_USUARIOS,
+                                  TAMANHO_PAGINA_HISTORICO, TAMANHO_LOTE_MOVIMENTACOES, TIPOS_MOVIMENTACAO,
+                                  STATUS_ACEITO, MOTIVO_NAO_ENCONTRADO, MOTIVO_INVALIDA, MOTIVO_INSUFICIENTE,
+                                  MOTIVO_CONFLITO, VISAO_ESTATISTICAS, VISAO_POR_FORNECEDOR, VISAO_POR_LOCALIZACAO,
+                                  COLUNAS_POR_FORNECEDOR, COLUNAS_POR_LOCALIZACAO, converter_campos,
+                                  estatisticas_totais, montar_relatorio, resultado_movimentacao, resumo_agregado)
+
+CAMINHO_PADRAO = os.path.join("dados", "estoque.db")
+MAX_CONEXOES_SQLITE = 8
+TIMEOUT_BLOQUEIO_SEGUNDOS = 30
+TAMANHO_LOTE_SQL = 500  # códigos por consulta `IN (...)`
+
+COLUNAS_PRODUTOS = ("id", "nome", "descricao", "unidade", "quantidade", "minimo", "maximo",
+                    "localizacao", "fornecedor", "preco")
+COLUNAS_HISTORICO = "id, nome, tipo, quantidade, data, usuario, observacao"
+# Toda escrita em `produtos` avança `versao` (token da checagem otimista, que não repete
+# como o relógio) e marca `updated_at`
+SQL_NOVA_VERSAO = "versao = versao + 1, updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+# `classificar_status` em SQL (sem a faixa de reposição), como `produtos_status` no Supabase
+SQL_STATUS = ("CASE WHEN quantidade = 0 THEN 0 WHEN quantidade < minimo THEN 1 "
+              "WHEN quantidade > maximo THEN 3 ELSE 4 END")
+
+# Mesmas tabelas do Supabase. `produtos` é agrupada pelo código (WITHOUT ROWID), então
+# a busca por id é uma única descida na árvore; os índices do histórico seguem
+# sql/historico_indices.sql (paginação por (data, id, seq), filtros por item e por tipo) e
+# as visões de agregados seguem sql/agregados_produtos.sql.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS produtos (
+    id          TEXT PRIMARY KEY,
+    nome        TEXT NOT NULL,
+    descricao   TEXT,
+    unidade     TEXT,
+    quantidade  INTEGER NOT NULL DEFAULT 0 CHECK (quantidade >= 0),
+    minimo      INTEGER NOT NULL DEFAULT 0,
+    maximo      INTEGER NOT NULL DEFAULT 0,
+    localizacao TEXT,
+    fornecedor  TEXT,
+    preco       REAL NOT NULL DEFAULT 0,
+    updated_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+    versao      INTEGER NOT NULL DEFAULT 1
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS historico (
+    seq         INTEGER PRIMARY KEY,
+    id          TEXT NOT NULL,
+    nome        TEXT,
+    tipo        TEXT NOT NULL,
+    quantidade  INTEGER,
+    data        TEXT NOT NULL,
+    usuario     TEXT,
+    observacao  TEXT,
+    variacao    INTEGER
+);
+DROP INDEX IF EXISTS historico_data_id_idx;
+CREATE INDEX IF NOT EXISTS historico_data_id_seq_idx ON historico (data DESC, id DESC, seq DESC);
+CREATE INDEX IF NOT EXISTS historico_id_data_idx ON historico (id, data DESC);
+CREATE INDEX IF NOT EXISTS historico_tipo_data_idx ON historico (tipo, data DESC);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    username    TEXT PRIMARY KEY,
+    senha_hash  TEXT NOT NULL,
+    tipo        TEXT NOT NULL DEFAULT 'Operador'
+) WITHOUT ROWID;
+
+CREATE VIEW IF NOT EXISTS produtos_estatisticas AS
+SELECT COUNT(*) AS total_itens,
+       COALESCE(SUM(quantidade), 0) AS quantidade_total,
+       COALESCE(SUM(quantidade * preco), 0.0) AS valor_total,
+       COUNT(*) FILTER (WHERE quantidade < minimo) AS itens_criticos,
+       COUNT(*) FILTER (WHERE quantidade > maximo) AS itens_excesso,
+       COALESCE(SUM(maximo), 0) AS maximo_total
+  FROM produtos;
+
+CREATE VIEW IF NOT EXISTS produtos_por_fornecedor AS
+SELECT fornecedor, COUNT(*) AS total_skus, COALESCE(SUM(quantidade), 0) AS qtd_total,
+       COALESCE(SUM(quantidade * preco), 0.0) AS valor_total
+  FROM produtos WHERE fornecedor IS NOT NULL GROUP BY fornecedor;
+
+CREATE VIEW IF NOT EXISTS produtos_por_localizacao AS
+SELECT localizacao, COUNT(*) AS total_skus, COALESCE(SUM(quantidade), 0) AS qtd_total
+  FROM produtos WHERE localizacao IS NOT NULL GROUP BY localizacao;
+"""
+
+
+class PoolSqlite:
+    """Pool de conexões para um arquivo SQLite em modo WAL.
+
+    No WAL, leitores não bloqueiam o escritor (e vice-versa), então cada sessão pega
+    uma conexão própria; as escritas são serializadas pelo próprio SQLite. Conexões
+    são reaproveitadas entre as execuções do script, que rodam em threads diferentes.
+    """
+
+    def __init__(self, caminho: str, max_conexoes: int = MAX_CONEXOES_SQLITE):
+        self.caminho = caminho
+        self.max_conexoes = max_conexoes
+        self._livres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(max_conexoes)
+        self._lock = threading.Lock()
+        self._abertas = 0
+        self._em_andamento = 0
+        self._pico = 0
+        self._total = 0
+
+    def _abrir(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_BLOQUEIO_SEGUNDOS,
+                                  isolation_level=None, check_same_thread=False)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA journal_mode=WAL")
+        # Seguro no WAL: um commit só perde durabilidade em queda de energia, não corrompe
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("PRAGMA temp_store=MEMORY")
+        return conexao
+
+    @contextmanager
+    def conexao(self) -> Iterator[sqlite3.Connection]:
+        self._vagas.acquire()
+        with self._lock:
+            self._em_andamento += 1
+            self._total += 1
+            self._pico = max(self._pico, self._em_andamento)
+        try:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                conexao = self._abrir()
+                with self._lock:
+                    self._abertas += 1
+            inicio = time.perf_counter()
+            try:
+                yield conexao
+            finally:
+                if conexao.in_transaction:
+                    conexao.rollback()
+                self._livres.put(conexao)
+                metricas.registrar_requisicao("sqlite", time.perf_counter() - inicio)
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+            self._vagas.release()
+
+    @contextmanager
+    def transacao(self) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita: BEGIN IMMEDIATE reserva a escrita já no início (sem deadlock de upgrade)."""
+        with self.conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexao
+            except BaseException:
+                conexao.rollback()
+                raise
+            conexao.commit()
+
+    def fechar(self):
+        while True:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                return
+            conexao.execute("PRAGMA optimize")
+            conexao.close()
+            with self._lock:
+                self._abertas -= 1
+
+    def metricas(self) -> Dict[str, Any]:
+        """Mesmas chaves de `TransporteMedido.metricas` (a página de Configurações é comum)."""
+        with self._lock:
+            return {
+                "max_conexoes": self.max_conexoes,
+                "conexoes_abertas": self._abertas,
+                "conexoes_ociosas": self._livres.qsize(),
+                "requisicoes_em_andamento": self._em_andamento,
+                "pico_em_andamento": self._pico,
+                "requisicoes_total": self._total,
+                "utilizacao": self._em_andamento / self.max_conexoes if self.max_conexoes else 0.0,
+            }
+
+
+def _filtros_historico(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                       tipo: Optional[str] = None, item_id: Optional[str] = None,
+                       usuario: Optional[str] = None) -> Tuple[List[str], List[Any]]:
+    """Cláusulas WHERE (e parâmetros) dos filtros do Histórico."""
+    condicoes, parametros = [], []
+    if data_inicio:
+        condicoes.append("data >= ?")
+        parametros.append(data_inicio.isoformat())
+    if data_fim:
+        condicoes.append("data < ?")
+        parametros.append((data_fim + timedelta(days=1)).isoformat())
+    if tipo:
+        condicoes.append("tipo = ?")
+        parametros.append(tipo)
+    if item_id:
+        condicoes.append("id = ?")
+        parametros.append(item_id)
+    if usuario:
+        condicoes.append("usuario LIKE ?")
+        parametros.append(f"%{usuario}%")
+    return condicoes, parametros
+
+
+def _where(condicoes: List[str]) -> str:
+    return f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+
+def _condicoes_filtro(filtro: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """WHERE do filtro da atualização em massa (`atualizacao_massa.selecionar`) e seus parâmetros."""
+    condicoes, parametros = [], []
+    for campo in ("fornecedor", "localizacao"):
+        if campo in filtro:
+            condicoes.append(f"{campo} = ?")
+            parametros.append(filtro[campo])
+    if "ids" in filtro:
+        # Uma lista de qualquer tamanho num único parâmetro
+        condicoes.append("id IN (SELECT value FROM json_each(?))")
+        parametros.append(json.dumps(filtro["ids"]))
+    if "status" in filtro:
+        condicoes.append(f"{SQL_STATUS} = ?")
+        parametros.append(filtro["status"])
+    return " AND ".join(condicoes), parametros
+
+
+class SqliteManager(RepositorioEstoque):
+    """Backend embutido em um arquivo SQLite local (um PC no almoxarifado, sem rede)."""
+
+    NOME_BACKEND = "SQLite (arquivo local)"
+    COLUNA_VERSAO = "versao"
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO, max_conexoes: int = MAX_CONEXOES_SQLITE,
+                 ao_erro: Optional[Callable[[str], None]] = None,
+                 obter_usuario: Optional[Callable[[], str]] = None):
+        """Abre (ou cria) o banco e o esquema; a instância é compartilhada pelas sessões do processo."""
+        super().__init__(ao_erro, obter_usuario)
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self.caminho = caminho
+        self.pool = PoolSqlite(caminho, max_conexoes)
+        with self.pool.conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+            # Bancos criados antes da coluna `variacao` (ver sql/registrar_movimentacao.sql)
+            if "variacao" not in {c["name"] for c in conexao.execute("PRAGMA table_info(historico)")}:
+                conexao.execute("ALTER TABLE historico ADD COLUMN variacao INTEGER")
+            if "versao" not in {c["name"] for c in conexao.execute("PRAGMA table_info(produtos)")}:
+                conexao.execute("ALTER TABLE produtos ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+        self.indice_busca = IndiceBusca()
+        self._reconstruir_indice()
+
+    def _reconstruir_indice(self):
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute("SELECT id, nome FROM produtos").fetchall()
+        self.indice_busca.reconstruir((l["id"] for l in linhas), (l["nome"] for l in linhas))
+
+    def _ler(self, sql: str, parametros: Tuple = ()) -> List[Dict[str, Any]]:
+        with self.pool.conexao() as conexao:
+            return [dict(linha) for linha in conexao.execute(sql, parametros)]
+
+    # PRODUTOS
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def get_estoque_frame(_self) -> pd.DataFrame:
+        """Catálogo completo como DataFrame (somente leitura)."""
+        try:
+            with _self.pool.conexao() as conexao:
+                df = pd.read_sql_query("SELECT * FROM produtos ORDER BY id", conexao)
+        except Exception as e:
+            _self._erro(f"Erro ao buscar estoque: {e}")
+            return pd.DataFrame()
+        # Outro processo (ex.: importação pela CLI) pode ter inserido ou excluído itens
+        if len(df) != len(_self.indice_busca):
+            _self.indice_busca.reconstruir(df["id"], df["nome"])
+        return df
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def gerar_relatorio(_self) -> pd.DataFrame:
+        """Busca dados brutos, calcula o status e o valor total, e retorna um DataFrame numérico."""
+        df = _self.get_estoque_frame()
+        if df.empty:
+            return pd.DataFrame()
+        return montar_relatorio(df)
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_estatisticas(_self) -> Dict:
+        """Totais do catálogo somados no SQLite (visão `produtos_estatisticas`)."""
+        try:
+            linhas = _self._ler(f"SELECT * FROM {VISAO_ESTATISTICAS}")
+        except Exception as e:
+            _self._erro(f"Erro ao calcular estatísticas: {e}")
+            linhas = []
+        return estatisticas_totais(linhas[0] if linhas else {})
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_por_fornecedor(_self) -> pd.DataFrame:
+        """SKUs, quantidade e valor por fornecedor agrupados no SQLite (maior valor primeiro)."""
+        return _self._ler_agregado(VISAO_POR_FORNECEDOR, COLUNAS_POR_FORNECEDOR, "valor_total")
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_por_localizacao(_self) -> pd.DataFrame:
+        """SKUs e quantidade por localização agrupados no SQLite (maior quantidade primeiro)."""
+        return _self._ler_agregado(VISAO_POR_LOCALIZACAO, COLUNAS_POR_LOCALIZACAO, "qtd_total")
+
+    def _ler_agregado(self, visao: str, colunas: Dict[str, str], ordem: str) -> pd.DataFrame:
+        grupo = next(iter(colunas))
+        try:
+            linhas = self._ler(f"SELECT {', '.join(colunas)} FROM {visao} ORDER BY {ordem} DESC, {grupo}")
+        except Exception as e:
+            self._erro(f"Erro ao consultar {visao}: {e}")
+            linhas = []
+        return resumo_agregado(linhas, colunas)
+
+    def get_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Busca um item específico pelo ID (Não cacheado, usado para checagens em tempo real)."""
+        try:
+            linhas = self._ler("SELECT * FROM produtos WHERE id = ?", (item_id,))
+            return linhas[0] if linhas else None
+        except Exception:
+            return None
+
+    def buscar_itens(self, ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Busca vários itens pelo ID com `IN (...)` em blocos (Não cacheado; ver `obter_itens`)."""
+        ids = list(ids)
+        linhas = []
+        try:
+            with self.pool.conexao() as conexao:
+                for inicio in range(0, len(ids), TAMANHO_LOTE_SQL):
+                    bloco = ids[inicio:inicio + TAMANHO_LOTE_SQL]
+                    marcadores = ",".join("?" * len(bloco))
+                    linhas.extend(dict(linha) for linha in conexao.execute(
+                        f"SELECT * FROM produtos WHERE id IN ({marcadores})", bloco))
+            return linhas
+        except Exception as e:
+            self._erro(f"Erro ao buscar itens: {e}")
+            return None
+
+    def ids_existentes(self, ids: List[str]) -> Optional[set]:
+        """Retorna quais dos códigos informados já existem (None em caso de erro)."""
+        ids = list(ids)
+        existentes = set()
+        try:
+            with self.pool.conexao() as conexao:
+                for inicio in range(0, len(ids), TAMANHO_LOTE_SQL):
+                    bloco = ids[inicio:inicio + TAMANHO_LOTE_SQL]
+                    marcadores = ",".join("?" * len(bloco))
+                    existentes.update(l[0] for l in conexao.execute(
+                        f"SELECT id FROM produtos WHERE id IN ({marcadores})", bloco))
+            return existentes
+        except Exception as e:
+            self._erro(f"Erro ao consultar códigos existentes: {e}")
+            return None
+
+    def adicionar_item(self, item_id, nome, unidade, quantidade, minimo, maximo, localizacao, fornecedor, preco) -> bool:
+        """Adiciona um novo item ao banco."""
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.execute(
+                    "INSERT INTO produtos (id, nome, unidade, quantidade, minimo, maximo, localizacao, fornecedor, preco)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, nome, unidade, int(quantidade), int(minimo), int(maximo), localizacao, fornecedor, float(preco))
+                )
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            self.indice_busca.atualizar(item_id, nome)
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao adicionar item: {e}")
+            return False
+
+    def adicionar_itens_lote(self, itens: List[Dict[str, Any]], atualizar_existentes: bool = False) -> bool:
+        """Insere vários itens em uma transação (atualizando as colunas informadas, exceto o saldo, ou ignorando códigos já existentes)."""
+        if not itens:
+            return True
+        colunas = [c for c in COLUNAS_PRODUTOS if c in itens[0]]
+        # O saldo de um item existente não muda pela importação (ver RepositorioEstoque)
+        atualizadas = [c for c in colunas if c not in ("id", "quantidade")]
+        if atualizar_existentes and atualizadas:
+            conflito = "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in atualizadas) + f", {SQL_NOVA_VERSAO}"
+        else:
+            conflito = "DO NOTHING"
+        sql = (f"INSERT INTO produtos ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+               f" ON CONFLICT (id) {conflito}")
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.executemany(sql, ([item.get(c) for c in colunas] for item in itens))
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item["id"] for item in itens])
+            self.indice_busca.atualizar_lote([item["id"] for item in itens], [item.get("nome", "") for item in itens])
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao importar itens: {e}")
+            return False
+
+    def atualizar_item(self, item_id: str, campos: Dict[str, Any], versao: Optional[Any] = None) -> bool:
+        """Atualiza vários campos de um item num único UPDATE (com checagem de versão opcional)."""
+        try:
+            campos = converter_campos(campos)
+            if not campos:
+                return True
+            # Nomes de coluna validados por converter_campos (CAMPOS_EDITAVEIS)
+            atribuicoes = ", ".join(f"{campo} = ?" for campo in campos)
+            sql = f"UPDATE produtos SET {atribuicoes}, {SQL_NOVA_VERSAO} WHERE id = ?"
+            parametros = [*campos.values(), item_id]
+            if versao is not None:
+                sql += f" AND {self.COLUNA_VERSAO} = ?"
+                parametros.append(versao)
+            with self.pool.transacao() as conexao:
+                alteradas = conexao.execute(sql, parametros).rowcount
+        except Exception as e:
+            self._erro(f"Erro ao atualizar item: {e}")
+            return False
+
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+        if not alteradas:
+            if versao is not None:
+                self._erro(f"Erro ao atualizar item: {MOTIVO_CONFLITO}.")
+            return False
+        if "nome" in campos:
+            self.indice_busca.atualizar(item_id, campos["nome"])
+        return True
+
+    def atualizar_em_massa(self, filtro: Dict[str, Any], ajuste: Dict[str, Any]) -> Optional[List[str]]:
+        """Reajuste em massa com um único UPDATE ... RETURNING (nada muda se algum mínimo ficar >= máximo)."""
+        try:
+            filtro, ajuste = atualizacao_massa.normalizar(filtro, ajuste)
+            onde, parametros = _condicoes_filtro(filtro)
+            atribuicoes, valores = [], []
+            if "preco_percentual" in ajuste:
+                atribuicoes.append("preco = MAX(ROUND(preco * (1 + ? / 100.0), 2), ?)")
+                valores += [ajuste["preco_percentual"], atualizacao_massa.PRECO_MINIMO]
+            elif "preco_valor" in ajuste:
+                atribuicoes.append("preco = MAX(ROUND(preco + ?, 2), ?)")
+                valores += [ajuste["preco_valor"], atualizacao_massa.PRECO_MINIMO]
+            for campo in ("minimo", "maximo", "localizacao"):
+                if campo in ajuste:
+                    atribuicoes.append(f"{campo} = ?")
+                    valores.append(ajuste[campo])
+
+            with self.pool.transacao() as conexao:
+                if "minimo" in ajuste or "maximo" in ajuste:
+                    conflito = conexao.execute(
+                        f"SELECT 1 FROM produtos WHERE {onde} AND COALESCE(?, minimo) >= COALESCE(?, maximo) LIMIT 1",
+                        [*parametros, ajuste.get("minimo"), ajuste.get("maximo")]
+                    ).fetchone()
+                    if conflito:
+                        raise ValueError(atualizacao_massa.MOTIVO_MINIMO_MAXIMO)
+                ids = [linha[0] for linha in conexao.execute(
+                    f"UPDATE produtos SET {', '.join(atribuicoes)}, {SQL_NOVA_VERSAO} WHERE {onde} RETURNING id",
+                    [*valores, *parametros]
+                )]
+        except Exception as e:
+            self._erro(f"Erro na atualização em massa: {e}")
+            return None
+
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=ids)
+        return ids
+
+    def excluir_item(self, item_id: str) -> bool:
+        """Exclui um item e seu histórico de movimentações na mesma transação."""
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.execute("DELETE FROM produtos WHERE id = ?", (item_id,))
+                conexao.execute("DELETE FROM historico WHERE id = ?", (item_id,))
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+            self.indice_busca.remover(item_id)
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao excluir item: {e}")
+            return False
+
+    def exportar_catalogo(self, formato: str = "CSV", tamanho_bloco: int = TAMANHO_BLOCO_EXPORTACAO) -> Iterator[bytes]:
+        """Exporta o catálogo completo lendo o banco em blocos, sem montar o DataFrame da tela."""
+        def blocos():
+            with self.pool.conexao() as conexao:
+                for bloco in pd.read_sql_query("SELECT * FROM produtos ORDER BY id", conexao, chunksize=tamanho_bloco):
+                    yield montar_relatorio(bloco)
+        return exportar_blocos(blocos(), formato)
+
+    # MOVIMENTAÇÕES
+
+    def _aplicar_movimento(self, conexao: sqlite3.Connection, mov: Dict[str, Any], usuario: str,
+                           agora: str) -> Tuple[Optional[int], Optional[str]]:
+        """Atualiza o saldo e grava o histórico dentro da transação aberta; (nova quantidade, motivo)."""
+        if mov["quantidade"] <= 0 or mov["tipo"] not in TIPOS_MOVIMENTACAO:
+            return None, MOTIVO_INVALIDA
+        delta = mov["quantidade"] if mov["tipo"] == "Entrada" else -mov["quantidade"]
+        linha = conexao.execute(
+            "UPDATE produtos SET quantidade = quantidade + ?, versao = versao + 1, updated_at = ?"
+            " WHERE id = ? AND quantidade + ? >= 0 RETURNING quantidade, nome",
+            (delta, agora, mov["id"], delta)
+        ).fetchone()
+        if linha is None:
+            existe = conexao.execute("SELECT 1 FROM produtos WHERE id = ?", (mov["id"],)).fetchone()
+            return None, MOTIVO_INSUFICIENTE if existe else MOTIVO_NAO_ENCONTRADO
+        conexao.execute(
+            f"INSERT INTO historico ({COLUNAS_HISTORICO}, variacao) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (mov["id"], linha["nome"], mov["tipo"], linha["quantidade"], agora, usuario, mov["observacao"], delta)
+        )
+        return linha["quantidade"], None
+
+    def movimentar_estoque(self, item_id: str, tipo: str, quantidade: int, observacao: str = "") -> Optional[int]:
+        """Aplica uma Entrada/Saída e registra o histórico na mesma transação.
+
+        Retorna a nova quantidade ou None se a movimentação foi rejeitada (item
+        inexistente ou estoque insuficiente).
+        """
+        mov = {"id": item_id, "tipo": tipo, "quantidade": int(quantidade), "observacao": observacao}
+        try:
+            with self.pool.transacao() as conexao:
+                nova_quantidade, _ = self._aplicar_movimento(conexao, mov, self._usuario_atual(),
+                                                             datetime.now().isoformat())
+        except Exception as e:
+            self._erro(f"Erro ao registrar movimentação: {e}")
+            return None
+
+        if nova_quantidade is not None:
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+        return nova_quantidade
+
+    def movimentar_lote(self, movimentos: List[Dict[str, Any]], tamanho_lote: int = TAMANHO_LOTE_MOVIMENTACOES) -> List[Dict[str, Any]]:
+        """Aplica uma lista de movimentações {id, tipo, quantidade, observacao}, uma transação por bloco."""
+        resultados = []
+        usuario = self._usuario_atual()
+
+        for inicio in range(0, len(movimentos), tamanho_lote):
+            bloco = [
+                {
+                    "id": str(mov["id"]),
+                    "tipo": mov["tipo"],
+                    "quantidade": int(mov["quantidade"]),
+                    "observacao": mov.get("observacao", "") or ""
+                }
+                for mov in movimentos[inicio:inicio + tamanho_lote]
+            ]
+            try:
+                agora = datetime.now().isoformat()
+                with self.pool.transacao() as conexao:
+                    retorno = [self._aplicar_movimento(conexao, mov, usuario, agora) for mov in bloco]
+            except Exception as e:
+                self._erro(f"Erro ao registrar movimentações em lote: {e}")
+                retorno = [(None, str(e))] * len(bloco)
+
+            resultados.extend(resultado_movimentacao(mov, nova, motivo) for mov, (nova, motivo) in zip(bloco, retorno))
+
+        ids_aceitos = {r["id"] for r in resultados if r["status"] == STATUS_ACEITO}
+        if ids_aceitos:
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=ids_aceitos)
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=ids_aceitos)
+        return resultados
+
+    # HISTÓRICO
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=5)
+    def get_historico_data(_self) -> List[Dict[str, Any]]:
+        """Busca todas as movimentações da tabela 'historico'."""
+        try:
+            return _self._ler(f"SELECT {COLUNAS_HISTORICO} FROM historico ORDER BY data DESC")
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico: {e}")
+            return []
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=5)
+    def get_historico_pagina(_self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                             tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                             cursor: Optional[Tuple[str, str, int]] = None,
+                             tamanho_pagina: int = TAMANHO_PAGINA_HISTORICO) -> List[Dict[str, Any]]:
+        """Busca uma página do histórico (mais recentes primeiro) com paginação por chave (data, id, seq)."""
+        condicoes, parametros = _filtros_historico(data_inicio, data_fim, tipo, item_id, usuario)
+        if cursor:
+            condicoes.append("(data, id, seq) < (?, ?, ?)")
+            parametros.extend(cursor)
+        try:
+            return _self._ler(
+                f"SELECT seq, {COLUNAS_HISTORICO} FROM historico{_where(condicoes)} "
+                "ORDER BY data DESC, id DESC, seq DESC LIMIT ?",
+                (*parametros, tamanho_pagina)
+            )
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico: {e}")
+            return []
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=60)
+    def contar_historico(_self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                         exato: bool = False) -> Optional[int]:
+        """Conta as movimentações que atendem aos filtros (sempre exato: a contagem é local)."""
+        condicoes, parametros = _filtros_historico(data_inicio, data_fim, tipo, item_id, usuario)
+        try:
+            return _self._ler(f"SELECT COUNT(*) AS total FROM historico{_where(condicoes)}", tuple(parametros))[0]["total"]
+        except Exception as e:
+            _self._erro(f"Erro ao contar histórico: {e}")
+            return None
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=600)
+    def obter_consumo_medio(_self, metodo: str = "media_movel", janela_dias: int = 30, alpha: float = 0.3) -> pd.Series:
+        """Consumo diário médio por item, recalculado apenas quando o histórico muda."""
+        # Um dia a mais para o saldo anterior das linhas gravadas sem `variacao`
+        desde = (date.today() - timedelta(days=janela_dias + 1)).isoformat()
+        try:
+            dados = _self._ler("SELECT id, tipo, quantidade, variacao, data FROM historico WHERE data >= ? ORDER BY data",
+                               (desde,))
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico de consumo: {e}")
+            dados = []
+        return consumo_diario(pd.DataFrame(dados), metodo, janela_dias, alpha)
+
+    # USUÁRIOS
+
+    @cache_dados.memorizar(tabelas=[TABELA_USUARIOS], ttl=3600, por_chave=True)
+    def buscar_usuario(_self, username: str) -> Optional[Dict[str, Any]]:
+        """Busca o usuário pelo nome de usuário."""
+        try:
+            linhas = _self._ler("SELECT * FROM usuarios WHERE username = ?", (username,))
+            return linhas[0] if linhas else None
+        except Exception:
+            return None
+
+    # MÉTRICAS
+
+    def obter_metricas_conexao(self) -> Dict[str, Any]:
+        """Retorna o tamanho e a utilização do pool de conexões SQLite."""
+        return self.pool.metricas()
+
+    def fechar(self):
+        """Fecha as conexões ociosas (rodando PRAGMA optimize antes)."""
+        self.pool.fechar()
@@ -0,0 +1,604 @@
+import pandas as pd
+from supabase import Client
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
+from datetime import datetime, date, timedelta
+import json
+import time
+from src.core.cache_manager import cache_dados
+from src.core.conexao import MAX_CONEXOES, criar_cliente_supabase
+from src.core.previsao import consumo_diario
+from src.core.sincronizacao import SincronizadorCatalogo, sincronizador_catalogo
+from src.core.busca import IndiceBusca, indice_catalogo
+from src.core.exportacao import exportar_blocos
+from src.core import atualizacao_massa
+from src.core.repositorio import (RepositorioEstoque, TABELA_PRODUTOS, TABELA_HISTORICO, TABELA_USUARIOS,
+                                  TAMANHO_PAGINA_HISTORICO, TAMANHO_LOTE_MOVIMENTACOES, TIPOS_MOVIMENTACAO,
+                                  STATUS_ACEITO, MOTIVO_NAO_ENCONTRADO, MOTIVO_INVALIDA, MOTIVO_INSUFICIENTE,
+                                  MOTIVO_CONFLITO, VISAO_ESTATISTICAS, VISAO_POR_FORNECEDOR, VISAO_POR_LOCALIZACAO,
+                                  COLUNAS_POR_FORNECEDOR, COLUNAS_POR_LOCALIZACAO, converter_campos,
+                                  estatisticas_totais, hash_senha, montar_relatorio, resultado_movimentacao,
+                                  resumo_agregado)
+
+FUNCAO_MOVIMENTACAO = "registrar_movimentacao"
+FUNCAO_MOVIMENTACAO_LOTE = "registrar_movimentacoes_lote"
+FUNCAO_ATUALIZACAO_MASSA = "atualizar_produtos_massa"
+TAMANHO_PAGINA = 1000  # limite padrão de linhas por resposta do PostgREST no Supabase
+TAMANHO_LOTE_IN = 200  # códigos por filtro `in_` (mantém a URL da consulta curta)
+# Relação inexistente no PostgREST (sql/agregados_produtos.sql ainda não aplicado)
+CODIGOS_VISAO_AUSENTE = ("PGRST205", "42P01")
+
+
+class SupabaseManager(RepositorioEstoque):
+    """Gerencia a conexão e todas as operações CRUD com o Supabase."""
+
+    NOME_BACKEND = "Supabase (PostgreSQL)"
+    
+    def __init__(self, url: str = "", key: str = "", max_conexoes: int = MAX_CONEXOES,
+                 ao_erro: Optional[Callable[[str], None]] = None,
+                 obter_usuario: Optional[Callable[[], str]] = None,
+                 cliente: Optional[Client] = None):
+        """Cria o cliente e o pool HTTP; a instância é compartilhada por todas as sessões do processo.
+
+        Não depende do Streamlit: erros das operações vão para `ao_erro` (log, por padrão)
+        e o usuário gravado no histórico vem de `obter_usuario` ('Sistema', por padrão),
+        o que permite usar o gerenciador em CLI, jobs e workers. Falhas de conexão são
+        propagadas para quem cria o gerenciador.
+
+        `cliente` substitui o cliente real (ex.: `ClienteSupabaseSimulado` em benchmarks);
+        ele ganha cópia local e índice de busca próprios, e suas `metricas()`, se houver,
+        aparecem no lugar das do pool HTTP.
+        """
+        super().__init__(ao_erro, obter_usuario)
+        self.supabase: Client
+        if cliente is not None:
+            self.supabase, self.transporte = cliente, cliente if hasattr(cliente, "metricas") else None
+            self.indice_busca = IndiceBusca()
+            self.sincronizador = SincronizadorCatalogo(indice=self.indice_busca)
+        else:
+            self.supabase, self.transporte = criar_cliente_supabase(url, key, max_conexoes=max_conexoes)
+            self.indice_busca = indice_catalogo
+            self.sincronizador = sincronizador_catalogo
+
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def get_estoque_frame(_self) -> pd.DataFrame:
+        """Catálogo completo como DataFrame, mantido por sincronização incremental (somente leitura)."""
+        try:
+            return _self.sincronizador.sincronizar(_self.supabase, _self._buscar_paginado).reset_index(drop=True)
+        except Exception as e:
+            _self._erro(f"Erro ao buscar estoque: {e}")
+            return pd.DataFrame()
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def get_estoque_data(_self) -> List[Dict[str, Any]]:
+        """Busca todos os itens da tabela 'produtos' no Supabase."""
+        return _self.get_estoque_frame().to_dict("records")
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=5)
+    def get_historico_data(_self) -> List[Dict[str, Any]]:
+        """Busca todas as movimentações da tabela 'historico'."""
+        try:
+            response = _self.supabase.table(_self.TABELA_HISTORICO).select("*").order("data", desc=True).execute()
+            return response.data
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico: {e}")
+            return []
+
+    def _filtrar_historico(self, consulta, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                           tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None):
+        """Aplica os filtros do Histórico na própria consulta ao Supabase."""
+        if data_inicio:
+            consulta = consulta.gte("data", data_inicio.isoformat())
+        if data_fim:
+            consulta = consulta.lt("data", (data_fim + timedelta(days=1)).isoformat())
+        if tipo:
+            consulta = consulta.eq("tipo", tipo)
+        if item_id:
+            consulta = consulta.eq("id", item_id)
+        if usuario:
+            consulta = consulta.ilike("usuario", f"%{usuario}%")
+        return consulta
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=5)
+    def get_historico_pagina(_self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                             tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                             cursor: Optional[Tuple[str, str, int]] = None,
+                             tamanho_pagina: int = TAMANHO_PAGINA_HISTORICO) -> List[Dict[str, Any]]:
+        """Busca uma página do histórico (mais recentes primeiro) com paginação por chave.
+
+        `cursor` é o trio (data, id, seq) da última linha da página anterior; a próxima
+        página começa imediatamente depois dele na ordem (data desc, id desc, seq desc),
+        com custo constante independentemente de quantas páginas já foram percorridas.
+        """
+        def buscar(com_seq: bool) -> List[Dict[str, Any]]:
+            consulta = _self._filtrar_historico(
+                _self.supabase.table(_self.TABELA_HISTORICO).select("*"),
+                data_inicio, data_fim, tipo, item_id, usuario
+            )
+            if cursor:
+                data_cursor, id_cursor, seq_cursor = cursor
+                mesmo_item = f'data.eq."{data_cursor}",id.eq."{id_cursor}",seq.lt.{seq_cursor}'
+                consulta = consulta.or_(f'data.lt."{data_cursor}",and(data.eq."{data_cursor}",id.lt."{id_cursor}")'
+                                        + (f",and({mesmo_item})" if com_seq else ""))
+            consulta = consulta.order("data", desc=True).order("id", desc=True)
+            if com_seq:
+                consulta = consulta.order("seq", desc=True)
+            return consulta.limit(tamanho_pagina).execute().data
+
+        try:
+            try:
+                return buscar(com_seq=True)
+            except Exception as e:
+                if getattr(e, 'code', None) != '42703':
+                    raise
+                # Coluna `seq` ainda não criada (sql/historico_indices.sql): cursor (data, id)
+                return buscar(com_seq=False)
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico: {e}")
+            return []
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=60)
+    def contar_historico(_self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         tipo: Optional[str] = None, item_id: Optional[str] = None, usuario: Optional[str] = None,
+                         exato: bool = False) -> Optional[int]:
+        """Conta as movimentações que atendem aos filtros sem trazer as linhas.
+
+        Por padrão usa a contagem estimada do PostgreSQL (constante mesmo em tabelas
+        grandes); `exato=True` faz um COUNT(*) preciso.
+        """
+        try:
+            consulta = _self.supabase.table(_self.TABELA_HISTORICO).select(
+                "id", count="exact" if exato else "estimated", head=True
+            )
+            return _self._filtrar_historico(consulta, data_inicio, data_fim, tipo, item_id, usuario).execute().count
+        except Exception as e:
+            _self._erro(f"Erro ao contar histórico: {e}")
+            return None
+
+    def _iterar_catalogo(self, tamanho_pagina: int = TAMANHO_PAGINA) -> Iterator[pd.DataFrame]:
+        """Percorre `produtos` direto do banco, uma página por vez (keyset pelo código)."""
+        ultimo = None
+        while True:
+            consulta = self.supabase.table(self.TABELA_PRODUTOS).select("*").order("id").limit(tamanho_pagina)
+            if ultimo is not None:
+                consulta = consulta.gt("id", ultimo)
+            pagina = consulta.execute().data
+            if pagina:
+                yield pd.DataFrame(pagina)
+                ultimo = pagina[-1]["id"]
+            if len(pagina) < tamanho_pagina:
+                return
+
+    def _buscar_paginado(self, consulta: Callable[[], Any], tamanho_pagina: int = TAMANHO_PAGINA) -> List[Dict[str, Any]]:
+        """Executa uma consulta em páginas com `range` até esgotar o resultado."""
+        dados = []
+        inicio = 0
+        while True:
+            pagina = consulta().range(inicio, inicio + tamanho_pagina - 1).execute().data
+            dados.extend(pagina)
+            if len(pagina) < tamanho_pagina:
+                return dados
+            inicio += tamanho_pagina
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=600)
+    def get_historico_consumo(_self, desde: str) -> List[Dict[str, Any]]:
+        """Busca apenas as colunas necessárias à previsão, a partir de `desde` (data ou timestamp ISO)."""
+        def buscar(colunas: str) -> List[Dict[str, Any]]:
+            return _self._buscar_paginado(
+                lambda: _self.supabase.table(_self.TABELA_HISTORICO).select(colunas).gte("data", desde).order("data")
+            )
+        try:
+            try:
+                return buscar("id, tipo, quantidade, variacao, data")
+            except Exception as e:
+                if getattr(e, 'code', None) != '42703':
+                    raise
+                # Coluna `variacao` ainda não criada (sql/registrar_movimentacao.sql)
+                return buscar("id, tipo, quantidade, data")
+        except Exception as e:
+            _self._erro(f"Erro ao buscar histórico de consumo: {e}")
+            return []
+
+    @cache_dados.memorizar(tabelas=[TABELA_HISTORICO], ttl=600)
+    def obter_consumo_medio(_self, metodo: str = "media_movel", janela_dias: int = 30, alpha: float = 0.3) -> pd.Series:
+        """Consumo diário médio por item, recalculado apenas quando o histórico muda."""
+        # Um dia a mais para o saldo anterior das linhas gravadas sem `variacao`; a meia-noite
+        # local vai com fuso, senão o timestamptz a leria em UTC
+        inicio = datetime.combine(date.today() - timedelta(days=janela_dias + 1), datetime.min.time())
+        dados = _self.get_historico_consumo(inicio.astimezone().isoformat())
+        return consumo_diario(pd.DataFrame(dados), metodo, janela_dias, alpha)
+
+    def get_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Busca um item específico pelo ID (Não cacheado, usado para checagens em tempo real)."""
+        try:
+            response = self.supabase.table(self.TABELA_PRODUTOS).select("*").eq("id", item_id).limit(1).execute()
+            if response.data:
+                return response.data[0]
+            return None
+        except Exception:
+            return None
+
+    def buscar_itens(self, ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Busca vários itens pelo ID com filtros `in_` em blocos (Não cacheado; ver `obter_itens`)."""
+        ids = list(ids)
+        linhas = []
+        try:
+            for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+                bloco = ids[inicio:inicio + TAMANHO_LOTE_IN]
+                linhas.extend(self.supabase.table(self.TABELA_PRODUTOS).select("*").in_("id", bloco).execute().data)
+            return linhas
+        except Exception as e:
+            self._erro(f"Erro ao buscar itens: {e}")
+            return None
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def gerar_relatorio(_self) -> pd.DataFrame:
+        """Busca dados brutos, calcula o status e o valor total, e retorna um DataFrame numérico."""
+        df = _self.get_estoque_frame()
+        
+        if df.empty:
+            return pd.DataFrame()
+            
+        return montar_relatorio(df)
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_estatisticas(_self) -> Dict:
+        """Totais do catálogo somados no banco (visão `produtos_estatisticas`): uma linha por resposta."""
+        try:
+            linhas = _self.supabase.table(VISAO_ESTATISTICAS).select("*").execute().data
+        except Exception as e:
+            if getattr(e, 'code', None) in CODIGOS_VISAO_AUSENTE:
+                # Visão ainda não criada no banco: agrega o catálogo no processo
+                return RepositorioEstoque.agregar_estatisticas(_self)
+            _self._erro(f"Erro ao calcular estatísticas: {e}")
+            linhas = []
+        return estatisticas_totais(linhas[0] if linhas else {})
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_por_fornecedor(_self) -> pd.DataFrame:
+        """SKUs, quantidade e valor por fornecedor agrupados no banco (maior valor primeiro)."""
+        return _self._ler_agregado(VISAO_POR_FORNECEDOR, COLUNAS_POR_FORNECEDOR, "valor_total",
+                                   RepositorioEstoque.agregar_por_fornecedor)
+
+    @cache_dados.memorizar(tabelas=[TABELA_PRODUTOS], ttl=60)
+    def agregar_por_localizacao(_self) -> pd.DataFrame:
+        """SKUs e quantidade por localização agrupados no banco (maior quantidade primeiro)."""
+        return _self._ler_agregado(VISAO_POR_LOCALIZACAO, COLUNAS_POR_LOCALIZACAO, "qtd_total",
+                                   RepositorioEstoque.agregar_por_localizacao)
+
+    def _ler_agregado(self, visao: str, colunas: Dict[str, str], ordem: str,
+                      sem_visao: Callable[["SupabaseManager"], pd.DataFrame]) -> pd.DataFrame:
+        """Lê uma visão de agregados em páginas, ordenada por `ordem` e pelo grupo (paginação estável)."""
+        grupo = next(iter(colunas))
+        try:
+            linhas = self._buscar_paginado(
+                lambda: self.supabase.table(visao).select(", ".join(colunas)).order(ordem, desc=True).order(grupo)
+            )
+        except Exception as e:
+            if getattr(e, 'code', None) in CODIGOS_VISAO_AUSENTE:
+                return sem_visao(self)
+            self._erro(f"Erro ao consultar {visao}: {e}")
+            linhas = []
+        return resumo_agregado(linhas, colunas)
+
+    # MÉTODOS CRUD (CREATE, UPDATE, DELETE) 
+
+    def adicionar_item(self, item_id, nome, unidade, quantidade, minimo, maximo, localizacao, fornecedor, preco) -> bool:
+        """Adiciona um novo item ao Supabase."""
+        try:
+            novo_item = {
+                "id": item_id, 
+                "nome": nome, 
+                "unidade": unidade, 
+                "quantidade": int(quantidade), 
+                "minimo": int(minimo), 
+                "maximo": int(maximo), 
+                "localizacao": localizacao, 
+                "fornecedor": fornecedor, 
+                "preco": float(preco)
+            }
+            self.supabase.table(self.TABELA_PRODUTOS).insert(novo_item).execute()
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            self.indice_busca.atualizar(item_id, nome)
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao adicionar item: {e}")
+            return False
+
+    def ids_existentes(self, ids: List[str]) -> Optional[set]:
+        """Retorna quais dos códigos informados já existem, com uma única consulta `in_` (None em caso de erro)."""
+        if not ids:
+            return set()
+        try:
+            response = self.supabase.table(self.TABELA_PRODUTOS).select("id").in_("id", list(ids)).execute()
+            return {item["id"] for item in response.data}
+        except Exception as e:
+            self._erro(f"Erro ao consultar códigos existentes: {e}")
+            return None
+
+    def adicionar_itens_lote(self, itens: List[Dict[str, Any]], atualizar_existentes: bool = False) -> bool:
+        """Insere vários itens com um único upsert que ignora códigos já existentes.
+
+        Com `atualizar_existentes`, um segundo upsert sem a `quantidade` atualiza as demais
+        colunas informadas dos itens que já existiam (o saldo só muda por movimentação).
+        """
+        if not itens:
+            return True
+        try:
+            self.supabase.table(self.TABELA_PRODUTOS).upsert(itens, on_conflict="id", ignore_duplicates=True).execute()
+            alteracoes = [{c: v for c, v in item.items() if c != "quantidade"} for item in itens]
+            if atualizar_existentes and any(len(item) > 1 for item in alteracoes):
+                self.supabase.table(self.TABELA_PRODUTOS).upsert(alteracoes, on_conflict="id").execute()
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item["id"] for item in itens])
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao importar itens: {e}")
+            return False
+
+    def atualizar_item(self, item_id: str, campos: Dict[str, Any], versao: Optional[Any] = None) -> bool:
+        """Atualiza vários campos de um item com um único `update` (com checagem de versão opcional)."""
+        try:
+            campos = converter_campos(campos)
+            if not campos:
+                return True
+            consulta = self.supabase.table(self.TABELA_PRODUTOS).update(campos).eq("id", item_id)
+            if versao is not None:
+                consulta = consulta.eq(self.COLUNA_VERSAO, versao)
+            response = consulta.execute()
+        except Exception as e:
+            self._erro(f"Erro ao atualizar item: {e}")
+            return False
+
+        # Mesmo sem linha alterada (conflito), a cópia em cache do item está desatualizada
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+        if not response.data:
+            if versao is not None:
+                self._erro(f"Erro ao atualizar item: {MOTIVO_CONFLITO}.")
+            return False
+        if "nome" in campos:
+            self.indice_busca.atualizar(item_id, campos["nome"])
+        return True
+
+    def atualizar_em_massa(self, filtro: Dict[str, Any], ajuste: Dict[str, Any]) -> Optional[List[str]]:
+        """Reajuste em massa com um único UPDATE no servidor (função `atualizar_produtos_massa`)."""
+        try:
+            filtro, ajuste = atualizacao_massa.normalizar(filtro, ajuste)
+            response = self.supabase.rpc(FUNCAO_ATUALIZACAO_MASSA, {"p_filtro": filtro, "p_ajuste": ajuste}).execute()
+        except Exception as e:
+            if getattr(e, 'code', None) == 'PGRST202':
+                self._erro("Erro na atualização em massa: aplique sql/atualizar_produtos_massa.sql no banco.")
+            else:
+                self._erro(f"Erro na atualização em massa: {e}")
+            return None
+
+        # `returns setof text`: uma linha (ou um valor) por código alterado
+        ids = [linha if isinstance(linha, str) else next(iter(linha.values())) for linha in response.data or []]
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=ids)
+        return ids
+
+    def excluir_item(self, item_id: str) -> bool:
+        """Exclui um item do Supabase e seu histórico de movimentações."""
+        try:
+            self.supabase.table(self.TABELA_PRODUTOS).delete().eq("id", item_id).execute()
+            self.supabase.table(self.TABELA_HISTORICO).delete().eq("id", item_id).execute()
+            
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+            self.indice_busca.remover(item_id)
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao excluir item: {e}")
+            return False
+
+    # MÉTODOS DE MOVIMENTAÇÃO (UPDATE ESPECIALIZADO)
+
+    def _inserir_historico(self, mov: Dict[str, Any]):
+        """INSERT de uma linha do histórico; sem a coluna `variacao` no banco, grava as demais."""
+        try:
+            self.supabase.table(self.TABELA_HISTORICO).insert(mov).execute()
+        except Exception as e:
+            if getattr(e, 'code', None) != 'PGRST204':
+                raise
+            mov = {k: v for k, v in mov.items() if k != "variacao"}
+            self.supabase.table(self.TABELA_HISTORICO).insert(mov).execute()
+
+    def _registrar_historico(self, item_id: str, nome: str, tipo: str, quantidade_final: int, observacao: str,
+                             variacao: Optional[int] = None) -> bool:
+        """Registra a movimentação na tabela de histórico (Não cacheado)."""
+        try:
+            mov = {
+                "id": item_id, 
+                "nome": nome, 
+                "tipo": tipo, 
+                "quantidade": quantidade_final, 
+                "data": datetime.now().astimezone().isoformat(),
+                "usuario": self._usuario_atual(),
+                "observacao": observacao,
+                "variacao": variacao
+            }
+            self._inserir_historico(mov)
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+            return True
+        except Exception as e:
+            self._erro(f"Erro ao registrar histórico: {e}")
+            return False
+
+    def movimentar_estoque(self, item_id: str, tipo: str, quantidade: int, observacao: str = "") -> Optional[int]:
+        """Aplica uma Entrada/Saída e registra o histórico em uma única chamada atômica.
+
+        Usa a função `registrar_movimentacao` (sql/registrar_movimentacao.sql), que rejeita
+        no servidor uma Saída maior que o saldo. Retorna a nova quantidade ou None se a
+        movimentação foi rejeitada (item inexistente ou estoque insuficiente).
+        """
+        try:
+            response = self.supabase.rpc(FUNCAO_MOVIMENTACAO, {
+                "p_id": item_id,
+                "p_tipo": tipo,
+                "p_quantidade": int(quantidade),
+                "p_observacao": observacao,
+                "p_usuario": self._usuario_atual()
+            }).execute()
+            nova_quantidade = response.data
+        except Exception as e:
+            if getattr(e, 'code', None) == 'PGRST202':
+                # Função ainda não instalada no banco: mantém o fluxo antigo (não atômico)
+                return self._movimentar_sem_rpc(item_id, tipo, quantidade, observacao)
+            self._erro(f"Erro ao registrar movimentação: {e}")
+            return None
+
+        if nova_quantidade is None:
+            # Rejeição indica que o saldo em cache pode estar desatualizado
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+            return None
+
+        self.cache.invalidar(self.TABELA_PRODUTOS, chaves=[item_id])
+        self.cache.invalidar(self.TABELA_HISTORICO, chaves=[item_id])
+        return int(nova_quantidade)
+
+    def _movimentar_sem_rpc(self, item_id: str, tipo: str, quantidade: int, observacao: str) -> Optional[int]:
+        """Fluxo legado (leitura, atualização e histórico em três requisições)."""
+        item_atual = self.get_item_by_id(item_id)
+        if not item_atual or quantidade <= 0:
+            return None
+        if tipo == "Saída":
+            if item_atual['quantidade'] < quantidade:
+                return None
+            nova_quantidade = item_atual['quantidade'] - quantidade
+        else:
+            nova_quantidade = item_atual['quantidade'] + quantidade
+        # A versão lida impede sobrescrever uma movimentação concorrente
+        if self.atualizar_item(item_id, {'quantidade': nova_quantidade}, versao=item_atual.get(self.COLUNA_VERSAO)):
+            variacao = nova_quantidade - item_atual['quantidade']
+            if self._registrar_historico(item_id, item_atual['nome'], tipo, nova_quantidade, observacao, variacao):
+                return nova_quantidade
+        return None
+            
+    def movimentar_lote(self, movimentos: List[Dict[str, Any]], tamanho_lote: int = TAMANHO_LOTE_MOVIMENTACOES) -> List[Dict[str, Any]]:
+        """Aplica uma lista de movimentações {id, tipo, quantidade, observacao} em blocos.
+
+        Cada bloco é uma única chamada à função `registrar_movimentacoes_lote`
+        (sql/registrar_movimentacoes_lote.sql). Retorna um resultado por linha, na ordem
+        de entrada, com 'status' ("Aceito"/"Rejeitado"), 'nova_quantidade' e 'motivo'.
+        """
+        resultados = []
+        usuario = self._usuario_atual()
+
+        for inicio in range(0, len(movimentos), tamanho_lote):
+            bloco = [
+                {
+                    "id": str(mov["id"]),
+                    "tipo": mov["tipo"],
+                    "quantidade": int(mov["quantidade"]),
+                    "observacao": mov.get("observacao", "") or ""
+                }
+                for mov in movimentos[inicio:inicio + tamanho_lote]
+            ]
+            try:
+                response = self.supabase.rpc(FUNCAO_MOVIMENTACAO_LOTE, {
+                    "p_movimentos": bloco,
+                    "p_usuario": usuario
+                }).execute()
+                retorno = sorted(response.data or [], key=lambda r: r["linha"])
+            except Exception as e:
+                if getattr(e, 'code', None) == 'PGRST202':
+                    retorno = self._movimentar_lote_sem_rpc(bloco, usuario)
+                else:
+                    self._erro(f"Erro ao registrar movimentações em lote: {e}")
+                    retorno = [{"linha": i, "aceito": False, "nova_quantidade": None, "motivo": str(e)}
+                               for i in range(len(bloco))]
+
+            for mov, r in zip(bloco, retorno):
+                motivo = None if r["aceito"] else (r["motivo"] or MOTIVO_INVALIDA)
+                resultados.append(resultado_movimentacao(mov, r["nova_quantidade"], motivo))
+
+        ids_aceitos = {r["id"] for r in resultados if r["status"] == STATUS_ACEITO}
+        if ids_aceitos:
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=ids_aceitos)
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=ids_aceitos)
+        return resultados
+
+    def _movimentar_lote_sem_rpc(self, bloco: List[Dict[str, Any]], usuario: str) -> List[Dict[str, Any]]:
+        """Fluxo de lote sem a função no banco: um SELECT `in_` por bloco e, por movimentação, um update
+        com checagem de versão e o INSERT no histórico (não atômico). Um erro rejeita apenas a própria linha."""
+        try:
+            ids = list({mov["id"] for mov in bloco})
+            response = self.supabase.table(self.TABELA_PRODUTOS).select("*").in_("id", ids).execute()
+            itens = {item["id"]: item for item in response.data}
+        except Exception as e:
+            self._erro(f"Erro ao registrar movimentações em lote: {e}")
+            return [{"linha": i, "aceito": False, "nova_quantidade": None, "motivo": str(e)} for i in range(len(bloco))]
+
+        retorno, tocados = [], set()
+        for i, mov in enumerate(bloco):
+            try:
+                nova_quantidade, motivo = self._aplicar_movimento_sem_rpc(itens.get(mov["id"]), mov, usuario, tocados)
+            except Exception as e:
+                self._erro(f"Erro ao registrar movimentação de {mov['id']}: {e}")
+                nova_quantidade, motivo = None, str(e)
+            retorno.append({"linha": i, "aceito": motivo is None, "nova_quantidade": nova_quantidade, "motivo": motivo})
+
+        # Inclui os itens com saldo alterado mas sem histórico (rejeitados após o update)
+        if tocados:
+            self.cache.invalidar(self.TABELA_PRODUTOS, chaves=tocados)
+            self.cache.invalidar(self.TABELA_HISTORICO, chaves=tocados)
+        return retorno
+
+    def _aplicar_movimento_sem_rpc(self, item: Optional[Dict[str, Any]], mov: Dict[str, Any], usuario: str,
+                                   tocados: set) -> Tuple[Optional[int], Optional[str]]:
+        """Aplica uma movimentação do lote sobre a linha lida; retorna (nova quantidade, motivo da rejeição)."""
+        if item is None:
+            return None, MOTIVO_NAO_ENCONTRADO
+        if mov["quantidade"] <= 0 or mov["tipo"] not in TIPOS_MOVIMENTACAO:
+            return None, MOTIVO_INVALIDA
+        if mov["tipo"] == "Saída" and item["quantidade"] < mov["quantidade"]:
+            return None, MOTIVO_INSUFICIENTE
+
+        variacao = mov["quantidade"] if mov["tipo"] == "Entrada" else -mov["quantidade"]
+        nova_quantidade = item["quantidade"] + variacao
+        consulta = self.supabase.table(self.TABELA_PRODUTOS).update({"quantidade": nova_quantidade}).eq("id", item["id"])
+        if item.get(self.COLUNA_VERSAO) is not None:
+            # A versão lida impede sobrescrever uma movimentação concorrente
+            consulta = consulta.eq(self.COLUNA_VERSAO, item[self.COLUNA_VERSAO])
+        atualizadas = consulta.execute().data
+        if not atualizadas:
+            return None, MOTIVO_CONFLITO
+        # Saldo e versão novos valem para as próximas linhas do mesmo item
+        item.update(atualizadas[0])
+        tocados.add(item["id"])
+
+        try:
+            self._inserir_historico({
+                "id": item["id"], "nome": item["nome"], "tipo": mov["tipo"],
+                "quantidade": nova_quantidade, "data": datetime.now().astimezone().isoformat(),
+                "usuario": usuario, "observacao": mov["observacao"], "variacao": variacao
+            })
+        except Exception as e:
+            return nova_quantidade, f"saldo atualizado, mas o histórico não foi gravado: {e}"
+        return nova_quantidade, None
+
+    # MÉTODOS DE AUTENTICAÇÃO
+
+    @cache_dados.memorizar(tabelas=[TABELA_USUARIOS], ttl=3600, por_chave=True)
+    def buscar_usuario(_self, username: str) -> Optional[Dict[str, Any]]:
+        """Busca o usuário pelo nome de usuário no Supabase."""
+        try:
+            response = _self.supabase.table(_self.TABELA_USUARIOS).select("*").eq("username", username).limit(1).execute()
+            if response.data:
+                return response.data[0]
+            return None
+        except Exception:
+            return None
+
+    # MÉTRICAS
+
+    def obter_estado_sincronizacao(self) -> Dict[str, Any]:
+        """Retorna o modo e os contadores da sincronização incremental do catálogo."""
+        return self.sincronizador.estado()
+
+    def exportar_catalogo(self, formato: str = "CSV", tamanho_bloco: int = TAMANHO_PAGINA) -> Iterator[bytes]:
+        """Exporta o catálogo completo lendo o banco em páginas, sem montar o DataFrame da tela."""
+        return exportar_blocos((montar_relatorio(pagina) for pagina in self._iterar_catalogo(tamanho_bloco)), formato)
+
+    def obter_metricas_conexao(self) -> Dict[str, Any]:
+        """Retorna o tamanho e a utilização do pool de conexões HTTP compartilhado."""
+        return self.transporte.metricas() if self.transporte is not None else {}
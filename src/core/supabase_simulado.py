@@ -0,0 +1,551 @@
+"""Cliente Supabase em processo, para benchmarks e testes de carga sem rede nem credenciais.
+
+Implementa o subconjunto do construtor de consultas do supabase-py usado pelo
+projeto (table/select/eq/.../order/limit/range/insert/update/upsert/delete/execute
+e rpc) sobre tabelas em memória, com latência injetada por requisição e um limite de
+requisições simultâneas que imita o pool HTTP. Os triggers de
+sql/produtos_sincronizacao.sql, as funções de movimentação (sql/registrar_*.sql), a
+atualização em massa (sql/atualizar_produtos_massa.sql) e as visões de
+sql/agregados_produtos.sql são reproduzidos, então o `SupabaseManager` percorre os mesmos caminhos de produção.
+
+Uso:
+    cliente = ClienteSupabaseSimulado(latencia=0.02, variacao=0.01)
+    manager = SupabaseManager(cliente=cliente)
+"""
+import copy
+import random
+from decimal import ROUND_HALF_UP, Decimal
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from postgrest.exceptions import APIError
+from src.core.metricas import metricas
+
+# Chave primária de cada tabela (as demais aceitam linhas repetidas, como `historico`)
+CHAVES_PRIMARIAS = {"produtos": "id", "usuarios": "username"}
+# Triggers de sql/produtos_sincronizacao.sql: coluna de versão e tabela de tombstones
+COLUNAS_VERSAO = {"produtos": "updated_at"}
+# Colunas `generated always as identity` (sql/historico_indices.sql)
+COLUNAS_IDENTIDADE = {"historico": "seq"}
+TABELAS_EXCLUSAO = {"produtos": ("produtos_excluidos", "excluido_em")}
+
+Filtro = Callable[[Dict[str, Any]], bool]
+
+
+def _agora() -> str:
+    """Timestamp no formato devolvido pelo PostgREST para colunas timestamptz."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _comparavel(valor_linha: Any, valor: Any) -> Any:
+    """Converte o valor do filtro (texto na URL do PostgREST) para o tipo da coluna."""
+    if isinstance(valor_linha, bool) and isinstance(valor, str):
+        return valor.lower() == "true"
+    if isinstance(valor_linha, (int, float)) and isinstance(valor, str):
+        return float(valor)
+    return valor
+
+
+def _comparar(operador: str, coluna: str, valor: Any) -> Filtro:
+    def filtro(linha: Dict[str, Any]) -> bool:
+        atual = linha.get(coluna)
+        if operador == "is":
+            return atual is None if valor in (None, "null") else atual == valor
+        if atual is None:
+            return False
+        if operador == "in":
+            return atual in {_comparavel(atual, v) for v in valor}
+        if operador in ("like", "ilike"):
+            padrao = re.escape(str(valor)).replace("%", ".*").replace("_", ".")
+            return re.fullmatch(padrao, str(atual), re.IGNORECASE if operador == "ilike" else 0) is not None
+        alvo = _comparavel(atual, valor)
+        return {
+            "eq": atual == alvo, "neq": atual != alvo, "gt": atual > alvo,
+            "gte": atual >= alvo, "lt": atual < alvo, "lte": atual <= alvo,
+        }[operador]
+    return filtro
+
+
+def _separar(expressao: str) -> List[str]:
+    """Divide `a,b,and(c,d)` nas vírgulas de nível zero (fora de parênteses e aspas)."""
+    partes, nivel, aspas, atual = [], 0, False, ""
+    for caractere in expressao:
+        if caractere == '"':
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            nivel += 1
+        elif not aspas and caractere == ")":
+            nivel -= 1
+        elif not aspas and nivel == 0 and caractere == ",":
+            partes.append(atual)
+            atual = ""
+            continue
+        atual += caractere
+    return partes + [atual] if atual else partes
+
+
+def _filtro_logico(expressao: str) -> Filtro:
+    """Interpreta a sintaxe de `or_`/`and` do PostgREST: `col.op.valor` e `and(...)`/`or(...)` aninhados."""
+    expressao = expressao.strip()
+    for conector, combinar in (("and(", all), ("or(", any)):
+        if expressao.startswith(conector) and expressao.endswith(")"):
+            filtros = [_filtro_logico(p) for p in _separar(expressao[len(conector):-1])]
+            return lambda linha: combinar(f(linha) for f in filtros)
+    coluna, operador, valor = expressao.split(".", 2)
+    if len(valor) >= 2 and valor[0] == valor[-1] == '"':
+        valor = valor[1:-1]
+    if operador == "in":
+        valor = [v.strip('"') for v in _separar(valor.strip("()"))]
+    return _comparar(operador, coluna, valor)
+
+
+@dataclass
+class RespostaSimulada:
+    """Mesmos atributos lidos do `APIResponse` do postgrest."""
+    data: Any
+    count: Optional[int] = None
+
+
+class ConsultaSimulada:
+    """Construtor de consultas encadeável (o estado só é aplicado em `execute`)."""
+
+    def __init__(self, cliente: "ClienteSupabaseSimulado", tabela: str):
+        self._cliente = cliente
+        self._tabela = tabela
+        self._operacao = "select"
+        self._colunas: Optional[List[str]] = None
+        self._contagem = None
+        self._apenas_contagem = False
+        self._valores: Any = None
+        self._ignorar_duplicados = False
+        self._filtros: List[Filtro] = []
+        self._ordem: List[Tuple[str, bool]] = []
+        self._limite: Optional[int] = None
+        self._inicio = 0
+
+    # Operações
+
+    def select(self, colunas: str = "*", count: Optional[str] = None, head: bool = False) -> "ConsultaSimulada":
+        self._colunas = None if colunas.strip() == "*" else [c.strip() for c in colunas.split(",")]
+        self._contagem, self._apenas_contagem = count, head
+        return self
+
+    def insert(self, valores) -> "ConsultaSimulada":
+        self._operacao, self._valores = "insert", valores
+        return self
+
+    def upsert(self, valores, on_conflict: str = "", ignore_duplicates: bool = False, **_) -> "ConsultaSimulada":
+        self._operacao, self._valores, self._ignorar_duplicados = "upsert", valores, ignore_duplicates
+        return self
+
+    def update(self, valores: Dict[str, Any]) -> "ConsultaSimulada":
+        self._operacao, self._valores = "update", valores
+        return self
+
+    def delete(self) -> "ConsultaSimulada":
+        self._operacao = "delete"
+        return self
+
+    # Filtros
+
+    def _filtrar(self, operador: str, coluna: str, valor: Any) -> "ConsultaSimulada":
+        self._filtros.append(_comparar(operador, coluna, valor))
+        return self
+
+    def eq(self, coluna, valor):
+        return self._filtrar("eq", coluna, valor)
+
+    def neq(self, coluna, valor):
+        return self._filtrar("neq", coluna, valor)
+
+    def gt(self, coluna, valor):
+        return self._filtrar("gt", coluna, valor)
+
+    def gte(self, coluna, valor):
+        return self._filtrar("gte", coluna, valor)
+
+    def lt(self, coluna, valor):
+        return self._filtrar("lt", coluna, valor)
+
+    def lte(self, coluna, valor):
+        return self._filtrar("lte", coluna, valor)
+
+    def like(self, coluna, padrao):
+        return self._filtrar("like", coluna, padrao)
+
+    def ilike(self, coluna, padrao):
+        return self._filtrar("ilike", coluna, padrao)
+
+    def in_(self, coluna, valores):
+        return self._filtrar("in", coluna, list(valores))
+
+    def is_(self, coluna, valor):
+        return self._filtrar("is", coluna, valor)
+
+    def or_(self, expressao: str) -> "ConsultaSimulada":
+        self._filtros.append(_filtro_logico(f"or({expressao})"))
+        return self
+
+    # Modificadores
+
+    def order(self, coluna: str, desc: bool = False, **_) -> "ConsultaSimulada":
+        self._ordem.append((coluna, desc))
+        return self
+
+    def limit(self, quantidade: int) -> "ConsultaSimulada":
+        self._limite = quantidade
+        return self
+
+    def range(self, inicio: int, fim: int) -> "ConsultaSimulada":
+        self._inicio, self._limite = inicio, fim - inicio + 1
+        return self
+
+    def execute(self) -> RespostaSimulada:
+        return self._cliente._executar(lambda: self._aplicar())
+
+    # Execução (sob o lock do "banco")
+
+    def _selecionadas(self, linhas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [linha for linha in linhas if all(f(linha) for f in self._filtros)]
+
+    def _aplicar(self) -> RespostaSimulada:
+        dados = self._cliente._relacao(self._tabela)
+        if self._operacao == "select":
+            linhas = self._selecionadas(dados)
+            total = len(linhas) if self._contagem else None
+            for coluna, desc in reversed(self._ordem):
+                # Nulos por último na ordem crescente e primeiro na decrescente, como no PostgreSQL
+                linhas = sorted(linhas, key=lambda l: (1,) if l.get(coluna) is None else (0, l[coluna]), reverse=desc)
+            fim = None if self._limite is None else self._inicio + self._limite
+            linhas = linhas[self._inicio:fim]
+            if self._apenas_contagem:
+                return RespostaSimulada([], total)
+            if self._colunas is not None:
+                linhas = [{c: linha.get(c) for c in self._colunas} for linha in linhas]
+            return RespostaSimulada(copy.deepcopy(linhas), total)
+        if self._operacao in ("insert", "upsert"):
+            valores = self._valores if isinstance(self._valores, list) else [self._valores]
+            return RespostaSimulada(self._cliente._gravar(self._tabela, valores, self._operacao == "upsert",
+                                                         self._ignorar_duplicados))
+        if self._operacao == "update":
+            alteradas = self._selecionadas(dados)
+            versao = COLUNAS_VERSAO.get(self._tabela)
+            for linha in alteradas:
+                linha.update(copy.deepcopy(self._valores))
+                if versao:
+                    linha[versao] = _agora()
+            return RespostaSimulada(copy.deepcopy(alteradas))
+        # delete
+        removidas = self._selecionadas(dados)
+        if removidas:
+            ids_removidos = {id(linha) for linha in removidas}
+            dados[:] = [linha for linha in dados if id(linha) not in ids_removidos]
+            self._cliente._registrar_exclusoes(self._tabela, removidas)
+        return RespostaSimulada(copy.deepcopy(removidas))
+
+
+class RpcSimulada:
+    def __init__(self, cliente: "ClienteSupabaseSimulado", funcao: str, parametros: Dict[str, Any]):
+        self._cliente, self._funcao, self._parametros = cliente, funcao, parametros
+
+    def execute(self) -> RespostaSimulada:
+        funcao = self._cliente.funcoes.get(self._funcao)
+        if funcao is None:
+            def funcao(_cliente, **_):
+                raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{self._funcao}"})
+        return self._cliente._executar(lambda: RespostaSimulada(funcao(self._cliente, **self._parametros)))
+
+
+def _registrar_movimentacao(cliente: "ClienteSupabaseSimulado", p_id: str, p_tipo: str, p_quantidade: int,
+                            p_observacao: str = "", p_usuario: str = "Sistema") -> Optional[int]:
+    """Mesma regra de sql/registrar_movimentacao.sql."""
+    if p_quantidade is None or p_quantidade <= 0:
+        return None
+    if p_tipo not in ("Entrada", "Saída"):
+        raise APIError({"code": "P0001", "message": f"Tipo de movimentação inválido: {p_tipo}"})
+    resultado = _aplicar_movimento(cliente, p_id, p_tipo, p_quantidade)
+    if isinstance(resultado, str):
+        return None
+    item = resultado
+    cliente._gravar("historico", [{
+        "id": p_id, "nome": item["nome"], "tipo": p_tipo, "quantidade": item["quantidade"],
+        "data": _agora(), "usuario": p_usuario, "observacao": p_observacao,
+        "variacao": p_quantidade if p_tipo == "Entrada" else -p_quantidade
+    }])
+    return item["quantidade"]
+
+
+def _registrar_movimentacoes_lote(cliente: "ClienteSupabaseSimulado", p_movimentos: List[Dict[str, Any]],
+                                  p_usuario: str = "Sistema") -> List[Dict[str, Any]]:
+    """Mesma regra de sql/registrar_movimentacoes_lote.sql (um INSERT no histórico ao final)."""
+    retorno, historico = [], []
+    for linha, mov in enumerate(p_movimentos):
+        quantidade = mov.get("quantidade")
+        if quantidade is None or int(quantidade) <= 0:
+            motivo = "Quantidade inválida"
+        elif mov.get("tipo") not in ("Entrada", "Saída"):
+            motivo = "Tipo inválido"
+        else:
+            resultado = _aplicar_movimento(cliente, mov["id"], mov["tipo"], int(quantidade))
+            motivo = resultado if isinstance(resultado, str) else None
+        if motivo is not None:
+            retorno.append({"linha": linha, "id": mov.get("id"), "aceito": False, "nova_quantidade": None, "motivo": motivo})
+            continue
+        historico.append({
+            "id": mov["id"], "nome": resultado["nome"], "tipo": mov["tipo"], "quantidade": resultado["quantidade"],
+            "usuario": p_usuario, "observacao": mov.get("observacao") or "",
+            "variacao": int(quantidade) if mov["tipo"] == "Entrada" else -int(quantidade)
+        })
+        retorno.append({"linha": linha, "id": mov["id"], "aceito": True,
+                        "nova_quantidade": resultado["quantidade"], "motivo": None})
+    agora = _agora()
+    cliente._gravar("historico", [{**h, "data": agora} for h in historico])
+    return retorno
+
+
+def _aplicar_movimento(cliente: "ClienteSupabaseSimulado", item_id: str, tipo: str, quantidade: int):
+    """UPDATE condicional do saldo; retorna a linha atualizada ou o motivo da rejeição."""
+    item = cliente._linha("produtos", item_id)
+    if item is None:
+        return "Item não encontrado"
+    if tipo == "Saída" and item["quantidade"] < quantidade:
+        return "Estoque insuficiente"
+    item["quantidade"] += quantidade if tipo == "Entrada" else -quantidade
+    item[COLUNAS_VERSAO["produtos"]] = _agora()
+    return item
+
+
+def _status_produto(linha: Dict[str, Any]) -> int:
+    """Mesma regra de `produtos_status` (sql/atualizar_produtos_massa.sql)."""
+    if linha["quantidade"] == 0:
+        return 0
+    if linha["quantidade"] < linha["minimo"]:
+        return 1
+    return 3 if linha["quantidade"] > linha["maximo"] else 4
+
+
+def _produto_no_filtro(linha: Dict[str, Any], filtro: Dict[str, Any]) -> bool:
+    """Mesma regra de `produto_no_filtro` (sql/atualizar_produtos_massa.sql)."""
+    return ((filtro.get("fornecedor") is None or linha.get("fornecedor") == filtro["fornecedor"])
+            and (filtro.get("localizacao") is None or linha.get("localizacao") == filtro["localizacao"])
+            and ("ids" not in filtro or linha["id"] in filtro["ids"])
+            and (filtro.get("status") is None or _status_produto(linha) == int(filtro["status"])))
+
+
+def _atualizar_produtos_massa(cliente: "ClienteSupabaseSimulado", p_filtro: Dict[str, Any],
+                              p_ajuste: Dict[str, Any]) -> List[str]:
+    """Mesma regra de sql/atualizar_produtos_massa.sql (um UPDATE sobre as linhas do filtro)."""
+    if not any(campo in p_filtro for campo in ("fornecedor", "localizacao", "status", "ids")):
+        raise APIError({"code": "P0001", "message": "Informe ao menos um filtro"})
+    percentual, valor = p_ajuste.get("preco_percentual"), p_ajuste.get("preco_valor")
+    if percentual is not None and valor is not None:
+        raise APIError({"code": "P0001", "message": "Use o ajuste de preço em % ou em R$, não os dois"})
+    minimo, maximo = p_ajuste.get("minimo"), p_ajuste.get("maximo")
+
+    afetadas = [linha for linha in cliente.tabelas.get("produtos", []) if _produto_no_filtro(linha, p_filtro)]
+    if (minimo is not None or maximo is not None) and any(
+            (linha["minimo"] if minimo is None else minimo) >= (linha["maximo"] if maximo is None else maximo)
+            for linha in afetadas):
+        raise APIError({"code": "P0001", "message": "O mínimo deve ser menor que o máximo em todos os itens afetados"})
+
+    def arredondar(preco: float) -> float:  # float8 -> numeric (15 dígitos) e round(numeric, 2): meio para cima
+        return max(float(Decimal(f"{preco:.15g}").quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)), 0.01)
+
+    agora = _agora()
+    for linha in afetadas:
+        if percentual is not None:
+            linha["preco"] = arredondar(linha["preco"] * (1 + percentual / 100))
+        elif valor is not None:
+            linha["preco"] = arredondar(linha["preco"] + valor)
+        for campo in ("minimo", "maximo", "localizacao"):
+            if p_ajuste.get(campo) is not None:
+                linha[campo] = p_ajuste[campo]
+        linha[COLUNAS_VERSAO["produtos"]] = agora
+    return [linha["id"] for linha in afetadas]
+
+
+def _agrupar(linhas: List[Dict[str, Any]], coluna: str) -> Dict[Any, List[Dict[str, Any]]]:
+    grupos: Dict[Any, List[Dict[str, Any]]] = {}
+    for linha in linhas:
+        if linha.get(coluna) is not None:
+            grupos.setdefault(linha[coluna], []).append(linha)
+    return grupos
+
+
+def _produtos_estatisticas(cliente: "ClienteSupabaseSimulado") -> List[Dict[str, Any]]:
+    """Mesma linha da visão `produtos_estatisticas` (sql/agregados_produtos.sql)."""
+    produtos = cliente.tabelas.get("produtos", [])
+    return [{
+        "total_itens": len(produtos),
+        "quantidade_total": sum(p["quantidade"] for p in produtos),
+        "valor_total": float(sum(p["quantidade"] * p["preco"] for p in produtos)),
+        "itens_criticos": sum(p["quantidade"] < p["minimo"] for p in produtos),
+        "itens_excesso": sum(p["quantidade"] > p["maximo"] for p in produtos),
+        "maximo_total": sum(p["maximo"] for p in produtos),
+    }]
+
+
+def _produtos_por_fornecedor(cliente: "ClienteSupabaseSimulado") -> List[Dict[str, Any]]:
+    """Mesmas linhas da visão `produtos_por_fornecedor` (sql/agregados_produtos.sql)."""
+    return [{"fornecedor": fornecedor, "total_skus": len(grupo), "qtd_total": sum(p["quantidade"] for p in grupo),
+             "valor_total": float(sum(p["quantidade"] * p["preco"] for p in grupo))}
+            for fornecedor, grupo in _agrupar(cliente.tabelas.get("produtos", []), "fornecedor").items()]
+
+
+def _produtos_por_localizacao(cliente: "ClienteSupabaseSimulado") -> List[Dict[str, Any]]:
+    """Mesmas linhas da visão `produtos_por_localizacao` (sql/agregados_produtos.sql)."""
+    return [{"localizacao": localizacao, "total_skus": len(grupo), "qtd_total": sum(p["quantidade"] for p in grupo)}
+            for localizacao, grupo in _agrupar(cliente.tabelas.get("produtos", []), "localizacao").items()]
+
+
+# Visões somente leitura, recalculadas a cada consulta como no PostgreSQL
+VISOES = {
+    "produtos_estatisticas": _produtos_estatisticas,
+    "produtos_por_fornecedor": _produtos_por_fornecedor,
+    "produtos_por_localizacao": _produtos_por_localizacao,
+}
+
+
+class ClienteSupabaseSimulado:
+    """Substituto do `supabase.Client` com dados em memória e latência configurável.
+
+    `latencia` (s) é somada a cada `execute`, com `variacao` uniforme reproduzível por
+    `semente`; `max_conexoes` limita as requisições simultâneas como o pool HTTP real.
+    A espera acontece fora do lock dos dados, então sessões concorrentes se sobrepõem.
+    """
+
+    def __init__(self, latencia: float = 0.0, variacao: float = 0.0, semente: int = 0,
+                 max_conexoes: int = 20, tabelas: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 funcoes: Optional[Dict[str, Callable]] = None,
+                 visoes: Optional[Dict[str, Callable]] = None):
+        self.latencia = latencia
+        self.variacao = variacao
+        self.max_conexoes = max_conexoes
+        self.tabelas: Dict[str, List[Dict[str, Any]]] = copy.deepcopy(tabelas) if tabelas else {}
+        # Funções RPC disponíveis (remova uma para exercitar o fluxo sem a função no banco)
+        self.funcoes: Dict[str, Callable] = dict(funcoes) if funcoes is not None else {
+            "registrar_movimentacao": _registrar_movimentacao,
+            "registrar_movimentacoes_lote": _registrar_movimentacoes_lote,
+            "atualizar_produtos_massa": _atualizar_produtos_massa,
+        }
+        # Visões disponíveis (remova uma para exercitar o fluxo sem a visão no banco)
+        self.visoes: Dict[str, Callable] = dict(visoes) if visoes is not None else dict(VISOES)
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.RLock()
+        self._vagas = threading.BoundedSemaphore(max_conexoes)
+        self._indices: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self._identidades: Dict[str, int] = {}
+        self._em_andamento = 0
+        self._pico = 0
+        self._total = 0
+        self.tempo_espera = 0.0
+
+    def table(self, tabela: str) -> ConsultaSimulada:
+        return ConsultaSimulada(self, tabela)
+
+    from_ = table
+
+    def rpc(self, funcao: str, parametros: Optional[Dict[str, Any]] = None) -> RpcSimulada:
+        return RpcSimulada(self, funcao, parametros or {})
+
+    def carregar(self, tabela: str, linhas: List[Dict[str, Any]]):
+        """Substitui o conteúdo de uma tabela sem passar pela latência (carga inicial)."""
+        with self._lock:
+            self.tabelas[tabela] = copy.deepcopy(list(linhas))
+            self._indices.pop(tabela, None)
+
+    # Internos
+
+    def _executar(self, operacao: Callable[[], RespostaSimulada]) -> RespostaSimulada:
+        with self._vagas:
+            with self._lock:
+                self._em_andamento += 1
+                self._total += 1
+                self._pico = max(self._pico, self._em_andamento)
+                espera = max(0.0, self.latencia + self._aleatorio.uniform(-self.variacao, self.variacao))
+                self.tempo_espera += espera
+            inicio = time.perf_counter()
+            try:
+                if espera:
+                    time.sleep(espera)
+                with self._lock:
+                    return operacao()
+            finally:
+                with self._lock:
+                    self._em_andamento -= 1
+                metricas.registrar_requisicao("simulado", time.perf_counter() - inicio)
+
+    def _relacao(self, tabela: str) -> List[Dict[str, Any]]:
+        """Linhas de uma tabela ou de uma visão (recalculada); visão removida responde como no PostgREST."""
+        if tabela in self.visoes:
+            return self.visoes[tabela](self)
+        if tabela in VISOES:
+            raise APIError({"code": "PGRST205", "message": f"Could not find the table 'public.{tabela}' in the schema cache"})
+        return self.tabelas.setdefault(tabela, [])
+
+    def _indice(self, tabela: str) -> Dict[Any, Dict[str, Any]]:
+        """Linhas por chave primária (reconstruído quando a tabela muda de tamanho)."""
+        chave = CHAVES_PRIMARIAS[tabela]
+        linhas = self.tabelas.setdefault(tabela, [])
+        indice = self._indices.get(tabela)
+        if indice is None or len(indice) != len(linhas):
+            indice = self._indices[tabela] = {linha[chave]: linha for linha in linhas}
+        return indice
+
+    def _linha(self, tabela: str, valor_chave: Any) -> Optional[Dict[str, Any]]:
+        return self._indice(tabela).get(valor_chave)
+
+    def _gravar(self, tabela: str, valores: List[Dict[str, Any]], upsert: bool = False,
+                ignorar_duplicados: bool = False) -> List[Dict[str, Any]]:
+        linhas = self.tabelas.setdefault(tabela, [])
+        chave = CHAVES_PRIMARIAS.get(tabela)
+        versao = COLUNAS_VERSAO.get(tabela)
+        identidade = COLUNAS_IDENTIDADE.get(tabela)
+        indice = self._indice(tabela) if chave else {}
+        if chave and not upsert:
+            repetidos = [v[chave] for v in valores if v[chave] in indice]
+            if repetidos or len({v[chave] for v in valores}) < len(valores):
+                raise APIError({"code": "23505", "message": f'duplicate key value violates unique constraint "{tabela}_pkey"',
+                                "details": f"Key ({chave})=({(repetidos or [None])[0]}) already exists."})
+        gravadas = []
+        for valor in copy.deepcopy(valores):
+            if versao:
+                valor[versao] = _agora()
+            if identidade:
+                self._identidades[tabela] = valor[identidade] = self._identidades.get(tabela, 0) + 1
+            existente = indice.get(valor[chave]) if chave else None
+            if existente is not None:
+                if ignorar_duplicados:
+                    continue
+                existente.update(valor)
+                gravadas.append(existente)
+            else:
+                linhas.append(valor)
+                if chave:
+                    indice[valor[chave]] = valor
+                gravadas.append(valor)
+        return copy.deepcopy(gravadas)
+
+    def _registrar_exclusoes(self, tabela: str, removidas: List[Dict[str, Any]]):
+        self._indices.pop(tabela, None)
+        if tabela in TABELAS_EXCLUSAO:
+            tabela_exclusao, coluna = TABELAS_EXCLUSAO[tabela]
+            agora = _agora()
+            self.tabelas.setdefault(tabela_exclusao, []).extend({"id": l["id"], coluna: agora} for l in removidas)
+
+    def metricas(self) -> Dict[str, Any]:
+        """Mesmas chaves de `TransporteMedido.metricas` (pool simulado) e o tempo total de espera injetada."""
+        with self._lock:
+            return {
+                "max_conexoes": self.max_conexoes,
+                "conexoes_abertas": self._em_andamento,
+                "conexoes_ociosas": self.max_conexoes - self._em_andamento,
+                "requisicoes_em_andamento": self._em_andamento,
+                "pico_em_andamento": self._pico,
+                "requisicoes_total": self._total,
+                "utilizacao": self._em_andamento / self.max_conexoes if self.max_conexoes else 0.0,
+                "tempo_espera": self.tempo_espera,
+            }
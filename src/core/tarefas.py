@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+from operator import methodcaller
+from typing import Any, Dict, Optional
+from src.core.analise import calcular_curva_abc, itens_criticos, itens_para_reposicao
+from src.core.configuracao import criar_manager
+from src.core.importacao import TAMANHO_BLOCO_IMPORTACAO, importar_catalogo
+
+# Relatórios tabulares disponíveis em lote, gerados a partir do gerenciador (o catálogo
+# completo é exportado em streaming; os resumos por fornecedor/localização são agregados no banco)
+RELATORIOS = {
+    "abc": lambda manager: calcular_curva_abc(manager.gerar_relatorio()),
+    "fornecedor": methodcaller("obter_resumo_fornecedores"),
+    "localizacao": methodcaller("obter_resumo_localizacoes"),
+    "criticos": lambda manager: itens_criticos(manager.gerar_relatorio()),
+}
+
+# Tarefas de lote: funções de módulo que recebem apenas valores simples e criam o
+# próprio gerenciador, para que possam ser enviadas a um ProcessPoolExecutor.
+
+
+def gerar_relatorio(tipo: str, backend: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Gera um dos RELATORIOS sobre o catálogo atual."""
+    return RELATORIOS[tipo](criar_manager(backend, config))
+
+
+def obter_estatisticas(backend: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Estatísticas gerais do estoque (as mesmas do Dashboard)."""
+    return criar_manager(backend, config).obter_estatisticas()
+
+
+def calcular_reposicao(metodo: str = "media_movel", janela_dias: int = 30, alpha: float = 0.3,
+                       prazo_entrega_dias: int = 7, horizonte_dias: float = 100,
+                       backend: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Itens que atingem o mínimo dentro do horizonte, com a quantidade sugerida para compra."""
+    manager = criar_manager(backend, config)
+    consumo = manager.obter_consumo_medio(metodo, janela_dias, alpha)
+    return itens_para_reposicao(manager.gerar_relatorio(), consumo, prazo_entrega_dias, horizonte_dias)
+
+
+def importar_arquivo(caminho: str, atualizar_existentes: bool = False,
+                     tamanho_bloco: int = TAMANHO_BLOCO_IMPORTACAO, salvar_rejeitadas: bool = False,
+                     backend: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Importa um arquivo de catálogo e retorna o resumo (linhas, importadas, rejeitadas, vazão).
+
+    Com `salvar_rejeitadas`, as linhas recusadas vão para `<arquivo>_rejeitadas.csv`.
+    """
+    manager = criar_manager(backend, config)
+    evento, rejeitadas = None, []
+    with open(caminho, "rb") as arquivo:
+        for evento in importar_catalogo(arquivo, manager, tamanho_bloco, atualizar_existentes):
+            if salvar_rejeitadas and not evento["rejeitadas_bloco"].empty:
+                rejeitadas.append(evento["rejeitadas_bloco"])
+
+    if rejeitadas:
+        destino = os.path.splitext(caminho)[0] + "_rejeitadas.csv"
+        pd.concat(rejeitadas).to_csv(destino, index=False, sep=";", encoding="utf-8-sig")
+
+    resumo = {"arquivo": caminho, "linhas": 0, "importadas": 0, "rejeitadas": 0, "linhas_por_segundo": 0.0}
+    if evento is not None:
+        resumo.update({chave: evento[chave] for chave in ("linhas", "importadas", "rejeitadas", "linhas_por_segundo")})
+    return resumo
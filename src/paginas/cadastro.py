@@ -1,44 +1,98 @@
 import streamlit as st
+import pandas as pd
 from typing import Dict
+from src.core.importacao import UNIDADES, TAMANHO_BLOCO_IMPORTACAO, importar_catalogo
 
-def renderizar_cadastro(estoque_manager, tipo_usuario: str):
-    """Renderiza a tab de Cadastro de Itens (CRUD - Create)."""
-    st.subheader("➕ Cadastro de Novo Item")
+
+@st.fragment
+def renderizar_importacao_catalogo(estoque_manager):
+    """Importação em massa de um catálogo CSV/XLSX, em blocos, com progresso."""
+    st.markdown("### Importação de Catálogo (CSV/XLSX)")
+    st.caption("Colunas: **id**, **nome**, **preco** (obrigatórias) e unidade, quantidade, minimo, maximo, "
+               "localizacao, fornecedor. Os cabeçalhos da exportação da aba Estoque também são aceitos.")
     
-    if tipo_usuario != "Administrador":
-        st.error("Acesso negado. Apenas Administradores podem cadastrar novos itens.")
+    arquivo = st.file_uploader("Arquivo do Catálogo", type=["csv", "xlsx"], key="upload_catalogo")
+    col_bloco, col_atualizar = st.columns(2)
+    tamanho_bloco = col_bloco.number_input("Itens por bloco", min_value=50, max_value=5000, 
+                                           value=TAMANHO_BLOCO_IMPORTACAO, step=50)
+    atualizar_existentes = col_atualizar.checkbox(
+        "Atualizar itens com código já existente", value=False,
+        help="Grava apenas as colunas presentes no arquivo. A quantidade de itens existentes não é alterada: "
+             "use Movimentações para ajustar o saldo."
+    )
+    
+    if not st.button("📥 Importar Catálogo", use_container_width=True, disabled=arquivo is None):
         return
+    
+    barra = st.progress(0.0, text="Iniciando importação...")
+    col_lidas, col_importadas, col_rejeitadas, col_vazao = st.columns(4)
+    painel = [col.empty() for col in (col_lidas, col_importadas, col_rejeitadas, col_vazao)]
+    rejeitadas = []
+    evento = None
+    
+    try:
+        for evento in importar_catalogo(arquivo, estoque_manager, int(tamanho_bloco), atualizar_existentes):
+            if evento["progresso"] is not None:
+                barra.progress(evento["progresso"], text=f"{evento['linhas']} linhas processadas")
+            painel[0].metric("Linhas lidas", evento["linhas"])
+            painel[1].metric("Importadas", evento["importadas"])
+            painel[2].metric("Rejeitadas", evento["rejeitadas"])
+            painel[3].metric("Linhas/s", f"{evento['linhas_por_segundo']:,.0f}")
+            if not evento["rejeitadas_bloco"].empty:
+                rejeitadas.append(evento["rejeitadas_bloco"])
+    except Exception as e:
+        st.error(f"Importação interrompida: {e}")
+    
+    barra.progress(1.0, text="Importação concluída.")
+    if evento is not None:
+        st.success(f"{evento['importadas']} itens importados de {evento['linhas']} linhas.")
+    
+    if rejeitadas:
+        df_rejeitadas = pd.concat(rejeitadas)
+        st.warning(f"{len(df_rejeitadas)} linhas rejeitadas:")
+        st.dataframe(df_rejeitadas, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="⬇️ Baixar Linhas Rejeitadas (.csv)",
+            data=df_rejeitadas.to_csv(index=False, sep=';').encode('utf-8-sig'),
+            file_name="catalogo_rejeitados.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
 
+
+@st.fragment
+def renderizar_formulario_cadastro(estoque_manager):
+    """Formulário de cadastro como fragmento: o envio reexecuta apenas o formulário."""
     with st.form("cadastro_form"):
         st.markdown("### Dados do Produto")
-        
+    
         col_id, col_nome = st.columns(2)
         item_id = col_id.text_input("Código do Item (ID)", max_chars=10).upper()
         nome = col_nome.text_input("Nome do Item", max_chars=100)
-        
+    
         unidade = st.selectbox("Unidade de Medida", 
-                               ["PÇ", "M", "KG", "UN", "CX"], index=0)
-        
+                               UNIDADES, index=0)
+    
         col_qtd, col_min, col_max = st.columns(3)
         quantidade = col_qtd.number_input("Quantidade Inicial", min_value=0, step=1)
         minimo = col_min.number_input("Estoque Mínimo", min_value=0, step=1)
         maximo = col_max.number_input("Estoque Máximo", min_value=1, step=1, value=100)
-        
+    
         col_loc, col_forn, col_preco = st.columns(3)
         localizacao = col_loc.text_input("Localização (Ex: A-01)", max_chars=20)
         fornecedor = col_forn.text_input("Fornecedor Principal", max_chars=50)
         preco = col_preco.number_input("Preço Unitário (R$)", min_value=0.01, step=0.01)
-        
+    
         st.markdown("---")
-        
+    
         submitted = st.form_submit_button("✅ Cadastrar Item", use_container_width=True)
-        
+    
         if submitted:
             # 1. Validação de campos
             if not item_id or not nome:
                 st.error("O Código do Item e o Nome são obrigatórios.")
                 return
-                
+            
             if estoque_manager.get_item_by_id(item_id) is not None:
                 st.error(f"O Código '{item_id}' já existe no estoque.")
                 return
@@ -47,12 +101,27 @@ def renderizar_cadastro(estoque_manager, tipo_usuario: str):
             if minimo >= maximo:
                 st.error("Estoque Mínimo deve ser menor que o Estoque Máximo.")
                 return
-            
+        
             # 4. Tentativa de Cadastro
             if estoque_manager.adicionar_item(item_id, nome, unidade, quantidade, 
                                             minimo, maximo, localizacao, 
                                             fornecedor, preco):
                 st.success(f"Item '{nome}' cadastrado com sucesso!")
                 st.balloons()
-                
-   
\ No newline at end of file
+
+
+def renderizar_cadastro(estoque_manager, tipo_usuario: str):
+    """Renderiza a tab de Cadastro de Itens (CRUD - Create)."""
+    st.subheader("➕ Cadastro de Novo Item")
+    
+    if tipo_usuario != "Administrador":
+        st.error("Acesso negado. Apenas Administradores podem cadastrar novos itens.")
+        return
+
+    tab_individual, tab_importacao = st.tabs(["Cadastro Individual", "📥 Importação em Massa"])
+    
+    with tab_importacao:
+        renderizar_importacao_catalogo(estoque_manager)
+
+    with tab_individual:
+        renderizar_formulario_cadastro(estoque_manager)
@@ -1,5 +1,7 @@
 import streamlit as st
 import json
+import pandas as pd
+import plotly.express as px
 from datetime import datetime
 import time
 
@@ -15,19 +17,81 @@ def renderizar_configuracoes(estoque_manager, tipo_usuario: str):
     
     # Obter dados para exibir contagem (usando os novos métodos)
     estoque_data = estoque_manager.get_estoque_data()
-    historico_data = estoque_manager.get_historico_data()
-
+    
+    # Contagem estimada no servidor: não traz as linhas do histórico
     total_registros = len(estoque_data) if estoque_data else 0
-    total_movimentacoes = len(historico_data) if historico_data else 0
+    total_movimentacoes = estoque_manager.contar_historico() or 0
 
     with st.container():
         st.info(f"""
-        **Conexão:** ✅ Ativa (Supabase)
+        **Conexão:** ✅ Ativa ({estoque_manager.NOME_BACKEND})
         **Tabela Produtos (Estoque):** **{total_registros}** registros
-        **Tabela Histórico:** **{total_movimentacoes}** movimentações
+        **Tabela Histórico:** **~{total_movimentacoes}** movimentações
         """)
         
         
+    st.markdown("---")
+
+    # Sincronização incremental do catálogo (apenas backends remotos)
+    estado_sync = estoque_manager.obter_estado_sincronizacao()
+    if estado_sync:
+        st.markdown("### 🔁 Sincronização do Catálogo")
+        st.info(f"""
+        **Modo:** {estado_sync['modo']}  
+        **Itens na cópia local:** {estado_sync['itens']}  
+        **Marca d'água:** {estado_sync['marca_dagua'] or '-'}  
+        **Sincronizações:** {estado_sync['completas']} completas / {estado_sync['incrementais']} incrementais  
+        **Linhas recebidas:** {estado_sync['linhas_recebidas']} · **Exclusões recebidas:** {estado_sync['exclusoes_recebidas']}
+        """)
+
+    # Pool de conexões compartilhado pelo processo (HTTP no Supabase, arquivo no SQLite)
+    conexoes = estoque_manager.obter_metricas_conexao()
+    if conexoes:
+        st.markdown("### 🔌 Conexões com o Banco")
+        col_abertas, col_ociosas, col_uso, col_total = st.columns(4)
+        col_abertas.metric("Conexões Abertas", f"{conexoes['conexoes_abertas']} / {conexoes['max_conexoes']}")
+        col_ociosas.metric("Ociosas", conexoes['conexoes_ociosas'])
+        col_uso.metric("Utilização", f"{conexoes['utilizacao']:.0%}", help=f"Pico: {conexoes['pico_em_andamento']} requisições simultâneas")
+        col_total.metric("Requisições", conexoes['requisicoes_total'])
+
+    # Eficiência do cache por visão (hits/misses/invalidações)
+    st.markdown("### 🧠 Cache de Dados")
+    metricas_cache = estoque_manager.obter_metricas_cache()
+    if metricas_cache:
+        st.dataframe(
+            [{"Visão": visao, **m} for visao, m in metricas_cache.items()],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("Nenhuma consulta cacheada até o momento.")
+
+    # Latência por operação (p50/p95/p99), linhas e idas ao banco, medidas no processo
+    st.markdown("### ⏱️ Desempenho das Operações")
+    execucao = st.session_state.get("ultima_execucao")
+    if execucao:
+        col_tempo, col_requisicoes, col_bytes = st.columns(3)
+        col_tempo.metric("Última Execução do Script", f"{execucao['duracao'] * 1000:.0f} ms")
+        col_requisicoes.metric("Idas ao Banco na Execução", execucao['requisicoes'])
+        col_bytes.metric("Dados Recebidos", f"{execucao['bytes'] / 1024:,.1f} KB")
+
+    desempenho = estoque_manager.obter_metricas_desempenho()
+    if desempenho:
+        st.dataframe(desempenho, use_container_width=True, hide_index=True)
+        texto_prometheus = estoque_manager.exportar_metricas_prometheus()
+        st.download_button(
+            "📥 Exportar Métricas (Prometheus)",
+            data=texto_prometheus,
+            file_name="metricas_estoque.prom",
+            mime="text/plain"
+        )
+        with st.expander("Ver formato Prometheus"):
+            st.code(texto_prometheus, language="text")
+    else:
+        st.info("Nenhuma operação medida até o momento.")
+
+    renderizar_rastreamento()
+
     st.markdown("---")
     
     # Informações do sistema
@@ -35,5 +99,58 @@ def renderizar_configuracoes(estoque_manager, tipo_usuario: str):
     st.info(f"""
     **Versão da Aplicação:** 1.0.0  
     **Última Atualização do Módulo:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}  
-    **Gerenciador de Dados:** Supabase (PostgreSQL)  
-    """)
\ No newline at end of file
+    **Gerenciador de Dados:** {estoque_manager.NOME_BACKEND}  
+    """)
+
+
+def renderizar_rastreamento():
+    """Cascata das chamadas ao backend de cada execução rastreada nesta sessão."""
+    st.markdown("### 🔎 Rastreamento de Requisições")
+    st.toggle(
+        "Rastrear as chamadas ao backend de cada execução (apenas nesta sessão)",
+        key="rastrear_requisicoes",
+        help="Registra chamador, duração, idas ao banco e chamadas repetidas com os mesmos argumentos."
+    )
+    rastros = st.session_state.get("rastros", [])
+    if not rastros:
+        st.info("Ligue o rastreamento e navegue pelas páginas; as últimas execuções aparecem aqui.")
+        return
+
+    # Número sequencial de cada execução: o rótulo de uma execução não muda com as seguintes
+    por_numero = {r["numero"]: r for r in reversed(rastros)}
+    numero = st.selectbox(
+        "Execução",
+        list(por_numero),
+        format_func=lambda n: (f"#{n} · {por_numero[n]['horario']} · {por_numero[n]['pagina']} · "
+                               f"{por_numero[n]['chamadas']} chamadas ({por_numero[n]['duplicadas']} repetidas) · "
+                               f"{por_numero[n]['requisicoes']} idas ao banco")
+    )
+    rastro = por_numero[numero]
+
+    col_duracao, col_chamadas, col_duplicadas, col_requisicoes = st.columns(4)
+    col_duracao.metric("Duração", f"{rastro['duracao_ms']:.0f} ms")
+    col_chamadas.metric("Chamadas ao Backend", rastro['chamadas'])
+    col_duplicadas.metric("Repetidas", rastro['duplicadas'], help="Mesma operação e argumentos já chamados nesta execução.")
+    col_requisicoes.metric("Idas ao Banco", rastro['requisicoes'])
+
+    df = pd.DataFrame(rastro["detalhes"])
+    if df.empty:
+        st.info("Nenhuma chamada ao backend nesta execução.")
+        return
+    df["Chamada"] = [f"{o:02d} {'· ' * n}{op}" for o, n, op in zip(df["ordem"], df["nivel"], df["operacao"])]
+    df["Situação"] = df["duplicada"].map({True: "Repetida", False: "Primeira"})
+    fig = px.bar(
+        df, base="inicio_ms", x="duracao_ms", y="Chamada", orientation="h", color="Situação",
+        color_discrete_map={"Primeira": "#2E86AB", "Repetida": "#E4572E"},
+        hover_data=["componente", "argumentos", "chamador", "requisicoes"],
+        labels={"duracao_ms": "Tempo (ms)"},
+        height=max(250, 24 * len(df))
+    )
+    fig.update_yaxes(autorange="reversed", categoryorder="array", categoryarray=df["Chamada"].tolist())
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        df[["ordem", "operacao", "componente", "argumentos", "chamador", "inicio_ms", "duracao_ms", "requisicoes", "Situação"]],
+        use_container_width=True,
+        hide_index=True
+    )
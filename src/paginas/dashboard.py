@@ -3,14 +3,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict
+from src.core.classificacao import CORES_STATUS
 
-def renderizar_dashboard(estoque_manager):
-    """Renderiza a tab Dashboard com métricas e gráficos."""
+def renderizar_dashboard(estoque_manager, df_estoque: pd.DataFrame):
+    """Renderiza a tab Dashboard com métricas e gráficos (`df_estoque`: catálogo lido pela barra lateral)."""
     st.subheader("📈 Análise Visual e Métricas Chave")
     
-    # Gerar dados
-    df_estoque = estoque_manager.gerar_relatorio()
-    stats = estoque_manager.obter_estatisticas()
+    # Os KPIs vêm somados do banco (visão `produtos_estatisticas`)
+    stats = estoque_manager.agregar_estatisticas()
     
     # Indicadores Chave
     col1, col2, col3, col4 = st.columns(4)
@@ -26,14 +26,6 @@ def renderizar_dashboard(estoque_manager):
         st.info("Nenhum item cadastrado no estoque para exibir no Dashboard.")
         return
 
-    # Preparação para gráficos numéricos
-    df_num = df_estoque.copy()
-    df_num['Valor_Numerico'] = (
-        df_num['Valor Total']
-        .astype(str).str.replace('R$', '', regex=False).str.replace('.', '', regex=False)
-        .str.replace(',', '.', regex=False).str.strip().astype(float)
-    )
-
     # Análise de Estoque e Valor
     col_vis1, col_vis2 = st.columns(2)
 
@@ -43,21 +35,13 @@ def renderizar_dashboard(estoque_manager):
         status_counts = df_estoque['Status'].value_counts().reset_index()
         status_counts.columns = ['Status', 'Quantidade']
         
-        # Mapeamento de cores para status
-        color_map = {
-            ' Normal': '#2ca02c', 
-            ' Abaixo do Mínimo': '#ff7f0e', 
-            ' Sem Estoque': '#d62728',  
-            ' Acima do Máximo': '#1f77b4'
-        }
-        
         fig_pie = px.pie(
             status_counts,
             values='Quantidade',
             names='Status',
             title='Proporção de SKUs por Status de Estoque',
             color='Status',
-            color_discrete_map=color_map,
+            color_discrete_map=CORES_STATUS,
             height=380
         )
         fig_pie.update_traces(textinfo='percent+label', marker=dict(line=dict(color='#000000', width=1)))
@@ -66,15 +50,15 @@ def renderizar_dashboard(estoque_manager):
     # Gráfico 2: Top 10 Itens por Valor Total (Barras Horizontais)
     with col_vis2:
         st.markdown("#### 2. Top 10 Itens por Valor Total")
-        df_top = df_num.nlargest(10, 'Valor_Numerico')
+        df_top = df_estoque.nlargest(10, 'Valor Total')
 
         fig_bar = px.bar(
             df_top,
             y='nome', 
-            x='Valor_Numerico',
+            x='Valor Total',
             orientation='h',
             title="Itens que mais representam valor no estoque (R$)",
-            color='Valor_Numerico',
+            color='Valor Total',
             color_continuous_scale=px.colors.sequential.Teal,
             height=380
         )
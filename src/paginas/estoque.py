@@ -2,66 +2,87 @@ import streamlit as st
 import pandas as pd
 from typing import Dict
 from datetime import datetime
+from src.core.formatacao import formatar_para_exibicao
+from src.core.exportacao import FORMATOS_EXPORTACAO, arquivo_temporario, exportar_blocos, fatiar, formatos_disponiveis
+from src.core.classificacao import ROTULOS_STATUS, NORMAL, ABAIXO_MINIMO, SEM_ESTOQUE, ACIMA_MAXIMO
+from src.core.filtros import IndiceFiltros
 
-def renderizar_estoque(estoque_manager, filtros: Dict):
-    """Renderiza a tab de Visualização do Estoque (Apenas Leitura)."""
-    st.subheader("📦 Visualização do Estoque")
+@st.fragment
+def renderizar_exportacao(estoque_manager, df_filtrado: pd.DataFrame):
+    """Exportação da tabela filtrada ou do catálogo completo, gerada em blocos apenas sob demanda."""
+    st.markdown("#### ⬇️ Exportação")
+    col_formato, col_escopo = st.columns(2)
+    formato = col_formato.selectbox("Formato", formatos_disponiveis(), key="exp_formato",
+                                    help="Parquet e Arrow IPC mantêm os valores numéricos (sem formatação em R$).")
+    escopo = col_escopo.radio("Conteúdo", ["Tabela filtrada", "Catálogo completo"], horizontal=True, key="exp_escopo")
     
-    df_estoque = estoque_manager.gerar_relatorio()
+    if not st.button("📦 Gerar Arquivo", use_container_width=True, key="exp_gerar"):
+        return
     
-    if df_estoque.empty:
-        st.info("Nenhum item cadastrado no estoque.")
+    try:
+        if escopo == "Catálogo completo":
+            # Lido do banco em páginas, sem passar pelo DataFrame da tela
+            pedacos = estoque_manager.exportar_catalogo(formato)
+            prefixo = "catalogo_completo"
+        else:
+            pedacos = exportar_blocos(fatiar(df_filtrado), formato)
+            prefixo = "estoque_filtrado"
+        arquivo = arquivo_temporario(pedacos)
+    except Exception as e:
+        st.error(f"Erro ao gerar a exportação: {e}")
         return
-
-    # Aplicação de Filtros 
-    df_filtrado = df_estoque.copy()
     
-    # Filtro de Busca (código ou nome)
-    if filtros["busca"]:
-        termo = filtros["busca"].lower()
-        df_filtrado = df_filtrado[
-            df_filtrado["Código"].str.lower().str.contains(termo) |
-            df_filtrado["nome"].str.lower().str.contains(termo)
-        ]
+    extensao, mime = FORMATOS_EXPORTACAO[formato]
+    st.download_button(
+        label=f"⬇️ Baixar {prefixo.replace('_', ' ').title()} (.{extensao})",
+        data=arquivo,
+        file_name=f'{prefixo}_{datetime.now().strftime("%Y%m%d_%H%M")}.{extensao}',
+        mime=mime,
+        use_container_width=True
+    )
 
-    # Filtro de Fornecedor
-    if filtros["fornecedor"] != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Fornecedor"] == filtros["fornecedor"]]
 
-    # Filtro de Localização
-    if filtros["localizacao"] != "Todas":
-        df_filtrado = df_filtrado[df_filtrado["Localização"] == filtros["localizacao"]]
+def renderizar_estoque(estoque_manager, filtros: Dict, df_estoque: pd.DataFrame, indice: IndiceFiltros):
+    """Renderiza a tab de Visualização do Estoque (Apenas Leitura).
+
+    `df_estoque` e `indice` são o catálogo e o índice de filtros lidos pela barra lateral nesta execução.
+    """
+    st.subheader("📦 Visualização do Estoque")
+    
+    if df_estoque.empty:
+        st.info("Nenhum item cadastrado no estoque.")
+        return
 
-    # Filtro de Status
-    if filtros["status"] != "Todos":
-        status_map = {
-            "Normal": " Normal",
-            "Abaixo do Mínimo": " Abaixo do Mínimo",
-            "Sem Estoque": " Sem Estoque",
-            "Acima do Máximo": " Acima do Máximo"
-        }
-        status_filtrar = status_map.get(filtros["status"])
-        if status_filtrar:
-             df_filtrado = df_filtrado[df_filtrado["Status"] == status_filtrar]
+    # Aplicação de Filtros: busca pelo índice de trigramas e os demais pelos
+    # bitmaps de Fornecedor/Localização/Status (sem máscaras sobre o catálogo inteiro)
+    status_map = {
+        "Normal": ROTULOS_STATUS[NORMAL],
+        "Abaixo do Mínimo": ROTULOS_STATUS[ABAIXO_MINIMO],
+        "Sem Estoque": ROTULOS_STATUS[SEM_ESTOQUE],
+        "Acima do Máximo": ROTULOS_STATUS[ACIMA_MAXIMO]
+    }
+    selecao = {
+        "Fornecedor": None if filtros["fornecedor"] == "Todos" else filtros["fornecedor"],
+        "Localização": None if filtros["localizacao"] == "Todas" else filtros["localizacao"],
+        "Status": status_map.get(filtros["status"])
+    }
+    posicoes = indice.posicoes(
+        selecao, base=estoque_manager.buscar_posicoes(filtros["busca"], df_estoque)
+    )
+    df_filtrado = df_estoque if posicoes is None else df_estoque.iloc[posicoes]
 
     st.markdown(f"### Itens Encontrados: {len(df_filtrado)}")
     
+    # Formatação em R$ apenas na camada de exibição/exportação
+    df_exibicao = formatar_para_exibicao(df_filtrado)
+    
     # Exibir tabela 
     st.dataframe(
-        df_filtrado, 
+        df_exibicao, 
         use_container_width=True,
         hide_index=True
     )
     
-    csv_str = df_filtrado.to_csv(index=False, sep=';')
-    csv_bytes = csv_str.encode('utf-8-sig')
-
-    st.download_button(
-        label="⬇️ Exportar Tabela (.csv)",
-        data=csv_bytes,
-        file_name=f'estoque_filtrado_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
-        mime='text/csv',
-        use_container_width=True
-    )
+    renderizar_exportacao(estoque_manager, df_filtrado)
     
     st.info("Para realizar **Movimentações (Entrada/Saída)**, **Editar Dados** ou **Excluir Itens**, utilize a aba **🔄 Movimentações**.")
\ No newline at end of file
@@ -1,38 +1,87 @@
 import streamlit as st
 import pandas as pd
 from typing import Dict
+from datetime import date, timedelta
 
 def renderizar_historico(estoque_manager):
-    """Renderiza a tab de Histórico de Movimentações."""
+    """Renderiza a tab de Histórico de Movimentações (uma página por vez, filtrada no servidor)."""
     st.subheader("📜 Histórico de Movimentações")
-    
-    historico_data = estoque_manager.get_historico_data() 
-    
-    if not historico_data:
-        st.info("Nenhuma movimentação registrada ainda.")
-        return
-        
-    df_historico = pd.DataFrame(historico_data)
-    
-    # Reordenar colunas e formatar 
-    df_historico = df_historico[['data', 'tipo', 'id', 'nome', 'quantidade', 'usuario', 'observacao']]
-    
-    # Renomear para exibição
-    df_historico.columns = [
-        "Data/Hora", 
-        "Tipo de Mov.", 
-        "Cód. Item", 
-        "Produto", 
-        "Qtd. Final", 
-        "Usuário",
-        "Observação" 
-    ]
-    
-    # Formatação de data/hora 
-    try:
-        df_historico['Data/Hora'] = pd.to_datetime(df_historico['Data/Hora']).dt.strftime('%d/%m/%Y %H:%M:%S')
-    except Exception:
-    
-        pass
-    
-    st.dataframe(df_historico, use_container_width=True, hide_index=True)
\ No newline at end of file
+
+    # Valores iniciais via session_state (preservados pelo app.py ao trocar de página)
+    st.session_state.setdefault("hist_periodo", (date.today() - timedelta(days=30), date.today()))
+    st.session_state.setdefault("hist_tamanho", 50)
+
+    # Filtros (aplicados na consulta ao banco)
+    col_periodo, col_tipo, col_item, col_usuario = st.columns([2, 1, 1, 1])
+    periodo = col_periodo.date_input(
+        "Período",
+        format="DD/MM/YYYY",
+        key="hist_periodo"
+    )
+    tipo = col_tipo.selectbox("Tipo de Mov.", ["Todos", "Entrada", "Saída"], key="hist_tipo")
+    item_id = col_item.text_input("Cód. Item", key="hist_item").strip().upper()
+    usuario = col_usuario.text_input("Usuário", key="hist_usuario").strip()
+
+    data_inicio = periodo[0] if len(periodo) > 0 else None
+    data_fim = periodo[1] if len(periodo) > 1 else data_inicio
+    filtros = {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "tipo": None if tipo == "Todos" else tipo,
+        "item_id": item_id or None,
+        "usuario": usuario or None
+    }
+
+    col_tamanho, col_exata = st.columns([1, 3])
+    tamanho_pagina = col_tamanho.selectbox("Linhas por página", [25, 50, 100, 200], key="hist_tamanho")
+    contagem_exata = col_exata.checkbox("Contagem exata (mais lenta em tabelas grandes)", key="hist_exata")
+
+    # Pilha de cursores (data, id, seq) da paginação; reinicia quando os filtros mudam
+    assinatura = (tuple(filtros.items()), tamanho_pagina)
+    if st.session_state.get("hist_assinatura") != assinatura:
+        st.session_state.hist_assinatura = assinatura
+        st.session_state.hist_cursores = [None]
+    cursores = st.session_state.hist_cursores
+
+    pagina = estoque_manager.get_historico_pagina(**filtros, cursor=cursores[-1], tamanho_pagina=tamanho_pagina)
+    total = estoque_manager.contar_historico(**filtros, exato=contagem_exata)
+
+    if total is not None:
+        st.caption(f"{'Total' if contagem_exata else 'Total estimado'}: **{total}** movimentações · Página {len(cursores)}")
+
+    if not pagina:
+        st.info("Nenhuma movimentação encontrada para os filtros selecionados.")
+    else:
+        df_historico = pd.DataFrame(pagina)
+
+        # Reordenar colunas e formatar
+        df_historico = df_historico[['data', 'tipo', 'id', 'nome', 'quantidade', 'usuario', 'observacao']]
+
+        # Renomear para exibição
+        df_historico.columns = [
+            "Data/Hora",
+            "Tipo de Mov.",
+            "Cód. Item",
+            "Produto",
+            "Qtd. Final",
+            "Usuário",
+            "Observação"
+        ]
+
+        # Formatação de data/hora (apenas das linhas da página)
+        try:
+            df_historico['Data/Hora'] = pd.to_datetime(df_historico['Data/Hora'], format="ISO8601").dt.strftime('%d/%m/%Y %H:%M:%S')
+        except Exception:
+
+            pass
+
+        st.dataframe(df_historico, use_container_width=True, hide_index=True)
+
+    col_anterior, _, col_proxima = st.columns([1, 2, 1])
+    if col_anterior.button("⬅️ Anterior", use_container_width=True, disabled=len(cursores) == 1, key="hist_anterior"):
+        cursores.pop()
+        st.rerun()
+    if col_proxima.button("Próxima ➡️", use_container_width=True, disabled=len(pagina) < tamanho_pagina, key="hist_proxima"):
+        ultima = pagina[-1]
+        cursores.append((ultima['data'], ultima['id'], ultima.get('seq')))
+        st.rerun()
@@ -1,181 +1,381 @@
+import hashlib
 import streamlit as st
 import pandas as pd
-import time
-from typing import Dict
+from typing import Dict, Set
+from src.core.atualizacao_massa import ids_da_lista, previa_atualizacao, resumo_previa
+from src.core.classificacao import ROTULOS_STATUS, NORMAL, ABAIXO_MINIMO, SEM_ESTOQUE, ACIMA_MAXIMO
+from src.core.filtros import IndiceFiltros
+from src.core.formatacao import formatar_moeda, formatar_para_exibicao
+from src.core.identidade import MapaIdentidade
+from src.core.importacao import ler_planilha, validar_movimentacoes, movimentacoes_para_lote
+from src.core.repositorio import MOTIVO_INSUFICIENTE, STATUS_ACEITO
 
-def renderizar_movimentacoes(estoque_manager, tipo_usuario: str):
-    """Renderiza a tab de Movimentações (Entrada/Saída), Edição e Exclusão."""
-    st.subheader("🔄 Movimentações, Edição e Exclusão de Estoque")
+
+def renderizar_upload_movimentacoes(estoque_manager, itens: pd.DataFrame):
+    """Upload de um arquivo de movimentações: valida tudo localmente e envia em lote."""
+    st.markdown("### Registrar Movimentações por Arquivo")
+    st.caption("Colunas esperadas: **id**, **tipo** (Entrada/Saída), **quantidade** e, opcionalmente, **observacao**. "
+               "CSV separado por ';' ou ',' ou planilha XLSX.")
     
-    if tipo_usuario not in ["Administrador", "Operador"]:
-        st.error("Acesso negado. Apenas usuários autenticados podem realizar movimentações e edições.")
+    arquivo = st.file_uploader("Arquivo de Movimentações", type=["csv", "xlsx"], key="upload_mov")
+    if arquivo is None:
+        return
+    
+    try:
+        validas, rejeitadas = validar_movimentacoes(ler_planilha(arquivo), itens)
+    except Exception as e:
+        st.error(f"Não foi possível ler o arquivo: {e}")
         return
-
-    # Obter dados e montar opções de seleção (usando gerar_relatorio)
-    itens = estoque_manager.gerar_relatorio()
     
-    # Criar um dicionário de opções para o Selectbox
-    opcoes_estoque = {row["Código"]: f"{row['Código']} - {row['nome']} (Qtd: {row['Quantidade']})" 
-                      for index, row in itens.iterrows()}
+    col_ok, col_rej, col_neg = st.columns(3)
+    col_ok.metric("Linhas válidas", len(validas))
+    col_rej.metric("Linhas rejeitadas", len(rejeitadas))
+    col_neg.metric("Saldo previsto negativo", int((validas["saldo_previsto"] < 0).sum()))
+    
+    if not rejeitadas.empty:
+        st.warning("As linhas abaixo não serão enviadas:")
+        st.dataframe(rejeitadas, use_container_width=True, hide_index=True)
+    
+    with st.expander("Pré-visualização das linhas válidas"):
+        st.dataframe(validas, use_container_width=True, hide_index=True)
+    
+    # O lote é aplicado uma vez por arquivo: reenviar exige carregar outro arquivo
+    assinatura = hashlib.sha256(arquivo.getvalue()).hexdigest()
+    enviado = st.session_state.get("lote_mov_enviado", {}).get("assinatura") == assinatura
+    
+    if st.button(f"✅ Enviar {len(validas)} Movimentações", use_container_width=True, 
+                 disabled=validas.empty or enviado, key="enviar_lote_mov") and not enviado:
+        resultados = pd.DataFrame(estoque_manager.movimentar_lote(movimentacoes_para_lote(validas)))
+        resultados.insert(0, "linha", validas["linha"].values)
+        st.session_state.lote_mov_enviado = {"assinatura": assinatura, "resultados": resultados}
+        # Reexecuta o fragmento: o botão volta desabilitado e os saldos são relidos
+        st.rerun(scope="fragment")
+    
+    if enviado:
+        resultados = st.session_state.lote_mov_enviado["resultados"]
+        aceitas = int((resultados["status"] == STATUS_ACEITO).sum())
+        st.success(f"{aceitas} de {len(resultados)} movimentações aceitas.")
+        st.info("Este arquivo já foi enviado. Carregue outro arquivo para registrar novas movimentações.")
+        st.dataframe(resultados, use_container_width=True, hide_index=True)
+
 
-    opcoes_lista = [None] + list(opcoes_estoque.keys()) 
+class CatalogoDaExecucao:
+    """Catálogo e índice de filtros lidos pela barra lateral na execução completa do script.
+
+    Cada fragmento usa essa cópia na execução completa em que ela foi criada (sem reler
+    o relatório que a barra lateral acabou de ler); numa reexecução apenas do fragmento,
+    após uma escrita ou interação nele, relê o relatório para refletir as escritas.
+    """
+
+    def __init__(self, estoque_manager, catalogo: pd.DataFrame, indice: IndiceFiltros):
+        self.estoque_manager = estoque_manager
+        self.catalogo = catalogo
+        self.indice = indice
+        self._usado_por: Set[str] = set()
+
+    def obter(self, fragmento: str) -> pd.DataFrame:
+        """Catálogo para o fragmento: a cópia da execução no primeiro uso, relido nos seguintes."""
+        if fragmento in self._usado_por:
+            return self.estoque_manager.gerar_relatorio()
+        self._usado_por.add(fragmento)
+        return self.catalogo
+
+    def indice_filtros(self, catalogo: pd.DataFrame) -> IndiceFiltros:
+        """Índice de filtros do catálogo obtido em `obter`."""
+        if catalogo is self.catalogo:
+            return self.indice
+        return self.estoque_manager.obter_indice_filtros(catalogo)
+
+
+def _mapa_itens() -> MapaIdentidade:
+    """Mapa de identidade da sessão: o item selecionado só é relido após uma escrita nele."""
+    return st.session_state.setdefault("mapa_itens", MapaIdentidade())
+
+
+def _opcoes_itens(itens: pd.DataFrame) -> Dict[str, str]:
+    """Rótulos do selectbox de itens (código -> 'código - nome (Qtd: n)')."""
+    return {row["Código"]: f"{row['Código']} - {row['nome']} (Qtd: {row['Quantidade']})" 
+            for index, row in itens.iterrows()}
+
+
+@st.fragment
+def renderizar_entrada_saida(estoque_manager, execucao: CatalogoDaExecucao):
+    """Entrada/Saída como fragmento: cada registro reexecuta apenas este bloco."""
+    # Relido nas reexecuções do fragmento para refletir o saldo após cada registro
+    itens = execucao.obter("entrada_saida")
+    opcoes_estoque = _opcoes_itens(itens)
+    opcoes_lista = [None] + list(opcoes_estoque.keys())
+
+    modo_mov = st.radio("Modo de Registro", ["Individual", "Arquivo (CSV/XLSX)"], horizontal=True, key="modo_mov")
     
+    if modo_mov == "Arquivo (CSV/XLSX)":
+        renderizar_upload_movimentacoes(estoque_manager, itens)
+        return
+
+    st.markdown("### Registrar Entrada ou Saída")
+
+    col_sel, col_qtd, col_tipo = st.columns([2, 1, 1])
+
+    codigo_selecionado_mov = col_sel.selectbox(
+        "Selecione o Item",
+        options=opcoes_lista,
+        format_func=lambda x: opcoes_estoque.get(x, "Selecione um Item..."),
+        key="sel_mov"
+    )
+
+    quantidade_mov = col_qtd.number_input("Quantidade", min_value=1, step=1, value=1)
+    tipo_movimentacao = col_tipo.radio("Tipo", ["Entrada", "Saída"], horizontal=True)
+    observacao_mov = st.text_input("Observação (Motivo, NF, etc.)")
+
+    submitted_mov = st.button("✅ Registrar Movimentação", use_container_width=True, 
+                              disabled=codigo_selecionado_mov is None)
+
+    if submitted_mov:
+        # Nome e saldo vêm do catálogo já carregado; a validação do saldo é feita
+        # no servidor, na mesma chamada que aplica a movimentação.
+        item_atual = itens[itens["Código"] == codigo_selecionado_mov]
     
-    # Tabs para organizar as diferentes funcionalidades
-    tab_movimentacao, tab_edicao, tab_exclusao = st.tabs([
-        "➕➖ Entrada/Saída", 
-        "📝 Edição Detalhada", 
-        "🗑️ Exclusão (Admin)"
-    ])
+        if item_atual.empty:
+            st.error("Item não encontrado no estoque.")
+        else:
+            nome_item = item_atual.iloc[0]["nome"]
+            resultado = estoque_manager.registrar_movimentacao(
+                codigo_selecionado_mov, tipo_movimentacao, quantidade_mov, observacao_mov
+            )
+        
+            if resultado["status"] == STATUS_ACEITO:
+                # O toast sobrevive ao rerun do fragmento (que atualiza o saldo exibido)
+                st.toast(f"{tipo_movimentacao} de {quantidade_mov} unidades de **{nome_item}** registrada com sucesso. Novo saldo: {resultado['nova_quantidade']}", icon="✅")
+                st.rerun(scope="fragment")
+            else:
+                # O motivo vem do backend; o saldo exibido é relido (o catálogo da tela pode estar defasado)
+                motivo = resultado["motivo"]
+                if motivo == MOTIVO_INSUFICIENTE:
+                    atual = estoque_manager.get_item_by_id(codigo_selecionado_mov)
+                    if atual is not None:
+                        motivo += f". Disponível: {atual['quantidade']}"
+                st.error(f"Não foi possível registrar a movimentação: {motivo}.")
+
 
+@st.fragment
+def renderizar_edicao(estoque_manager, execucao: CatalogoDaExecucao):
+    """Edição detalhada como fragmento isolado do restante da aplicação."""
+    st.markdown("### 📝 Edição Detalhada")
+
+    opcoes_estoque = _opcoes_itens(execucao.obter("edicao"))
+    opcoes_lista = [None] + list(opcoes_estoque.keys())
     
-    # Tab Movimentação (Entrada/Saída)
-    with tab_movimentacao:
-        st.markdown("### Registrar Entrada ou Saída")
+    col_sel_edit, _ = st.columns([1, 2])
+    with col_sel_edit:
+        codigo_selecionado_edit = st.selectbox(
+            "Selecione o Item para Edição",
+            options=opcoes_lista,
+            format_func=lambda x: opcoes_estoque.get(x, "Selecione um Item..."),
+            key="sel_edit"
+        )
+
+    item_edit = None
+    if codigo_selecionado_edit:
+        item_edit = estoque_manager.obter_item(codigo_selecionado_edit, _mapa_itens())
+
+    if item_edit:
+        st.info(f"Editando item: **{item_edit['nome']}**")
+        
+        # Mapeamento de campos.
+        campos_para_edicao = {
+            "Nome": {"campo_db": "nome", "tipo": "text", "valor_atual": item_edit.get("nome", "")},
+            "Unidade": {"campo_db": "unidade", "tipo": "select", "opcoes": ["PÇ", "M", "KG", "UN", "CX"], "valor_atual": item_edit.get("unidade", "PÇ")},
+            "Mínimo": {"campo_db": "minimo", "tipo": "number", "min_value": 0, "valor_atual": item_edit.get("minimo", 0)},
+            "Máximo": {"campo_db": "maximo", "tipo": "number", "min_value": 1, "valor_atual": item_edit.get("maximo", 1)},
+            "Localização": {"campo_db": "localizacao", "tipo": "text", "valor_atual": item_edit.get("localizacao", "")},
+            "Fornecedor": {"campo_db": "fornecedor", "tipo": "text", "valor_atual": item_edit.get("fornecedor", "")},
+            "Preço Unitário": {"campo_db": "preco", "tipo": "number", "min_value": 0.01, "valor_atual": item_edit.get("preco", 0.01)},
+        }
+
+        col_edit1, col_edit2 = st.columns(2)
         
-        col_sel, col_qtd, col_tipo = st.columns([2, 1, 1])
+        novos_valores = {}
+        for i, (label, meta) in enumerate(campos_para_edicao.items()):
+            col = col_edit1 if i % 2 == 0 else col_edit2
+            
+            with col:
+                if meta['tipo'] == 'text':
+                    novos_valores[label] = st.text_input(label, value=meta['valor_atual'], key=f"edit_{meta['campo_db']}")
+                    
+                elif meta['tipo'] == 'number':
+                    is_price_field = meta['campo_db'] == 'preco'
+                    
+                    if is_price_field:
+                        input_step = 0.01
+                        input_type_func = float
+                    else: 
+                        input_step = 1
+                        input_type_func = int
+
+                    novos_valores[label] = st.number_input(
+                        label, 
+                        value=input_type_func(meta['valor_atual']), 
+                        min_value=input_type_func(meta.get('min_value')), 
+                        step=input_step, 
+                        key=f"edit_{meta['campo_db']}"
+                    )
+                    
+                elif meta['tipo'] == 'select':
+                    novos_valores[label] = st.selectbox(label, options=meta['opcoes'], index=meta['opcoes'].index(meta['valor_atual']), key=f"edit_{meta['campo_db']}")
         
-        codigo_selecionado_mov = col_sel.selectbox(
-            "Selecione o Item",
+        if st.button("✅ Salvar Edições", use_container_width=True):
+            # Todos os campos alterados vão numa única escrita, condicionada à versão exibida
+            alteracoes = {
+                meta['campo_db']: novos_valores[label]
+                for label, meta in campos_para_edicao.items()
+                if novos_valores[label] != meta['valor_atual']
+            }
+
+            if not alteracoes:
+                st.warning("Nenhuma alteração detectada para salvar.")
+            elif estoque_manager.atualizar_item(codigo_selecionado_edit, alteracoes,
+                                                versao=item_edit.get(estoque_manager.COLUNA_VERSAO)):
+                st.toast("Item atualizado com sucesso!", icon="✅")
+                st.rerun(scope="fragment")
+
+
+@st.fragment
+def renderizar_exclusao(estoque_manager, execucao: CatalogoDaExecucao):
+    """Exclusão de itens como fragmento isolado do restante da aplicação."""
+    st.markdown("### 🗑️ Exclusão Permanente de Item")
+
+    opcoes_estoque = _opcoes_itens(execucao.obter("exclusao"))
+    opcoes_lista = [None] + list(opcoes_estoque.keys())
+
+    col_sel_del, _ = st.columns([1, 2])
+    with col_sel_del:
+        codigo_selecionado_del = st.selectbox(
+            "Selecione o Item para Exclusão",
             options=opcoes_lista,
             format_func=lambda x: opcoes_estoque.get(x, "Selecione um Item..."),
-            key="sel_mov"
+            key="sel_del"
         )
+
+    item_del = None
+    if codigo_selecionado_del:
+        item_del = estoque_manager.obter_item(codigo_selecionado_del, _mapa_itens())
+
+    if item_del:
+        st.warning(f"Confirme a exclusão permanente do item: **{item_del['nome']}** ({codigo_selecionado_del}). Esta ação não pode ser desfeita.")
         
-        quantidade_mov = col_qtd.number_input("Quantidade", min_value=1, step=1, value=1)
-        tipo_movimentacao = col_tipo.radio("Tipo", ["Entrada", "Saída"], horizontal=True)
-        observacao_mov = st.text_input("Observação (Motivo, NF, etc.)")
-        
-        submitted_mov = st.button("✅ Registrar Movimentação", use_container_width=True, 
-                                  disabled=codigo_selecionado_mov is None)
+        confirm_delete = st.checkbox(f"Eu confirmo que desejo **EXCLUIR** o item {codigo_selecionado_del}.", key="confirm_del")
         
-        if submitted_mov:
-            item_atual = estoque_manager.get_item_by_id(codigo_selecionado_mov)
-            
-            if item_atual is None:
-                st.error("Item não encontrado no estoque.")
-                
-            elif tipo_movimentacao == "Entrada":
-                if estoque_manager.entrada_estoque(codigo_selecionado_mov, quantidade_mov, observacao_mov):
-                    st.success(f"Entrada de {quantidade_mov} unidades de **{item_atual['nome']}** registrada com sucesso.")
-                    st.rerun()
-
-            elif tipo_movimentacao == "Saída":
-                if item_atual['quantidade'] < quantidade_mov:
-                    st.error(f"Quantidade insuficiente no estoque. Disponível: {item_atual['quantidade']}")
-                elif estoque_manager.saida_estoque(codigo_selecionado_mov, quantidade_mov, observacao_mov):
-                    st.success(f"Saída de {quantidade_mov} unidades de **{item_atual['nome']}** registrada com sucesso.")
-                    st.rerun()
-                
+        if st.button("🔴 EXCLUIR PRODUTO DEFINITIVAMENTE", use_container_width=True, disabled=not confirm_delete):
+            if estoque_manager.excluir_item(codigo_selecionado_del):
+                st.toast(f"Item {codigo_selecionado_del} excluído com sucesso!", icon="✅")
+                st.rerun(scope="fragment")
+
+
+@st.fragment
+def renderizar_atualizacao_massa(estoque_manager, execucao: CatalogoDaExecucao):
+    """Reajuste de preço e novo mínimo/máximo/localização para todos os itens de um filtro."""
+    st.markdown("### 💲 Atualização em Massa")
+    st.caption("Os itens que atendem a todos os filtros são alterados de uma só vez, numa única escrita no banco.")
+
+    catalogo = execucao.obter("atualizacao_massa")
+    indice = execucao.indice_filtros(catalogo)
+
+    st.markdown("#### Filtro")
+    col_forn, col_loc, col_status = st.columns(3)
+    fornecedor = col_forn.selectbox("Fornecedor", [None] + indice.opcoes("Fornecedor"),
+                                    format_func=lambda x: "Todos" if x is None else x, key="massa_fornecedor")
+    localizacao = col_loc.selectbox("Localização", [None] + indice.opcoes("Localização"),
+                                    format_func=lambda x: "Todas" if x is None else x, key="massa_localizacao")
+    status = col_status.selectbox("Status", [None, NORMAL, ABAIXO_MINIMO, SEM_ESTOQUE, ACIMA_MAXIMO],
+                                  format_func=lambda x: "Todos" if x is None else ROTULOS_STATUS[x], key="massa_status")
+    codigos = st.text_area("Códigos (opcional, separados por vírgula ou linha)", key="massa_ids", height=68)
+
+    st.markdown("#### Ajuste")
+    col_preco, col_valor = st.columns(2)
+    tipo_preco = col_preco.radio("Preço", ["Manter", "Percentual (%)", "Valor (R$)"], horizontal=True, key="massa_tipo_preco")
+    variacao = col_valor.number_input("Variação do preço", value=0.0, step=0.5, key="massa_variacao",
+                                      disabled=tipo_preco == "Manter",
+                                      help="Positiva para aumento, negativa para redução (o preço nunca fica abaixo de R$ 0,01).")
+    col_min, col_max, col_nova_loc = st.columns(3)
+    novo_minimo = col_min.number_input("Novo Mínimo", min_value=0, value=None, step=1, key="massa_minimo")
+    novo_maximo = col_max.number_input("Novo Máximo", min_value=1, value=None, step=1, key="massa_maximo")
+    nova_localizacao = col_nova_loc.text_input("Nova Localização", key="massa_nova_localizacao").strip()
+
+    filtro = {"fornecedor": fornecedor, "localizacao": localizacao, "status": status, "ids": ids_da_lista(codigos)}
+    ajuste = {
+        "preco_percentual": variacao if tipo_preco == "Percentual (%)" and variacao else None,
+        "preco_valor": variacao if tipo_preco == "Valor (R$)" and variacao else None,
+        "minimo": novo_minimo, "maximo": novo_maximo, "localizacao": nova_localizacao,
+    }
+
+    try:
+        previa = previa_atualizacao(catalogo, filtro, ajuste)
+    except ValueError as e:
+        st.info(str(e))
+        return
+    resumo = resumo_previa(previa)
+
+    # Prévia calculada sobre o catálogo já carregado, sem ida ao banco
+    col_itens, col_atual, col_novo, col_impacto = st.columns(4)
+    col_itens.metric("Itens Afetados", resumo["itens"])
+    col_atual.metric("Valor em Estoque Atual", formatar_moeda(pd.Series([resumo["valor_atual"]])).iat[0])
+    col_novo.metric("Valor em Estoque Após", formatar_moeda(pd.Series([resumo["valor_novo"]])).iat[0])
+    col_impacto.metric("Impacto", formatar_moeda(pd.Series([resumo["impacto"]])).iat[0])
+
+    if resumo["conflitos"]:
+        st.error(f"{resumo['conflitos']} itens ficariam com o mínimo maior ou igual ao máximo; ajuste os valores.")
+    st.dataframe(
+        formatar_para_exibicao(previa, moeda=("Preço", "Novo Preço", "Valor Total", "Novo Valor Total", "Diferença")),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    confirmar = st.checkbox(f"Eu confirmo a alteração dos **{resumo['itens']}** itens acima.", key="massa_confirmar")
+    if st.button(f"✅ Aplicar a {resumo['itens']} Itens", use_container_width=True, key="massa_aplicar",
+                 disabled=not confirmar or not resumo["itens"] or bool(resumo["conflitos"])):
+        ids = estoque_manager.atualizar_em_massa(filtro, ajuste)
+        if ids is not None:
+            st.toast(f"{len(ids)} itens atualizados com sucesso!", icon="✅")
+            st.rerun(scope="fragment")
+
+
+def renderizar_movimentacoes(estoque_manager, tipo_usuario: str, catalogo: pd.DataFrame, indice: IndiceFiltros):
+    """Renderiza a tab de Movimentações (Entrada/Saída), Edição e Exclusão.
+
+    `catalogo` e `indice` são os da barra lateral nesta execução.
+    """
+    st.subheader("🔄 Movimentações, Edição e Exclusão de Estoque")
     
-    # Tab Edição Detalhada
-    with tab_edicao:
-        st.markdown("### 📝 Edição Detalhada")
-        
-        col_sel_edit, _ = st.columns([1, 2])
-        with col_sel_edit:
-            codigo_selecionado_edit = st.selectbox(
-                "Selecione o Item para Edição",
-                options=opcoes_lista,
-                format_func=lambda x: opcoes_estoque.get(x, "Selecione um Item..."),
-                key="sel_edit"
-            )
+    if tipo_usuario not in ["Administrador", "Operador"]:
+        st.error("Acesso negado. Apenas usuários autenticados podem realizar movimentações e edições.")
+        return
+    
+    # Tabs para organizar as diferentes funcionalidades; cada uma é um fragmento
+    # e seus botões reexecutam apenas o próprio bloco
+    execucao = CatalogoDaExecucao(estoque_manager, catalogo, indice)
+    tab_movimentacao, tab_edicao, tab_massa, tab_exclusao = st.tabs([
+        "➕➖ Entrada/Saída", 
+        "📝 Edição Detalhada", 
+        "💲 Atualização em Massa (Admin)",
+        "🗑️ Exclusão (Admin)"
+    ])
 
-        item_edit = None
-        if codigo_selecionado_edit:
-            item_edit = estoque_manager.get_item_by_id(codigo_selecionado_edit)
+    with tab_movimentacao:
+        renderizar_entrada_saida(estoque_manager, execucao)
 
-        if item_edit:
-            st.info(f"Editando item: **{item_edit['nome']}**")
-            
-            # Mapeamento de campos.
-            campos_para_edicao = {
-                "Nome": {"campo_db": "nome", "tipo": "text", "valor_atual": item_edit.get("nome", "")},
-                "Unidade": {"campo_db": "unidade", "tipo": "select", "opcoes": ["PÇ", "M", "KG", "UN", "CX"], "valor_atual": item_edit.get("unidade", "PÇ")},
-                "Mínimo": {"campo_db": "minimo", "tipo": "number", "min_value": 0, "valor_atual": item_edit.get("minimo", 0)},
-                "Máximo": {"campo_db": "maximo", "tipo": "number", "min_value": 1, "valor_atual": item_edit.get("maximo", 1)},
-                "Localização": {"campo_db": "localizacao", "tipo": "text", "valor_atual": item_edit.get("localizacao", "")},
-                "Fornecedor": {"campo_db": "fornecedor", "tipo": "text", "valor_atual": item_edit.get("fornecedor", "")},
-                "Preço Unitário": {"campo_db": "preco", "tipo": "number", "min_value": 0.01, "valor_atual": item_edit.get("preco", 0.01)},
-            }
+    with tab_edicao:
+        renderizar_edicao(estoque_manager, execucao)
+
+    with tab_massa:
+        if tipo_usuario != "Administrador":
+            st.markdown("### 💲 Atualização em Massa")
+            st.error("A atualização em massa de preços e parâmetros é **restrita a Administradores**.")
+        else:
+            renderizar_atualizacao_massa(estoque_manager, execucao)
 
-            col_edit1, col_edit2 = st.columns(2)
-            
-            novos_valores = {}
-            for i, (label, meta) in enumerate(campos_para_edicao.items()):
-                col = col_edit1 if i % 2 == 0 else col_edit2
-                
-                with col:
-                    if meta['tipo'] == 'text':
-                        novos_valores[label] = st.text_input(label, value=meta['valor_atual'], key=f"edit_{meta['campo_db']}")
-                        
-                    elif meta['tipo'] == 'number':
-                        is_price_field = meta['campo_db'] == 'preco'
-                        
-                        if is_price_field:
-                            input_step = 0.01
-                            input_type_func = float
-                        else: 
-                            input_step = 1
-                            input_type_func = int
-
-                        novos_valores[label] = st.number_input(
-                            label, 
-                            value=input_type_func(meta['valor_atual']), 
-                            min_value=input_type_func(meta.get('min_value')), 
-                            step=input_step, 
-                            key=f"edit_{meta['campo_db']}"
-                        )
-                        
-                    elif meta['tipo'] == 'select':
-                        novos_valores[label] = st.selectbox(label, options=meta['opcoes'], index=meta['opcoes'].index(meta['valor_atual']), key=f"edit_{meta['campo_db']}")
-            
-            if st.button("✅ Salvar Edições", use_container_width=True):
-                houve_mudanca = False
-                for label, meta in campos_para_edicao.items():
-                    campo_db = meta['campo_db']
-                    novo_valor = novos_valores[label]
-                    valor_atual = meta['valor_atual']
-
-                    if novo_valor != valor_atual:
-                        if estoque_manager.atualizar_item(codigo_selecionado_edit, campo_db, novo_valor):
-                            houve_mudanca = True
-                
-                if houve_mudanca:
-                    st.success("Item atualizado com sucesso!")
-                    st.rerun()
-                else:
-                    st.warning("Nenhuma alteração detectada para salvar.")
-
-
-    # Tab Exclusão
     with tab_exclusao:
-        st.markdown("### 🗑️ Exclusão Permanente de Item")
-        
         if tipo_usuario != "Administrador":
+            st.markdown("### 🗑️ Exclusão Permanente de Item")
             st.error("A exclusão de itens é uma operação crítica e é **restrita a Administradores**.")
             return
-
-        col_sel_del, _ = st.columns([1, 2])
-        with col_sel_del:
-            codigo_selecionado_del = st.selectbox(
-                "Selecione o Item para Exclusão",
-                options=opcoes_lista,
-                format_func=lambda x: opcoes_estoque.get(x, "Selecione um Item..."),
-                key="sel_del"
-            )
-
-        item_del = None
-        if codigo_selecionado_del:
-            item_del = estoque_manager.get_item_by_id(codigo_selecionado_del)
-
-        if item_del:
-            st.warning(f"Confirme a exclusão permanente do item: **{item_del['nome']}** ({codigo_selecionado_del}). Esta ação não pode ser desfeita.")
-            
-            confirm_delete = st.checkbox(f"Eu confirmo que desejo **EXCLUIR** o item {codigo_selecionado_del}.", key="confirm_del")
-            
-            if st.button("🔴 EXCLUIR PRODUTO DEFINITIVAMENTE", use_container_width=True, disabled=not confirm_delete):
-                if estoque_manager.excluir_item(codigo_selecionado_del):
-                    st.success(f"Item {codigo_selecionado_del} excluído com sucesso!")
-                    time.sleep(1)
-                    st.rerun()
\ No newline at end of file
+        renderizar_exclusao(estoque_manager, execucao)
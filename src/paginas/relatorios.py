@@ -2,87 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import random
-from typing import List, Dict, Any
-
-# Funções Auxiliares de Cálculo
-
-def calcular_curva_abc(df_estoque: pd.DataFrame) -> pd.DataFrame:
-    """Calcula a Curva ABC baseada no Valor Total de cada item."""
-    df = df_estoque.copy()
-    
-    if df.empty:
-        return pd.DataFrame()
-        
-    # Extrair e converter a coluna 'Valor Total' para float
-    df['Valor_Numerico'] = (
-        df['Valor Total']
-        .astype(str)
-        .str.replace('R$', '', regex=False)
-        .str.replace('.', '', regex=False)
-        .str.replace(',', '.', regex=False)
-        .str.strip()
-        .astype(float)
-    )
-
-    # Ordenar por Valor Total e calcular a participação
-    df = df.sort_values(by='Valor_Numerico', ascending=False).reset_index(drop=True)
-    df['Valor Acumulado'] = df['Valor_Numerico'].cumsum()
-    
-    valor_total_estoque = df['Valor_Numerico'].sum()
-    
-    df['% Valor Acumulado'] = (df['Valor Acumulado'] / valor_total_estoque) * 100
-    df['% Item Acumulado'] = (df.index + 1) / len(df) * 100
-
-    # Classificação ABC
-    def get_classe(percentual_valor):
-        if percentual_valor <= 80:
-            return 'A'
-        elif percentual_valor <= 95:
-            return 'B'
-        else:
-            return 'C'
-
-    df['Classe ABC'] = df['% Valor Acumulado'].apply(get_classe)
-
-    # Formatação e seleção final
-    df['Valor Total'] = df['Valor_Numerico'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-    df['% Valor Acumulado'] = df['% Valor Acumulado'].apply(lambda x: f"{x:,.2f}%".replace(",", "X").replace(".", ",").replace("X", "."))
-    df['% Item Acumulado'] = df['% Item Acumulado'].apply(lambda x: f"{x:,.2f}%".replace(",", "X").replace(".", ",").replace("X", "."))
-    
-    return df[['Código', 'nome', 'Quantidade', 'Valor Total', 'Classe ABC', '% Valor Acumulado', '% Item Acumulado', 'Fornecedor', 'Localização']]
-
-
-def calcular_consumo_medio(historico_data: List[Dict[str, Any]]) -> Dict[str, float]:
-    """Calcula o consumo diário médio de cada item com base no histórico de SAÍDAS."""
-    
-    if not historico_data:
-        return {}
-        
-    df_hist = pd.DataFrame(historico_data)
-    
-    # Filtrar apenas saídas
-    df_saidas = df_hist[df_hist['tipo'] == 'Saída'].copy()
-    
-    if df_saidas.empty:
-        return {}
-        
-    # Converter 'data' para datetime
-    df_saidas['data'] = pd.to_datetime(df_saidas['data'])
-
-    
-    return {} 
+from src.core.formatacao import formatar_moeda, formatar_para_exibicao
+from src.core.previsao import METODOS_CONSUMO
+from src.core.classificacao import CORES_STATUS
+from src.core.analise import calcular_curva_abc, resumo_curva_abc, itens_criticos, itens_para_reposicao
 
 # Função Principal de Renderização
 
-def renderizar_relatorios(estoque_manager):
-    """Renderiza a tab de Relatórios e Análises (Análise de Dados)."""
+def renderizar_relatorios(estoque_manager, df_estoque: pd.DataFrame):
+    """Renderiza a tab de Relatórios e Análises (`df_estoque`: catálogo lido pela barra lateral)."""
     st.subheader("📊 Relatórios e Análises")
     
-    # Gerar DataFrame e Estatísticas
-    df_estoque = estoque_manager.gerar_relatorio()
-    stats = estoque_manager.obter_estatisticas()
+    # Estatísticas somadas no banco (visão `produtos_estatisticas`)
+    stats = estoque_manager.agregar_estatisticas()
     
     if df_estoque.empty:
         st.info("Nenhum item cadastrado para gerar relatórios.")
@@ -114,20 +46,13 @@ def renderizar_relatorios(estoque_manager):
             status_counts = df_estoque['Status'].value_counts().reset_index()
             status_counts.columns = ['Status', 'Quantidade']
             
-            color_map = {
-                '🟢 Normal': '#2ca02c',        
-                '🟡 Abaixo do Mínimo': '#ff7f0e', 
-                '🔴 Sem Estoque': '#d62728',     
-                '🟠 Acima do Máximo': '#1f77b4' 
-            }
-            
             fig_pie = px.pie(
                 status_counts,
                 values='Quantidade',
                 names='Status',
                 title='Proporção de SKUs por Status de Estoque',
                 color='Status', 
-                color_discrete_map=color_map, 
+                color_discrete_map=CORES_STATUS, 
                 height=380
             )
             # Melhoria na legenda e borda
@@ -142,21 +67,10 @@ def renderizar_relatorios(estoque_manager):
         
         col1, col2 = st.columns(2)
         
-        # Agrupamento por Fornecedor
-        df_forn = df_estoque.copy()
-        df_forn['Valor_Numerico'] = (
-            df_forn['Valor Total']
-            .astype(str).str.replace('R$', '', regex=False).str.replace('.', '', regex=False)
-            .str.replace(',', '.', regex=False).str.strip().astype(float)
-        )
-        
-        fornecedor_analise = df_forn.groupby('Fornecedor').agg(
-            Total_SKUs=('Código', 'count'),
-            Qtd_Total=('Quantidade', 'sum'),
-            Valor_Total=('Valor_Numerico', 'sum')
-        ).reset_index().sort_values('Valor_Total', ascending=False)
+        # Agrupamento por Fornecedor no banco (visão `produtos_por_fornecedor`)
+        fornecedor_analise = estoque_manager.agregar_por_fornecedor()
         
-        fornecedor_analise['Valor Total'] = fornecedor_analise['Valor_Total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+        fornecedor_analise = fornecedor_analise.assign(**{'Valor Total': formatar_moeda(fornecedor_analise['Valor_Total'])})
         
         with col1:
             st.dataframe(fornecedor_analise[['Fornecedor', 'Total_SKUs', 'Qtd_Total', 'Valor Total']], use_container_width=True, hide_index=True)
@@ -180,11 +94,8 @@ def renderizar_relatorios(estoque_manager):
     elif tipo_relatorio == "Análise por Localização":
         st.markdown("### 📍 Análise por Localização")
         
-        # Agrupamento por Localização
-        localizacao_analise = df_estoque.groupby('Localização').agg(
-            Total_SKUs=('Código', 'count'),
-            Qtd_Total=('Quantidade', 'sum')
-        ).reset_index().sort_values('Qtd_Total', ascending=False)
+        # Agrupamento por Localização no banco (visão `produtos_por_localizacao`)
+        localizacao_analise = estoque_manager.agregar_por_localizacao()
         
         st.dataframe(localizacao_analise, use_container_width=True, hide_index=True)
         
@@ -205,10 +116,7 @@ def renderizar_relatorios(estoque_manager):
     elif tipo_relatorio == "Itens Críticos":
         st.markdown("### 🚨 Itens Abaixo e Sem Estoque")
         
-        df_criticos = df_estoque[
-            (df_estoque['Status'] == '🔴 Sem Estoque') | 
-            (df_estoque['Status'] == '🟡 Abaixo do Mínimo')
-        ].sort_values('Quantidade', ascending=True)
+        df_criticos = itens_criticos(df_estoque)
 
         if df_criticos.empty:
             st.success("🎉 Nenhum item está em status crítico ou sem estoque. Ótimo trabalho!")
@@ -233,22 +141,8 @@ def renderizar_relatorios(estoque_manager):
         
         with col_table:
             st.markdown("#### Tabela Curva ABC")
-            df_grouped_abc = df_abc.groupby('Classe ABC').agg(
-                Total_SKUs=('Código', 'count'),
-                Porcentagem_Valor=('Valor Total', 'first') 
-            ).reset_index()
-
-            # Pega o último item (max) de cada classe para a % Valor Acumulado
-            def get_max_percent(classe):
-                last_index_of_class = df_abc[df_abc['Classe ABC'] == classe].index.max()
-                if last_index_of_class is not None:
-                    return df_abc.loc[last_index_of_class, '% Valor Acumulado']
-                return "0.00%"
-                
-            df_grouped_abc['% Valor Total'] = df_grouped_abc['Classe ABC'].apply(get_max_percent)
-            
-            # Formata a tabela de resumo para exibição
-            df_grouped_abc = df_grouped_abc.sort_values('Classe ABC')
+            # Total de SKUs e % de valor acumulada até o último item de cada classe
+            df_grouped_abc = formatar_para_exibicao(resumo_curva_abc(df_abc), percentual=['% Valor Total'])
             st.dataframe(df_grouped_abc[['Classe ABC', 'Total_SKUs', '% Valor Total']], hide_index=True)
 
 
@@ -263,8 +157,8 @@ def renderizar_relatorios(estoque_manager):
                 color_discrete_map={'A': '#1f77b4', 'B': '#ff7f0e', 'C': '#2ca02c'}
             )
             fig_abc.add_trace(go.Scatter(
-                x=df_abc['% Item Acumulado'].str.replace('%', '').str.replace(',', '.').astype(float),
-                y=df_abc['% Valor Acumulado'].str.replace('%', '').str.replace(',', '.').astype(float),
+                x=df_abc['% Item Acumulado'],
+                y=df_abc['% Valor Acumulado'],
                 mode='lines',
                 name='Curva Acumulada',
                 line=dict(color='red', width=2)
@@ -273,70 +167,41 @@ def renderizar_relatorios(estoque_manager):
             
         st.markdown("---")
         st.markdown("#### Detalhes dos Itens (Ordenado por Valor)")
-        st.dataframe(df_abc, use_container_width=True, hide_index=True)
+        st.dataframe(formatar_para_exibicao(df_abc), use_container_width=True, hide_index=True)
 
 
-    # Previsão de Reposição (Modelo Simples de Demonstração)
+    # Previsão de Reposição (Consumo Real do Histórico)
  
     elif tipo_relatorio == "Previsão de Reposição":
-        st.markdown("### ⏳ Previsão de Reposição (Modelo Simples)")
+        st.markdown("### ⏳ Previsão de Reposição")
         
-        st.info("""
-        **Modelo de Reposição Simples (DEMO):** A previsão de consumo é baseada na diferença entre o Estoque Máximo e Mínimo, 
-        simulando um ciclo de reposição de **30 dias**. 
+        col_metodo, col_janela, col_alpha = st.columns(3)
+        metodo = col_metodo.selectbox("Método de Consumo", list(METODOS_CONSUMO), format_func=METODOS_CONSUMO.get)
+        janela_dias = col_janela.slider("Janela de Histórico (dias)", min_value=7, max_value=180, value=30, step=1)
+        alpha = col_alpha.slider("Alpha (Suavização)", min_value=0.05, max_value=0.95, value=0.3, step=0.05, 
+                                 disabled=metodo != "exponencial")
         
-        *Consumo Diário Médio (DEMO)* = (Qtd. Máxima - Qtd. Mínima) / 30 dias.
-        """)
+        col_prazo, col_horizonte = st.columns(2)
+        prazo_entrega = col_prazo.number_input("Prazo de Entrega do Fornecedor (dias)", min_value=0, value=7, step=1)
+        horizonte = col_horizonte.number_input("Exibir itens que atingem o mínimo em até (dias)", min_value=1, value=100, step=1)
         
-        df_reposicao = []
+        st.info("""
+        **Modelo de Reposição:** o *Consumo Diário Médio* é calculado a partir das **Saídas registradas no Histórico** 
+        dentro da janela escolhida. *Dias até Mínimo* = (Qtd. Atual − Mínimo) / Consumo Diário e a 
+        *Qtd. Sugerida* repõe até o Máximo considerando o consumo durante o prazo de entrega.
+        """)
         
-        # Filtra itens que estão abaixo do máximo e com alguma quantidade (para evitar divisão por zero)
-        df_previsao = df_estoque[df_estoque['Quantidade'] > 0]
+        consumo = estoque_manager.obter_consumo_medio(metodo, janela_dias, alpha)
+        df_reposicao = itens_para_reposicao(df_estoque, consumo, prazo_entrega, horizonte)
         
-        for index, item in df_previsao.iterrows():
-            # Consumo médio simulado para DEMO
-            maximo = item['Máximo']
-            minimo = item['Mínimo']
-            quantidade_atual = item['Quantidade']
-            
-            # Simulação: a quantidade ideal para um ciclo de 30 dias é Max - Min.
-            consumo_mensal_ideal = maximo - minimo
-            
-            if consumo_mensal_ideal <= 0: # Evita erro em caso de Max <= Min
-                continue 
-            
-            consumo_diario = consumo_mensal_ideal / 30.0 
-
-            # Quantidade que falta para atingir o Mínimo
-            qtd_ate_minimo = quantidade_atual - minimo
-            
-            # Dias até o Mínimo
-            if consumo_diario > 0:
-                dias_para_minimo = qtd_ate_minimo / consumo_diario
-            else:
-                dias_para_minimo = 999 
-            if quantidade_atual < maximo and dias_para_minimo < 100:
-                df_reposicao.append({
-                    "Código": item["Código"],
-                    "nome": item["nome"],
-                    "Qtd. Atual": item["Quantidade"],
-                    "Mínimo": item["Mínimo"],
-                    "Máximo": item["Máximo"],
-                    "Consumo Diário Médio (DEMO)": round(consumo_diario, 2),
-                    "Dias até Mínimo": round(dias_para_minimo, 1),
-                    "Data Prevista (Mínimo)": (datetime.now() + timedelta(days=dias_para_minimo)).strftime("%d/%m/%Y"),
-                    "Qtd. Sugerida para Compra": item["Máximo"] - item["Quantidade"]
-                })
-        
-        if df_reposicao:
-            df_reposicao = pd.DataFrame(df_reposicao)
-            df_reposicao = df_reposicao.sort_values('Dias até Mínimo', ascending=True)
-            
-            st.dataframe(df_reposicao, use_container_width=True, hide_index=True)
+        if not df_reposicao.empty:
+            df_exibicao = df_reposicao.copy()
+            df_exibicao['Data Prevista (Mínimo)'] = df_exibicao['Data Prevista (Mínimo)'].dt.strftime("%d/%m/%Y")
+            st.dataframe(df_exibicao, use_container_width=True, hide_index=True)
             
-            # Gráfico
+            # Gráfico (os 30 itens mais urgentes)
             fig_reposicao_bar = px.bar(
-                df_reposicao,
+                df_reposicao.head(30),
                 y='nome',
                 x='Dias até Mínimo',
                 orientation='h',
@@ -350,5 +215,7 @@ def renderizar_relatorios(estoque_manager):
                 margin=dict(l=10, r=10, t=50, b=10)
             )
             st.plotly_chart(fig_reposicao_bar, use_container_width=True)
+        elif consumo.empty:
+            st.info("Nenhuma saída registrada no histórico dentro da janela escolhida para estimar o consumo.")
         else:
-            st.info("Nenhum item com previsão de atingir o estoque mínimo em breve (ou todos estão em excesso).")
\ No newline at end of file
+            st.info("Nenhum item com previsão de atingir o estoque mínimo em breve (ou todos estão em excesso).")
@@ -0,0 +1,41 @@
+"""Fixtures compartilhadas: os backends de `RepositorioEstoque`, cada um com dados próprios."""
+import pytest
+from src.core.gestor_estoque import EstoqueManager
+from src.core.sqlite_manager import SqliteManager
+from src.core.supabase_manager import SupabaseManager
+from src.core.supabase_simulado import ClienteSupabaseSimulado
+
+BACKENDS = ("sqlite", "memoria", "simulado")
+
+
+@pytest.fixture
+def criar_manager(tmp_path):
+    """Fábrica de gerenciadores do backend pedido; cada chamada abre um banco novo."""
+    criados = []
+
+    def criar(backend: str):
+        if backend == "sqlite":
+            manager = SqliteManager(str(tmp_path / f"estoque_{len(criados)}.db"))
+        elif backend == "memoria":
+            manager = EstoqueManager()
+        else:
+            manager = SupabaseManager(cliente=ClienteSupabaseSimulado())
+        criados.append(manager)
+        return manager
+
+    yield criar
+    for manager in criados:
+        if hasattr(manager, "fechar"):
+            manager.fechar()
+
+
+@pytest.fixture(params=BACKENDS)
+def manager(request, criar_manager):
+    """Um gerenciador de cada backend (o de memória já vem com o catálogo de exemplo)."""
+    return criar_manager(request.param)
+
+
+def adicionar(manager, item_id: str, quantidade: int = 50, minimo: int = 5, maximo: int = 80,
+              localizacao: str = "A-01", fornecedor: str = "F", preco: float = 2.5, nome: str = "Item"):
+    """Cadastra um item com valores padrão (os testes só informam o que importa)."""
+    assert manager.adicionar_item(item_id, nome, "UN", quantidade, minimo, maximo, localizacao, fornecedor, preco)
@@ -0,0 +1,49 @@
+import pytest
+from src.core.cache_manager import CacheDependente
+from conftest import BACKENDS, adicionar
+
+
+class Fonte:
+    cache = CacheDependente()
+
+    def __init__(self, valor):
+        self.valor = valor
+        self.leituras = 0
+
+    @cache.memorizar(tabelas=["produtos"])
+    def ler(_self):
+        _self.leituras += 1
+        return _self.valor
+
+
+def test_memorizar_separa_instancias():
+    a, b = Fonte("a"), Fonte("b")
+    assert (a.ler(), b.ler(), a.ler()) == ("a", "b", "a")
+    assert (a.leituras, b.leituras) == (1, 1)
+
+
+def test_consultar_usa_a_instancia_do_metodo():
+    a, b = Fonte("a"), Fonte("b")
+    a.ler()
+    assert Fonte.cache.consultar(a.ler) == "a"
+    assert Fonte.cache.consultar(b.ler) is None
+
+
+def test_invalidar_remove_a_tabela():
+    a = Fonte("a")
+    a.ler()
+    Fonte.cache.invalidar("produtos", chaves=["x"])
+    a.ler()
+    assert a.leituras == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_gerenciadores_da_mesma_classe_nao_compartilham_cache(criar_manager, backend):
+    a, b = criar_manager(backend), criar_manager(backend)
+    total_b = b.obter_estatisticas()["total_itens"]
+    b.gerar_relatorio()
+    adicionar(a, "T-001")
+
+    assert "T-001" in set(a.gerar_relatorio()["Código"])
+    assert "T-001" not in set(b.gerar_relatorio().get("Código", []))
+    assert b.obter_estatisticas()["total_itens"] == total_b
@@ -0,0 +1,18 @@
+import json
+import pytest
+from conftest import adicionar
+
+TIPOS = {"total_itens": int, "quantidade_total": int, "valor_total": float,
+         "itens_criticos": int, "itens_excesso": int, "taxa_ocupacao": float}
+
+
+@pytest.mark.parametrize("relatorio_em_cache", [False, True])
+def test_estatisticas_usam_tipos_nativos(manager, relatorio_em_cache):
+    adicionar(manager, "T-001", quantidade=3, minimo=5, preco=1.5)
+    if relatorio_em_cache:
+        manager.gerar_relatorio()
+
+    estatisticas = manager.obter_estatisticas()
+
+    assert {chave: type(valor) for chave, valor in estatisticas.items()} == TIPOS
+    assert json.loads(json.dumps(estatisticas)) == estatisticas
@@ -0,0 +1,52 @@
+import io
+from src.core.importacao import importar_catalogo
+from conftest import adicionar
+
+
+def importar(manager, conteudo: str, atualizar_existentes: bool = True):
+    arquivo = io.BytesIO(conteudo.encode("utf-8"))
+    arquivo.name = "catalogo.csv"
+    return list(importar_catalogo(arquivo, manager, atualizar_existentes=atualizar_existentes))[-1]
+
+
+def test_atualizacao_grava_apenas_as_colunas_do_arquivo(manager):
+    adicionar(manager, "T-001", quantidade=50, minimo=5, maximo=80, localizacao="A-01", fornecedor="F")
+    historico = manager.contar_historico(item_id="T-001", exato=True)
+
+    evento = importar(manager, "id,nome,preco\nT-001,Novo Nome,9.90\n")
+
+    item = manager.get_item_by_id("T-001")
+    assert evento["importadas"] == 1
+    assert (item["nome"], item["preco"]) == ("Novo Nome", 9.9)
+    assert (item["quantidade"], item["minimo"], item["maximo"]) == (50, 5, 80)
+    assert (item["localizacao"], item["fornecedor"]) == ("A-01", "F")
+    assert manager.contar_historico(item_id="T-001", exato=True) == historico
+
+
+def test_importacao_nao_altera_o_saldo_de_itens_existentes(manager):
+    adicionar(manager, "T-001", quantidade=50)
+
+    evento = importar(manager, "id;nome;preco;quantidade\nT-001;Item;2,50;7\nT-002;Novo;3,00;12\n")
+
+    assert evento["importadas"] == 2
+    assert manager.get_item_by_id("T-001")["quantidade"] == 50
+    assert manager.get_item_by_id("T-002")["quantidade"] == 12
+
+
+def test_minimo_e_maximo_validados_com_o_cadastro_atual(manager):
+    adicionar(manager, "T-001", minimo=5, maximo=80)
+
+    evento = importar(manager, "id,nome,preco,maximo\nT-001,Item,2.5,3\n")
+
+    assert evento["rejeitadas"] == 1
+    assert manager.get_item_by_id("T-001")["maximo"] == 80
+
+
+def test_sem_atualizar_existentes_rejeita_codigos_cadastrados(manager):
+    adicionar(manager, "T-001", quantidade=50)
+
+    evento = importar(manager, "id,nome,preco\nT-001,Outro,1.0\nT-002,Novo,1.0\n", atualizar_existentes=False)
+
+    assert (evento["importadas"], evento["rejeitadas"]) == (1, 1)
+    assert manager.get_item_by_id("T-001")["nome"] == "Item"
+    assert manager.get_item_by_id("T-002")["quantidade"] == 0
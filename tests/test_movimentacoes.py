@@ -0,0 +1,92 @@
+from src.core.repositorio import MOTIVO_INSUFICIENTE, MOTIVO_NAO_ENCONTRADO, STATUS_ACEITO, STATUS_REJEITADO
+from src.core.supabase_manager import SupabaseManager
+from src.core.supabase_simulado import ClienteSupabaseSimulado, ConsultaSimulada
+from conftest import adicionar
+
+
+def test_movimentar_lote_aceita_e_rejeita_por_linha(manager):
+    adicionar(manager, "T-001", quantidade=10)
+    resultados = manager.movimentar_lote([
+        {"id": "T-001", "tipo": "Saída", "quantidade": 4},
+        {"id": "T-404", "tipo": "Entrada", "quantidade": 1},
+        {"id": "T-001", "tipo": "Saída", "quantidade": 7},
+        {"id": "T-001", "tipo": "Entrada", "quantidade": 2},
+    ])
+
+    assert [r["status"] for r in resultados] == [STATUS_ACEITO, STATUS_REJEITADO, STATUS_REJEITADO, STATUS_ACEITO]
+    assert [r["motivo"] for r in resultados[1:3]] == [MOTIVO_NAO_ENCONTRADO, MOTIVO_INSUFICIENTE]
+    assert resultados[3]["nova_quantidade"] == 8
+    assert manager.get_item_by_id("T-001")["quantidade"] == 8
+
+
+def test_lote_sem_rpc_rejeita_apenas_a_linha_com_erro(monkeypatch):
+    # Sem as funções no banco o lote usa o fluxo de uma requisição por movimentação
+    manager = SupabaseManager(cliente=ClienteSupabaseSimulado(funcoes={}))
+    adicionar(manager, "A", quantidade=10)
+    adicionar(manager, "B", quantidade=10)
+
+    eq_original = ConsultaSimulada.eq
+
+    def eq_com_falha(consulta, coluna, valor):
+        if coluna == "id" and valor == "B":
+            raise ConnectionError("conexão perdida")
+        return eq_original(consulta, coluna, valor)
+
+    monkeypatch.setattr(ConsultaSimulada, "eq", eq_com_falha)
+    resultados = manager.movimentar_lote([
+        {"id": "A", "tipo": "Saída", "quantidade": 1},
+        {"id": "B", "tipo": "Saída", "quantidade": 1},
+        {"id": "A", "tipo": "Saída", "quantidade": 2},
+    ])
+    monkeypatch.undo()
+
+    assert [r["status"] for r in resultados] == [STATUS_ACEITO, STATUS_REJEITADO, STATUS_ACEITO]
+    assert resultados[1]["motivo"] == "conexão perdida"
+    assert resultados[2]["nova_quantidade"] == 7
+    assert manager.get_item_by_id("A")["quantidade"] == 7
+    assert manager.get_item_by_id("B")["quantidade"] == 10
+    assert manager.contar_historico(item_id="A", exato=True) == 2
+
+
+def test_paginacao_do_historico_nao_perde_linhas_com_mesma_data(manager):
+    # As linhas de um lote compartilham a data e repetem o código do item
+    adicionar(manager, "T-001", quantidade=10)
+    adicionar(manager, "T-002", quantidade=10)
+    manager.movimentar_lote([{"id": f"T-00{1 + i % 2}", "tipo": "Saída", "quantidade": 1} for i in range(8)])
+
+    linhas, cursor = [], None
+    while True:
+        pagina = manager.get_historico_pagina(tipo="Saída", cursor=cursor, tamanho_pagina=3)
+        linhas.extend(pagina)
+        if len(pagina) < 3:
+            break
+        cursor = (pagina[-1]["data"], pagina[-1]["id"], pagina[-1]["seq"])
+
+    assert len(linhas) == 8
+    assert len({linha["seq"] for linha in linhas}) == 8
+
+
+def test_registrar_movimentacao_informa_o_motivo_da_rejeicao(manager):
+    adicionar(manager, "T-001", quantidade=2)
+
+    aceita = manager.registrar_movimentacao("T-001", "Saída", 1)
+    insuficiente = manager.registrar_movimentacao("T-001", "Saída", 5)
+    inexistente = manager.registrar_movimentacao("T-404", "Saída", 1)
+
+    assert (aceita["status"], aceita["nova_quantidade"]) == (STATUS_ACEITO, 1)
+    assert (insuficiente["status"], insuficiente["motivo"]) == (STATUS_REJEITADO, MOTIVO_INSUFICIENTE)
+    assert inexistente["motivo"] == MOTIVO_NAO_ENCONTRADO
+
+
+def test_registrar_movimentacao_informa_o_erro_do_banco(monkeypatch):
+    manager = SupabaseManager(cliente=ClienteSupabaseSimulado())
+    adicionar(manager, "A", quantidade=10)
+
+    def rpc_com_falha(*args, **kwargs):
+        raise ConnectionError("conexão recusada")
+
+    monkeypatch.setattr(manager.supabase, "rpc", rpc_com_falha)
+    resultado = manager.registrar_movimentacao("A", "Saída", 1)
+
+    assert resultado["status"] == STATUS_REJEITADO
+    assert "conexão recusada" in resultado["motivo"]
@@ -0,0 +1,23 @@
+import pytest
+from benchmarks.verificar_orcamento import carregar_orcamento, medir_backend, verificar
+
+
+@pytest.fixture(scope="module", params=["sqlite", "memoria"])
+def medidas(request):
+    """Rastro de cada página do app (uma medição por backend para todo o módulo)."""
+    return medir_backend(request.param)
+
+
+def operacoes_diretas(medida):
+    return [c["operacao"] for c in medida["detalhes"] if c["nivel"] == 0 and c["camada"] == "backend"]
+
+
+def test_paginas_dentro_do_orcamento_de_chamadas(medidas):
+    assert verificar(medidas, carregar_orcamento()) == []
+
+
+def test_dashboard_e_relatorios_usam_os_agregados_do_banco(medidas):
+    for rotulo in ("📈 Dashboard", "📊 Relatórios"):
+        operacoes = operacoes_diretas(medidas[rotulo])
+        assert "agregar_estatisticas" in operacoes
+        assert "obter_estatisticas" not in operacoes
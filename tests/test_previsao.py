@@ -0,0 +1,63 @@
+import time
+import pandas as pd
+import pytest
+from src.core.previsao import consumo_diario, consumo_por_movimentacao
+from conftest import adicionar
+
+
+def test_consumo_conta_a_primeira_saida_do_item(manager):
+    adicionar(manager, "T-001", quantidade=10)
+    for _ in range(4):
+        assert manager.movimentar_estoque("T-001", "Saída", 1) is not None
+
+    consumo = manager.obter_consumo_medio(metodo="media_movel", janela_dias=30)
+
+    assert consumo["T-001"] == pytest.approx(4 / 30)
+
+
+def test_consumo_sem_variacao_usa_saldo_anterior():
+    historico = pd.DataFrame({
+        "id": ["A", "A", "A"],
+        "tipo": ["Entrada", "Saída", "Saída"],
+        "quantidade": [10, 7, 5],
+        "data": ["2026-01-01T10:00:00", "2026-01-02T10:00:00", "2026-01-03T10:00:00"],
+        "variacao": [None, None, -2],
+    })
+
+    consumo = consumo_por_movimentacao(historico)
+
+    assert consumo["consumo"].tolist() == [3, 2]
+
+
+def test_consumo_em_cache_e_recalculado_apos_nova_saida(manager):
+    adicionar(manager, "T-001", quantidade=10)
+    manager.movimentar_estoque("T-001", "Saída", 3)
+    assert manager.obter_consumo_medio(janela_dias=30)["T-001"] == pytest.approx(3 / 30)
+
+    manager.movimentar_estoque("T-001", "Saída", 3)
+
+    assert manager.obter_consumo_medio(janela_dias=30)["T-001"] == pytest.approx(6 / 30)
+
+
+@pytest.fixture
+def fuso_sao_paulo(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Sao_Paulo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_saida_da_noite_cai_no_dia_local(fuso_sao_paulo):
+    # 22h locais (UTC-3), gravadas sem fuso (SQLite/memória) e com fuso (now() da RPC)
+    historico = pd.DataFrame({
+        "id": ["A", "B"],
+        "tipo": ["Saída", "Saída"],
+        "quantidade": [7, 7],
+        "data": ["2026-10-17T22:00:00", "2026-10-18T01:00:00+00:00"],
+        "variacao": [-3, -3],
+    })
+
+    consumo = consumo_diario(historico, janela_dias=1, data_referencia=pd.Timestamp("2026-10-17"))
+
+    assert consumo.to_dict() == {"A": 3.0, "B": 3.0}
@@ -0,0 +1,30 @@
+import sqlite3
+from src.core.sqlite_manager import ESQUEMA, SqliteManager
+from conftest import adicionar
+
+# Histórico como criado antes de `variacao` e do índice (data, id, seq)
+ESQUEMA_ANTIGO = (ESQUEMA
+                  .replace("    observacao  TEXT,\n    variacao    INTEGER\n", "    observacao  TEXT\n")
+                  .replace("DROP INDEX IF EXISTS historico_data_id_idx;\n", "")
+                  .replace("historico_data_id_seq_idx ON historico (data DESC, id DESC, seq DESC)",
+                           "historico_data_id_idx ON historico (data DESC, id DESC)"))
+
+
+def test_banco_existente_recebe_variacao_e_indice_da_paginacao(tmp_path):
+    caminho = str(tmp_path / "antigo.db")
+    with sqlite3.connect(caminho) as conexao:
+        conexao.executescript(ESQUEMA_ANTIGO)
+
+    manager = SqliteManager(caminho)
+    adicionar(manager, "T-001", quantidade=10)
+    manager.movimentar_lote([{"id": "T-001", "tipo": "Saída", "quantidade": 1}] * 3)
+    primeira = manager.get_historico_pagina(tamanho_pagina=2)
+    segunda = manager.get_historico_pagina(cursor=tuple(primeira[-1][c] for c in ("data", "id", "seq")))
+    manager.fechar()
+
+    with sqlite3.connect(caminho) as conexao:
+        colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(historico)")}
+        indices = {linha[1] for linha in conexao.execute("PRAGMA index_list(historico)")}
+    assert "variacao" in colunas
+    assert "historico_data_id_seq_idx" in indices and "historico_data_id_idx" not in indices
+    assert len(primeira) + len(segunda) == 3
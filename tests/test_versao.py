@@ -0,0 +1,29 @@
+from src.core.repositorio import MOTIVO_CONFLITO
+from conftest import adicionar
+
+
+def versao(manager, item_id):
+    return manager.get_item_by_id(item_id)[manager.COLUNA_VERSAO]
+
+
+def test_segunda_edicao_com_a_mesma_versao_e_rejeitada(manager, caplog):
+    adicionar(manager, "T-001")
+    lida = versao(manager, "T-001")
+
+    # Escritas no mesmo instante do relógio: a versão ainda precisa mudar
+    assert manager.atualizar_item("T-001", {"nome": "A"}, versao=lida)
+    assert not manager.atualizar_item("T-001", {"nome": "B"}, versao=lida)
+
+    assert manager.get_item_by_id("T-001")["nome"] == "A"
+    assert MOTIVO_CONFLITO in caplog.text
+
+
+def test_movimentacao_e_atualizacao_em_massa_avancam_a_versao(manager):
+    adicionar(manager, "T-001", fornecedor="F-VERSAO")
+    lida = versao(manager, "T-001")
+    assert manager.movimentar_estoque("T-001", "Entrada", 1) is not None
+    assert not manager.atualizar_item("T-001", {"nome": "A"}, versao=lida)
+
+    lida = versao(manager, "T-001")
+    assert manager.atualizar_em_massa({"fornecedor": "F-VERSAO"}, {"localizacao": "B-02"}) == ["T-001"]
+    assert not manager.atualizar_item("T-001", {"nome": "A"}, versao=lida)